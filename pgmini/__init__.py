@@ -1,56 +1,72 @@
-from contextvars import copy_context
-from typing import Iterable, Literal as TypeLiteral
+from functools import partial
+from typing import Any, Iterable, Iterator, Literal as TypeLiteral, Mapping, Sequence
 
 import attrs
 
 from .array import Array, Tuple
+from .batches import MAX_PARAMS, build_batches
 from .case import Case
 from .column import Column, Excluded
+from .compiled import CompiledQuery, TemplateCache
+from .copy import Copy
+from .copy_encoder import CopyEncoder
 from .delete import Delete
+from .explain import CountEstimate, Explain
 from .func import F, Func
 from .insert import Insert
 from .literal import NULL, Literal
 from .operators import And, Exists, Not, Or
 from .param import Param
+from .param_style import DRIVER, ParamStyle, get_param_style
+from .placeholder import Placeholder
 from .raw import Raw
 from .select import Select
+from .stats import BuildStats, CallStats
 from .subquery import Subquery
 from .table import Table
-from .update import Update
-from .utils import (
-    CTX_ALIAS_ONLY,
-    CTX_CTE,
-    CTX_DISABLE_TABLE_IN_COLUMN,
-    CTX_FORCE_CAST_BRACKETS,
-    CTX_TABLES,
-    CompileABC,
-)
+from .update import Update, claim
+from .utils import CTX_STATE, BuildState, CompileABC
 
 
 __version__ = '0.1.12'
 __all__ = (
     'And',
     'Array',
+    'BuildStats',
+    'CallStats',
     'Case',
+    'CompiledQuery',
+    'Copy',
+    'CountEstimate',
+    'CopyEncoder',
     'Delete',
     'Excluded',
     'Exists',
+    'Explain',
     'F',
     'Func',
     'Insert',
     'Literal',
+    'MAX_PARAMS',
     'Not',
     'NULL',
     'Or',
     'Param',
+    'ParamStyle',
+    'Placeholder',
     'Raw',
     'Select',
     'Subquery',
     'Table',
+    'TemplateCache',
     'Tuple',
     'Update',
     'With',
     'build',
+    'build_batches',
+    'build_many',
+    'claim',
+    'compile',
 )
 
 
@@ -81,22 +97,64 @@ class With:
         return Delete(table, x_with=self._subqueries)
 
 
+def _run_build(
+    item: CompileABC,
+    driver: DRIVER,
+    sources: list | None = None,
+    dedup: TypeLiteral['identity', 'value'] | None = None,
+) -> tuple[str | None, list | dict]:
+    style = get_param_style(driver)
+    if dedup is not None and not style.reusable_slots:
+        raise ValueError(driver)  # `%s` takes the next value every time, a slot can't be shared
+    params = style.new_params()
+    token = CTX_STATE.set(BuildState(param_sources=sources, dedup=dedup, param_style=style))
+    try:
+        return item._build(params), params
+    finally:
+        CTX_STATE.reset(token)
+
+
 def build(
     item: CompileABC,
-    driver: TypeLiteral['asyncpg', 'psycopg'] = 'asyncpg',
+    driver: DRIVER = 'asyncpg',
+    stats: BuildStats | None = None,
+    dedup: TypeLiteral['identity', 'value'] | None = None,
 ) -> tuple[str | None, list | dict]:
-    def run():
-        CTX_FORCE_CAST_BRACKETS.set(False)
-        CTX_CTE.set(())
-        CTX_TABLES.set(())
-        CTX_ALIAS_ONLY.set(False)
-        CTX_DISABLE_TABLE_IN_COLUMN.set(False)
-
-        if driver == 'asyncpg':
-            params = []
-        else:
-            params = {}
+    """
+    driver picks the params style: 'asyncpg' `$1` and a list, 'psycopg' `%(p1)s` and a dict,
+    'format' `%s` and a list (positional psycopg), 'named' `:p1` and a dict, or a ParamStyle.
+    dedup='identity' gives one slot to the same Param object used in a few places,
+    dedup='value' also to equal hashable values of the same type and cast,
+    'format' style has no reusable slots, so dedup raises ValueError with it.
+    """
+    if dedup is not None:
+        if dedup not in ('identity', 'value'):
+            raise ValueError(dedup)
+        run = partial(_run_build, dedup=dedup)
+    else:
+        run = _run_build
+
+    if stats is not None:
+        return stats.record(run, item, driver)
+    return run(item, driver)
+
+
+def compile(
+    item: CompileABC,
+    driver: DRIVER = 'asyncpg',
+) -> CompiledQuery:
+    """Build once, then pass Placeholder values with CompiledQuery.bind"""
+    return CompiledQuery.from_build(*build(item, driver=driver))
 
-        return item._build(params), params
 
-    return copy_context().run(run)
+def build_many(
+    item: CompileABC,
+    rows: Iterable[Mapping[str, Any] | Sequence],
+    driver: DRIVER = 'asyncpg',
+) -> tuple[str, Iterator[tuple | dict]]:
+    """
+    Sql for executemany built once and lazy params of every row (see CompiledQuery.bind_many):
+    `conn.executemany(*build_many(q, rows))`
+    """
+    cq = compile(item, driver=driver)
+    return cq.sql, cq.bind_many(rows)
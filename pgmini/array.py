@@ -1,11 +1,12 @@
 import attrs
 
-from .alias import AliasMX, extract_alias
+from .alias import AliasMX
 from .cast import CastMX
 from .column import prepare_column
 from .marks import MARKS_FIELD, MARKS_TYPE
 from .operation import OperationMX
-from .utils import CompileABC, SelectMX
+from .utils import PREC_ATOM, CompileABC, SelectMX
+from .writer import MarkedWriterABC, write_joined
 
 
 def _convert_items(value):
@@ -13,19 +14,19 @@ def _convert_items(value):
 
 
 @attrs.frozen(eq=False)
-class Array(CompileABC, CastMX, AliasMX, OperationMX, SelectMX):
+class Array(MarkedWriterABC, CastMX, AliasMX, OperationMX, SelectMX):
     _items: tuple[CompileABC, ...] = attrs.field(alias='items', converter=_convert_items)
     _marks: MARKS_TYPE = MARKS_FIELD
     _FMT: str = attrs.field(default='ARRAY[%s]')
 
-    def _build(self, params: list | dict) -> str:
-        if alias := extract_alias(self):
-            return alias
+    def _write_value(self, buf: list[str], params: list | dict) -> None:
+        opening, closing = self._FMT.split('%s')
+        buf.append(opening)
+        write_joined(buf, self._items, params)
+        buf.append(closing)
 
-        res = self._FMT % ', '.join(i._build(params) for i in self._items)
-        if self._marks:
-            res = self._marks.build(res)
-        return res
+    def _precedence(self) -> int:
+        return PREC_ATOM
 
 
 @attrs.frozen(eq=False)
@@ -0,0 +1,115 @@
+from itertools import islice
+from typing import AsyncIterable, AsyncIterator, Final, Iterable, Iterator
+
+from .insert import Insert
+from .param_style import DRIVER, get_param_style
+from .placeholder import Placeholder
+from .utils import CompileABC
+from .vectors import vector_kind
+
+
+# asyncpg (and libpq based drivers with server side binding) can't bind more params per query
+MAX_PARAMS: Final[int] = 32767
+
+# the same slot for every cell of the template rows
+_CELL: Final[Placeholder] = Placeholder('cell')
+
+
+class _Batcher:
+    """Builds sql once per batch size, then only fills rows values into the params"""
+
+    def __init__(
+        self,
+        insert: Insert,
+        max_params: int,
+        driver: DRIVER,
+    ):
+        from . import _run_build
+
+        if insert._values or insert._select is not None:
+            raise ValueError(insert)
+
+        self.insert = insert
+        self.style = get_param_style(driver)
+        self.columns = len(insert._columns)
+
+        _, params = _run_build(insert, self.style)
+        self.size = (max_params - len(params)) // self.columns
+        if self.size < 1:
+            raise ValueError(max_params)
+
+        self._templates: dict[int, tuple[str, list | dict, int, list[str] | None]] = {}
+
+    def _template(self, rows: int) -> tuple[str, list | dict, int, list[str] | None]:
+        from . import _run_build
+
+        if (res := self._templates.get(rows)) is None:
+            sql, params = _run_build(
+                self.insert.Values(*((_CELL,) * self.columns for _ in range(rows))),
+                self.style,
+            )
+            values = params.values() if isinstance(params, dict) else params
+            start = next(index for index, value in enumerate(values) if value is _CELL)
+            keys = list(params) if isinstance(params, dict) else None
+            res = self._templates[rows] = sql, params, start, keys
+        return res
+
+    def build(self, batch: list) -> tuple[str, list | dict]:
+        from . import _run_build
+
+        flat = []
+        for row in batch:
+            if len(row) != self.columns:
+                raise ValueError((len(row), self.columns))
+            flat.extend(row)
+
+        if any(isinstance(i, CompileABC) or vector_kind(i) is not None for i in flat):
+            # expressions in rows change sql, so do vectors (converted for the driver and cast
+            # to the array of their items type), so such batch is built as usual
+            return _run_build(self.insert.Values(*batch), self.style)
+
+        sql, template, start, keys = self._template(len(batch))
+        params = template.copy()
+        if keys is None:
+            params[start:start + len(flat)] = flat
+        else:
+            params.update(zip(keys[start:start + len(flat)], flat, strict=True))
+        return sql, params
+
+
+def _iter_batches(batcher: _Batcher, rows: Iterable) -> Iterator[tuple[str, list | dict]]:
+    rows = iter(rows)
+    while batch := list(islice(rows, batcher.size)):
+        yield batcher.build(batch)
+
+
+async def _aiter_batches(
+    batcher: _Batcher,
+    rows: AsyncIterable,
+) -> AsyncIterator[tuple[str, list | dict]]:
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) == batcher.size:
+            yield batcher.build(batch)
+            batch = []
+    if batch:
+        yield batcher.build(batch)
+
+
+def build_batches(
+    insert: Insert,
+    rows: Iterable | AsyncIterable,
+    max_params: int = MAX_PARAMS,
+    driver: DRIVER = 'asyncpg',
+) -> Iterator[tuple[str, list | dict]] | AsyncIterator[tuple[str, list | dict]]:
+    """
+    Bulk insert split into queries of at most `max_params` params each:
+    `insert` (with OnConflict, Returning etc., but without values) gets the rows batch by batch.
+    Rows are read lazily; from an async iterable they are yielded by an async iterator.
+    Every full batch has the same sql.
+    """
+    batcher = _Batcher(insert, max_params=max_params, driver=driver)
+    if hasattr(rows, '__aiter__'):
+        return _aiter_batches(batcher, rows)
+    return _iter_batches(batcher, rows)
@@ -0,0 +1,401 @@
+"""
+Benchmark of build() on README examples and stress shapes.
+
+    python -m pgmini.bench
+    python -m pgmini.bench --filter insert --save baseline.json
+    python -m pgmini.bench --compare baseline.json --tolerance 0.1
+
+Reports ops/sec, p50/p99 latency of a single build and peak memory allocated
+while building (traced by tracemalloc in a separate run, so it doesn't skew timings).
+With --compare exits with 1 when any shape is slower than the baseline beyond tolerance.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from . import (
+    And,
+    Array,
+    Case,
+    Excluded,
+    Exists,
+    F,
+    Insert,
+    Literal,
+    Not,
+    Or,
+    Param,
+    Select,
+    Table,
+    TemplateCache,
+    Update,
+    With,
+    __version__,
+    build,
+)
+from .utils import CompileABC
+
+
+def _readme_select():
+    User = Table('user')
+    return Select(User.id, User.name).From(User).Where(User.email == 'test@test.com')
+
+
+def _readme_schema():
+    class RoleSchema(Table):
+        @property
+        def status_active(self):
+            return self.status == Literal('active')
+
+    Role = RoleSchema('role')
+    RoleAlias = Role.As('role2')
+    return (
+        Select(Role.STAR).From(Role)
+        .Where(Not(Exists(
+            Select(1).From(RoleAlias)
+            .Where(RoleAlias.id < Role.id, RoleAlias.status_active)
+        )))
+    )
+
+
+def _readme_where():
+    t = Table('tbl')
+    return (
+        Select(t.id).From(t)
+        .Where(
+            t.id.Between(10, 20),
+            Or(t.name > 'name', And(t.status == 'active', Not(t.id == 15))),
+        )
+    )
+
+
+def _readme_join():
+    t, t2 = Table('tbl'), Table('tbl2')
+    sq = Select(t2.name).From(t2).Where(t2.id == t.id).Subquery('sq')
+    return (
+        Select(t.id).From(t)
+        .Join(t2, t2.id == t.id)
+        .LeftJoin(t2, And(t2.id == t.id, t2.status == 'active'))
+        .JoinLateral(sq, True)
+        .LeftJoinLateral(sq, sq.name != 'test')
+    )
+
+
+def _readme_functions():
+    t = Table('tbl')
+    return Select(
+        F.count('*'),
+        F.count(t.id).Where(t.id > 10, t.id < 20),
+        F.array_agg(t.id).OrderBy(t.id.Desc().NullsLast()).As('ids'),
+        F.row_number().Over(partition_by=t.status, order_by=t.id),
+        Case((t.id == 1, 'first'), (t.id == 2, 'second'), Else='third').As('val'),
+        Array([t.id, 5, 7]),
+    ).From(t)
+
+
+def _readme_operations():
+    t = Table('tbl')
+    return Select(
+        t.id + t.id,
+        t.id - 1,
+        t.id * 10,
+        t.id > 15,
+        (t.id == 10).As('equals_ten'),
+        (t.id != 11).As('not_equals_eleven'),
+        Param(10) > 9,
+        (Literal(5) * 3.5).Cast('int'),
+        t.id.Between(1, 2),
+        t.id.In([1, 2, 3]),
+        t.id.NotIn(Select(t.id).From(t).Where(t.id < 10)),
+        t.name.Is(None),
+        t.active.IsNot(False),
+        t.data.Op('->>', 'key').As('value1'),
+        t.data.Op('#>>', ['key1', 'key2']).As('value2'),
+        t.id.Any(list(range(1_000))),
+        t.name.Like('%ABC%'),
+        t.name.Ilike('%abc%'),
+    ).From(t)
+
+
+def _readme_insert():
+    t = Table('tbl')
+    return (
+        Insert(t, columns=(t.name, t.status))
+        .Values(
+            (Param('some text').Cast('varchar(10)'), 'active'),
+            ('other text', Literal('deleted')),
+        )
+        .Returning(t.STAR)
+    )
+
+
+def _readme_update_delete():
+    t = Table('stmh')
+    sq = Update(t).Set({t.name: 'second'}).Where(t.name == 'first').Returning(t.id).Subquery('sq')
+    return With(sq).Delete(t).Where(t.id == 25, t.id.In(Select(sq.id).From(sq))).Returning(t.id)
+
+
+def _wide_select():
+    t, t2 = Table('tbl'), Table('tbl2')
+    return (
+        Select(*(
+            getattr(t, 'col%d' % i).Cast('text').As('c%d' % i)
+            if i % 2
+            else getattr(t2, 'col%d' % i)
+            for i in range(200)
+        ))
+        .From(t)
+        .Join(t2, t2.id == t.id)
+        .Where(*(getattr(t, 'col%d' % i) > i for i in range(50)))
+        .OrderBy(t.id.Desc())
+        .Limit(100)
+    )
+
+
+def _wide_join():
+    tables = [Table('tbl%d' % i) for i in range(6)]
+    q = Select(*(
+        getattr(tables[i % 6], 'col%d' % i).As('c%d' % i) for i in range(50)
+    )).From(tables[0])
+    for t in tables[1:]:
+        q = q.Join(t, t.parent_id == tables[0].id)
+    return q.Where(tables[0].status == 'active', tables[5].score > 10).Limit(100)
+
+
+def _deep_boolean():
+    t = Table('tbl')
+    cond = t.x == 0
+    for i in range(500):
+        cond = (Or if i % 2 else And)(cond, Not(t.x == i))
+    return Select(t.id).From(t).Where(cond)
+
+
+def _insert_values():
+    t = Table('tbl')
+    return (
+        Insert(t, columns=('id', 'name', 'status', 'score'))
+        .Values(*((i, 'name%d' % i, 'active', i / 2) for i in range(10_000)))
+    )
+
+
+def _cte_heavy():
+    t = Table('tbl')
+    subqueries = [
+        Select(t.id, F.count('*').As('cnt'))
+        .From(t)
+        .Where(t.group_id == i, t.status.In(['active', 'pending']))
+        .GroupBy(t.id)
+        .Subquery('sq%d' % i)
+        for i in range(20)
+    ]
+    q = With(*subqueries).Select(*(sq.cnt for sq in subqueries)).From(subqueries[0])
+    for sq in subqueries[1:]:
+        q = q.LeftJoin(sq, sq.id == subqueries[0].id)
+    return q
+
+
+def _in_list():
+    t = Table('tbl')
+    return Select(t.id).From(t).Where(t.id.In(list(range(10_000))), t.status.NotIn(['a', 'b', 'c']))
+
+
+def _in_array():
+    t = Table('tbl')
+    return Select(t.id).From(t).Where(
+        t.id.In(list(range(10_000)), array_threshold=100, cast='int'),
+        t.status.NotIn(['a', 'b', 'c'], array_threshold=100),
+    )
+
+
+def _literal_array():
+    t = Table('tbl')
+    return Select(t.id).From(t).Where(t.part_id == F.any(Literal(list(range(100_000)))))
+
+
+def _upsert():
+    t = Table('tbl')
+    return (
+        Insert(t, columns=(t.id, t.name, t.counter))
+        .Values(*((i, 'name%d' % i, 1) for i in range(1_000)))
+        .OnConflict(
+            index_elements=(t.id,),
+            index_where=t.deleted.Is(False),
+            do_update={
+                t.name: Excluded(t.name),
+                t.counter: t.counter + Excluded(t.counter),
+            },
+        )
+        .Returning(t.id)
+    )
+
+
+SHAPES: dict[str, Callable[[], CompileABC]] = {
+    'readme_select': _readme_select,
+    'readme_schema': _readme_schema,
+    'readme_where': _readme_where,
+    'readme_join': _readme_join,
+    'readme_functions': _readme_functions,
+    'readme_operations': _readme_operations,
+    'readme_insert': _readme_insert,
+    'readme_update_delete': _readme_update_delete,
+    'wide_select': _wide_select,
+    'wide_join_50x5': _wide_join,
+    'deep_boolean': _deep_boolean,
+    'insert_values_10k': _insert_values,
+    'cte_heavy': _cte_heavy,
+    'in_list_10k': _in_list,
+    'in_array_10k': _in_array,
+    'literal_array_100k': _literal_array,
+    'upsert_1k': _upsert,
+}
+
+
+def _stats(
+    fn: Callable[[Any], Any],
+    make: Callable[[], Any],
+    min_time: float,
+    min_runs: int,
+) -> dict[str, float]:
+    """Timings of fn(make()), make() is not timed"""
+    fn(make())  # warm up
+
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < min_runs or time.perf_counter() - started < min_time:
+        arg = make()
+        start = time.perf_counter_ns()
+        fn(arg)
+        samples.append(time.perf_counter_ns() - start)
+
+    arg = make()
+    tracemalloc.start()
+    try:
+        fn(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    return {
+        'ops': round(len(samples) * 1e9 / sum(samples), 1),
+        'p50_us': round(samples[len(samples) // 2] / 1e3, 1),
+        'p99_us': round(samples[min(len(samples) - 1, len(samples) * 99 // 100)] / 1e3, 1),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def measure(query: CompileABC, min_time: float = 0.5, min_runs: int = 5) -> dict[str, float]:
+    return _stats(build, lambda: query, min_time, min_runs)
+
+
+def measure_cached(
+    make: Callable[[], CompileABC],
+    min_time: float = 0.5,
+    min_runs: int = 5,
+) -> dict[str, float]:
+    """
+    TemplateCache.compile hits of a query constructed anew on every run (not timed),
+    as a request handler does: the cost of the lookup which replaces build().
+    """
+    return _stats(TemplateCache().compile, make, min_time, min_runs)
+
+
+def run(
+    names: list[str],
+    min_time: float = 0.5,
+    cached: bool = False,
+) -> dict[str, dict[str, float]]:
+    if cached:
+        return {name: measure_cached(SHAPES[name], min_time=min_time) for name in names}
+    return {name: measure(SHAPES[name](), min_time=min_time) for name in names}
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float = 0.1,
+) -> dict[str, float]:
+    """Shapes slower than baseline beyond tolerance: name -> relative change of ops/sec"""
+    res = {}
+    for name, stats in results.items():
+        if (base := baseline.get(name)) is not None:
+            change = stats['ops'] / base['ops'] - 1
+            if change < -tolerance:
+                res[name] = change
+    return res
+
+
+def _format(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]] | None,
+) -> str:
+    lines = ['%-22s %12s %10s %10s %10s%s' % (
+        'shape', 'ops/sec', 'p50 us', 'p99 us', 'peak KiB', '    vs base' if baseline else '',
+    )]
+    for name, stats in results.items():
+        line = '%-22s %12.1f %10.1f %10.1f %10.1f' % (
+            name, stats['ops'], stats['p50_us'], stats['p99_us'], stats['peak_kib'],
+        )
+        if baseline and (base := baseline.get(name)) is not None:
+            line += '  %+8.1f%%' % ((stats['ops'] / base['ops'] - 1) * 100)
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m pgmini.bench',
+        description='Benchmark of build() on README examples and stress shapes',
+    )
+    parser.add_argument('--filter', default='', help='run only shapes containing this substring')
+    parser.add_argument('--min-time', type=float, default=0.5, help='seconds per shape')
+    parser.add_argument(
+        '--cached', action='store_true',
+        help='time TemplateCache.compile hits of queries constructed anew instead of build()',
+    )
+    parser.add_argument('--save', metavar='PATH', help='save results as json baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare with json baseline')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.1,
+        help='allowed relative ops/sec drop before shape is reported as regression',
+    )
+    args = parser.parse_args(argv)
+
+    names = [i for i in SHAPES if args.filter in i]
+    if not names:
+        parser.error('no shapes match %r' % args.filter)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            data = json.load(f)
+        if data.get('cached', False) != args.cached:
+            parser.error('baseline is of the other mode, see --cached')
+        baseline = data['results']
+
+    results = run(names, min_time=args.min_time, cached=args.cached)
+    print(_format(results, baseline))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'pgmini': __version__,
+                'python': platform.python_version(),
+                'cached': args.cached,
+                'results': results,
+            }, f, indent=2)
+
+    if baseline is not None and (regressions := compare(results, baseline, args.tolerance)):
+        print('\nregressions: %s' % ', '.join(
+            '%s %+.1f%%' % (name, change * 100) for name, change in regressions.items()
+        ))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
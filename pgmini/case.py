@@ -2,14 +2,15 @@ from typing import Any
 
 import attrs
 
-from .alias import AliasMX, extract_alias
+from .alias import AliasMX
 from .cast import CastMX
 from .column import prepare_column
 from .distinct import DistinctMX
 from .marks import MARKS_FIELD, MARKS_TYPE
 from .operation import OperationMX
 from .order_by import OrderByMX
-from .utils import CompileABC, SelectMX
+from .utils import PREC_COMPOUND, CompileABC, SelectMX
+from .writer import ExpressionABC
 
 
 def _convert_statements(value):
@@ -22,7 +23,7 @@ def _convert_else(value):
 
 
 @attrs.frozen(eq=False, init=False)
-class Case(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
+class Case(ExpressionABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
     _statements: tuple[tuple[CompileABC, CompileABC], ...] = attrs.field(
         alias='statements',
         converter=_convert_statements,
@@ -42,16 +43,14 @@ class Case(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, Sele
         kwargs.setdefault('x_else', Else)
         self.__attrs_init__(**kwargs)
 
-    def _build(self, params: list | dict) -> str:
-        if alias := extract_alias(self):
-            return alias
-
-        parts = []
+    def _parts(self, params: list | dict) -> tuple | list:
+        res = ['CASE']
         for op, val in self._statements:
-            parts.append('WHEN %s THEN %s' % (op._build(params), val._build(params)))
+            res.extend((' WHEN ', op, ' THEN ', val))
         if self._else is not None:
-            parts.append('ELSE %s' % self._else._build(params))
-        res = 'CASE %s END' % ' '.join(parts)
-        if self._marks:
-            res = self._marks.build(res)
+            res.extend((' ELSE ', self._else))
+        res.append(' END')
         return res
+
+    def _precedence(self) -> int:
+        return PREC_COMPOUND
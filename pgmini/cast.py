@@ -1,37 +1,26 @@
-import attrs
-
 from .marks import Marks
-from .utils import (
-    CTX_FORCE_CAST_BRACKETS,
-    RE_ARRAY,
-    RE_FUNC_PARENTHESIZED,
-    RE_NEED_BRACKETS,
-    RE_PARENTHESIZED,
-    RE_PSYCOPG_PARAM,
-    RE_SINGLE_QUOTED,
-)
+from .utils import CTX_STATE, PREC_ATOM, evolve
 
 
 class CastMX:
     def Cast(self, to: str):
         if self._marks:
-            marks = attrs.evolve(self._marks, cast=to)
+            marks = evolve(self._marks, cast=to)
         else:
             marks = Marks(cast=to)
-        return attrs.evolve(self, x_marks=marks)
+        return evolve(self, x_marks=marks)
+
+
+def cast_affixes(cast: str, precedence: int) -> tuple[str, str]:
+    if precedence < PREC_ATOM:
+        prefix, suffix = '(', ')::%s' % cast
+    else:
+        prefix, suffix = '', '::%s' % cast
+    if CTX_STATE.get().force_cast_brackets:
+        prefix, suffix = '(%s' % prefix, '%s)' % suffix
+    return prefix, suffix
 
 
-def build_cast(value: str, cast: str) -> str:
-    if (
-        RE_NEED_BRACKETS.search(value)
-        and not RE_PARENTHESIZED.fullmatch(value)
-        and not RE_FUNC_PARENTHESIZED.fullmatch(value)
-        and not RE_SINGLE_QUOTED.fullmatch(value)
-        and not RE_ARRAY.fullmatch(value)
-        and not RE_PSYCOPG_PARAM.fullmatch(value)
-    ):
-        value = '(%s)' % value
-    value = '%s::%s' % (value, cast)
-    if CTX_FORCE_CAST_BRACKETS.get():
-        value = '(%s)' % value
-    return value
+def build_cast(value: str, cast: str, precedence: int) -> str:
+    prefix, suffix = cast_affixes(cast, precedence)
+    return prefix + value + suffix
@@ -0,0 +1,66 @@
+from itertools import chain
+from typing import Iterable, Iterator
+
+
+class Clauses:
+    """
+    Immutable sequence of where/having/order by statements with O(1) append:
+    `clauses + (statement,)` links a new node to the old one instead of copying it,
+    so a query gets its filters added one by one in O(N) overall.
+    Flattened to a tuple once per node, when it is iterated.
+    """
+
+    __slots__ = ('_prev', '_items', '_len', '_flat')
+
+    def __init__(self, items: Iterable = (), prev: 'Clauses | None' = None):
+        self._prev = prev
+        self._items = tuple(items)
+        self._len = len(self._items) + (prev._len if prev is not None else 0)
+        self._flat = None if prev is not None else self._items
+
+    def _flatten(self) -> tuple:
+        if (res := self._flat) is not None:
+            return res
+
+        chunks = []
+        node = self
+        while node._flat is None:
+            chunks.append(node._items)
+            node = node._prev
+        chunks.append(node._flat)
+
+        res = self._flat = tuple(chain.from_iterable(reversed(chunks)))
+        return res
+
+    def __add__(self, other: Iterable) -> 'Clauses':
+        if not other:
+            return self
+        if not self._len:
+            return Clauses(other)
+        return Clauses(other, prev=self)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator:
+        return iter(self._flatten())
+
+    def __getitem__(self, index):
+        return self._flatten()[index]
+
+    def __eq__(self, other):
+        if isinstance(other, Clauses):
+            other = other._flatten()
+        elif not isinstance(other, tuple):
+            return NotImplemented
+        return self._flatten() == other
+
+    def __hash__(self):
+        return hash(self._flatten())
+
+    def __repr__(self):
+        return 'Clauses(%r)' % (self._flatten(),)
+
+
+def to_clauses(value: Iterable) -> Clauses:
+    return value if isinstance(value, Clauses) else Clauses(value)
@@ -1,3 +1,7 @@
+from inspect import get_annotations
+from types import MappingProxyType
+from typing import Any, Final, get_args
+
 import attrs
 
 from .alias import AliasMX, extract_alias
@@ -7,7 +11,8 @@ from .marks import MARKS_FIELD, MARKS_TYPE
 from .operation import OperationMX
 from .order_by import OrderByMX
 from .param import Param
-from .utils import CTX_DISABLE_TABLE_IN_COLUMN, CTX_TABLES, CompileABC, FromABC, SelectMX
+from .utils import CTX_STATE, PREC_ATOM, FromABC, SelectMX, evolve
+from .writer import WriterABC
 
 
 class _Excluded(FromABC):
@@ -19,29 +24,34 @@ class _Excluded(FromABC):
 
 
 @attrs.frozen(eq=False, unsafe_hash=True)
-class Column(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
+class Column(WriterABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
     _name: str = attrs.field(alias='name')
     _table: FromABC | None = attrs.field(alias='table', default=None)
     _marks: MARKS_TYPE = MARKS_FIELD
 
-    def _build(self, params: list | dict) -> str:
+    def _write(self, buf: list[str], params: list | dict) -> None:
         if alias := extract_alias(self):
-            return alias
+            buf.append(alias)
+            return
 
         res = self._name
+        state = CTX_STATE.get()
         if (
-            not CTX_DISABLE_TABLE_IN_COLUMN.get()
+            not state.disable_table_in_column
             and (
                 isinstance(self._table, _Excluded)
-                or len(CTX_TABLES.get()) > 1
-                or self._table not in CTX_TABLES.get()
+                or len(state.tables) > 1
+                or self._table not in state.tables
             )
         ):
             res = f'{self._table._get_name()}.{res}'
 
         if self._marks:
-            res = self._marks.build(res)
-        return res
+            res = self._marks.build(res, obj=self)
+        buf.append(res)
+
+    def _precedence(self) -> int:
+        return PREC_ATOM
 
 
 def Excluded(column: str | Column) -> Column:
@@ -51,8 +61,80 @@ def Excluded(column: str | Column) -> Column:
     if not isinstance(column, Column):
         raise TypeError(column)
 
-    return attrs.evolve(column, table=_Excluded())
+    return evolve(column, table=_Excluded())
 
 
 def prepare_column(col):
     return col if isinstance(col, SelectMX) else Param(col)
+
+
+# python types of schema annotations -> postgres types
+_PG_TYPES: Final[MappingProxyType] = MappingProxyType({
+    'bool': 'bool',
+    'int': 'bigint',
+    'float': 'float8',
+    'Decimal': 'numeric',
+    'str': 'text',
+    'bytes': 'bytea',
+    'UUID': 'uuid',
+    'date': 'date',
+    'datetime': 'timestamp',
+    'time': 'time',
+    'timedelta': 'interval',
+})
+
+
+def _pg_type(annotation: Any) -> str | None:
+    if isinstance(annotation, str):
+        names = [i.strip() for i in annotation.split('|')]
+    else:
+        names = [getattr(i, '__name__', None) for i in get_args(annotation) or (annotation,)]
+    names = [i for i in names if i not in ('None', 'NoneType')]
+    return _PG_TYPES.get(names[0]) if len(names) == 1 else None
+
+
+def declared_type(column: Column) -> str | None:
+    """Postgres type of column from annotation of its table schema, like `id: int`"""
+    if (types := getattr(type(column._table), '_COLUMN_TYPES', None)) is not None:
+        return types.get(column._name)
+    return None
+
+
+class _ColumnAttribute:
+    """Column declared by annotation of a schema class, like `id: int`"""
+
+    __slots__ = ('_name',)
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return obj.__getattr__(self._name)
+
+
+class ColumnsMX:
+    """
+    Columns accessed as attributes, like `User.id`: created once per source object
+    and then served from its __dict__ without any python code involved.
+    """
+
+    _COLUMN_TYPES: MappingProxyType = MappingProxyType({})
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        types = dict(cls._COLUMN_TYPES)
+        for name, annotation in get_annotations(cls).items():
+            if not name.startswith('_') and name not in cls.__dict__:
+                setattr(cls, name, _ColumnAttribute(name))
+                if (type_ := _pg_type(annotation)) is not None:
+                    types[name] = type_
+        cls._COLUMN_TYPES = MappingProxyType(types)
+
+    def _columns_table(self) -> FromABC | None:
+        return self
+
+    def __getattr__(self, item: str) -> Column:
+        res = self.__dict__[item] = Column(item, table=self._columns_table())
+        return res
@@ -0,0 +1,193 @@
+from collections import OrderedDict
+from operator import itemgetter
+from threading import Lock
+from typing import Any, Callable, Iterable, Iterator, Mapping, Sequence
+
+import attrs
+
+from .fingerprint import collect_params, structure
+from .param import Param
+from .param_style import DRIVER, ParamStyle, get_param_style
+from .placeholder import Placeholder
+from .utils import CompileABC
+from .vectors import vector_kind
+
+
+@attrs.frozen(eq=False)
+class CompiledQuery:
+    """SQL text built once plus the positions of its placeholders"""
+
+    sql: str
+    _params: list | dict = attrs.field(alias='params')
+    _slots: tuple[tuple[int | str, str], ...] = attrs.field(alias='slots')
+    _names: frozenset[str] = attrs.field(alias='names')
+    # (params key, index of Param in structural order) for values taken from the query itself
+    _consts: tuple[tuple[int | str, int], ...] = attrs.field(alias='consts', default=())
+    # params keys of array.array, memoryview or numpy array values, it's a part of the structure
+    _vectors: tuple[int | str, ...] = attrs.field(alias='vectors', default=())
+
+    @classmethod
+    def from_build(cls, sql: str, params: list | dict) -> 'CompiledQuery':
+        items = params.items() if isinstance(params, dict) else enumerate(params)
+        slots = tuple((key, value._name) for key, value in items if isinstance(value, Placeholder))
+
+        template = params.copy()
+        for key, _ in slots:
+            template[key] = None
+
+        return cls(
+            sql,
+            params=template,
+            slots=slots,
+            names=frozenset(name for _, name in slots),
+        )
+
+    @property
+    def names(self) -> frozenset[str]:
+        return self._names
+
+    def with_values(self, nodes: list[Param], style: ParamStyle) -> 'CompiledQuery':
+        """Same sql with constant values taken from another query of the same structure"""
+        if not self._consts:
+            return self
+
+        params = self._params.copy()
+        for key, index in self._consts:
+            params[key] = nodes[index]._value
+        for key in self._vectors:
+            params[key] = style.vector(params[key])
+        return attrs.evolve(self, params=params)
+
+    def bind(self, **values: Any) -> list | dict:
+        if values.keys() != self._names:
+            if missing := self._names - values.keys():
+                raise TypeError(sorted(missing))
+            raise TypeError(sorted(values.keys() - self._names))
+
+        params = self._params.copy()
+        for key, name in self._slots:
+            params[key] = values[name]
+        return params
+
+    @property
+    def ordered_names(self) -> tuple[str, ...]:
+        """Placeholder names in order of their first appearance in sql"""
+        return tuple(dict.fromkeys(name for _, name in self._slots))
+
+    def bind_many(self, rows: Iterable[Mapping[str, Any] | Sequence]) -> Iterator[tuple | dict]:
+        """
+        Params of every row for executemany: tuples for list params styles, dicts for dict ones.
+        Row is a mapping by placeholder name or a sequence in order of `ordered_names`.
+        """
+        ordered = self.ordered_names
+        positions = {name: index for index, name in enumerate(ordered)}
+        keys = [key for key, _ in self._slots]
+        by_name = _getter([name for _, name in self._slots])
+        by_index = _getter([positions[name] for _, name in self._slots])
+        template = self._params
+        is_list = isinstance(template, list)
+        only_slots = len(keys) == len(template)
+
+        for row in rows:
+            if isinstance(row, Mapping):
+                try:
+                    values = by_name(row)
+                except KeyError:
+                    raise TypeError(sorted(positions.keys() - row.keys())) from None
+            elif len(row) != len(ordered):
+                raise TypeError((len(row), len(ordered)))
+            else:
+                values = by_index(row)
+
+            if only_slots:
+                yield values if is_list else dict(zip(keys, values, strict=True))
+            else:
+                params = template.copy()
+                for key, value in zip(keys, values, strict=True):
+                    params[key] = value
+                yield tuple(params) if is_list else params
+
+
+def _getter(items: list) -> Callable[[Any], tuple]:
+    """itemgetter which always returns a tuple"""
+    if not items:
+        return lambda row: ()
+    elif len(items) == 1:
+        item = items[0]
+        return lambda row: (row[item],)
+    return itemgetter(*items)
+
+
+class TemplateCache:
+    """
+    LRU of compiled queries keyed by query structure (see Fingerprint),
+    so a query constructed anew on every call still hits the cache.
+    A hit walks the query once, on hot paths keep the CompiledQuery and bind() values instead.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        if maxsize < 1:
+            raise ValueError(maxsize)
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict[tuple, CompiledQuery] = OrderedDict()
+        self._lock = Lock()
+
+    def compile(
+        self,
+        item: CompileABC,
+        driver: DRIVER = 'asyncpg',
+    ) -> CompiledQuery:
+        from . import _run_build
+
+        style = get_param_style(driver)
+        nodes = collect_params(item)
+        # the same Param object reused in a few places is a part of the structure too
+        sharing = None
+        if len(set(map(id, nodes))) != len(nodes):
+            positions = {}
+            sharing = tuple(positions.setdefault(id(i), len(positions)) for i in nodes)
+        key = (structure(item), style, sharing)
+
+        with self._lock:
+            if (cached := self._items.get(key)) is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if cached is not None:
+            return cached.with_values(nodes, style)
+
+        sources = []
+        sql, params = _run_build(item, style, sources=sources)
+        res = CompiledQuery.from_build(sql, params)
+
+        positions = {}
+        for index, node in enumerate(nodes):
+            positions.setdefault(id(node), index)
+        consts = []
+        vectors = []
+        for ordinal, node in sources:
+            if (index := positions.get(id(node))) is None:
+                return res  # param created during build, can't be mapped to the structure
+            consts.append((style.key(ordinal), index))
+            if vector_kind(node._value) is not None:
+                vectors.append(style.key(ordinal))
+        res = attrs.evolve(res, consts=tuple(consts), vectors=tuple(vectors))
+
+        with self._lock:
+            self._items[key] = res
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return res
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,42 @@
+from typing import Iterable, Literal as TypeLiteral, Sequence
+
+import attrs
+
+from .column import Column
+from .copy_encoder import FORMATS, CopyEncoder
+from .table import Table
+from .utils import CompileABC, evolve
+
+
+@attrs.frozen
+class Copy(CompileABC):
+    """`COPY table (columns) FROM STDIN`, data is made by CopyEncoder of the same format"""
+
+    _table: Table = attrs.field(alias='table')
+    _columns: Iterable[str | Column] = attrs.field(alias='columns', converter=tuple)
+    _format: TypeLiteral['binary', 'text', 'csv'] = attrs.field(
+        alias='x_format',
+        validator=attrs.validators.in_(FORMATS),
+        default='binary',
+    )
+
+    @_columns.validator
+    def _vld_columns(self, attribute, value):
+        if not value:
+            raise ValueError
+
+    def Format(self, format: TypeLiteral['binary', 'text', 'csv']):
+        return evolve(self, x_format=format)
+
+    def Encoder(self, types: Sequence[str], chunk_size: int = 1 << 16) -> CopyEncoder:
+        """Encoder of rows for this statement: one type per column"""
+        if isinstance(types, str) or len(types) != len(self._columns):
+            raise ValueError(types)
+        return CopyEncoder(types, format=self._format, chunk_size=chunk_size)
+
+    def _build(self, params: list | dict) -> str:
+        return 'COPY %s (%s) FROM STDIN WITH (FORMAT %s)' % (
+            self._table._name,
+            ', '.join(col._name if isinstance(col, Column) else col for col in self._columns),
+            self._format,
+        )
@@ -0,0 +1,395 @@
+import json
+from collections import deque
+from concurrent.futures import Executor
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from functools import lru_cache
+from itertools import islice
+from struct import Struct
+from types import MappingProxyType
+from typing import Any, Callable, Final, Iterable, Iterator, Literal as TypeLiteral, Sequence
+
+
+FORMATS: Final[frozenset[str]] = frozenset(['binary', 'text', 'csv'])
+
+BINARY_HEADER: Final[bytes] = b'PGCOPY\n\xff\r\n\x00' + b'\x00\x00\x00\x00' * 2
+BINARY_TRAILER: Final[bytes] = b'\xff\xff'
+
+_NULL_FIELD: Final[bytes] = b'\xff\xff\xff\xff'
+_INT2: Final[Struct] = Struct('!h')
+_INT4: Final[Struct] = Struct('!i')
+_FIELD_BOOL: Final[Struct] = Struct('!i?')
+_FIELD_INT2: Final[Struct] = Struct('!ih')
+_FIELD_INT4: Final[Struct] = Struct('!ii')
+_FIELD_INT8: Final[Struct] = Struct('!iq')
+_FIELD_FLOAT4: Final[Struct] = Struct('!if')
+_FIELD_FLOAT8: Final[Struct] = Struct('!id')
+
+_EPOCH_DATE: Final[date] = date(2000, 1, 1)
+_EPOCH: Final[datetime] = datetime(2000, 1, 1)
+_EPOCH_TZ: Final[datetime] = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+_ALIASES: Final[MappingProxyType] = MappingProxyType({
+    'smallint': 'int2',
+    'int': 'int4',
+    'integer': 'int4',
+    'bigint': 'int8',
+    'real': 'float4',
+    'double precision': 'float8',
+    'boolean': 'bool',
+    'decimal': 'numeric',
+    'varchar': 'text',
+    'character varying': 'text',
+    'char': 'text',
+    'character': 'text',
+    'bpchar': 'text',
+    'name': 'text',
+    'citext': 'text',
+    'timestamp without time zone': 'timestamp',
+    'timestamp with time zone': 'timestamptz',
+    'time without time zone': 'time',
+})
+
+
+def _microseconds(value: timedelta) -> int:
+    return (value.days * 86400 + value.seconds) * 1_000_000 + value.microseconds
+
+
+def _binary_text(value: Any) -> bytes:
+    data = str(value).encode()
+    return _INT4.pack(len(data)) + data
+
+
+def _binary_bytea(value: bytes) -> bytes:
+    return _INT4.pack(len(value)) + bytes(value)
+
+
+def _binary_json(value: Any) -> bytes:
+    return _binary_text(value if isinstance(value, str) else json.dumps(value))
+
+
+def _binary_jsonb(value: Any) -> bytes:
+    data = b'\x01' + (value if isinstance(value, str) else json.dumps(value)).encode()
+    return _INT4.pack(len(data)) + data
+
+
+def _binary_timestamptz(value: datetime) -> bytes:
+    if value.tzinfo is None:
+        raise ValueError(value)
+    return _FIELD_INT8.pack(8, _microseconds(value - _EPOCH_TZ))
+
+
+def _binary_time(value: time) -> bytes:
+    if value.tzinfo is not None:
+        raise ValueError(value)
+    return _FIELD_INT8.pack(
+        8,
+        ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000 + value.microsecond,
+    )
+
+
+def _binary_numeric(value: Decimal | int | float) -> bytes:
+    value = Decimal(value) if isinstance(value, int) else Decimal(str(value))
+    sign, digits, exponent = value.as_tuple()
+    if not isinstance(exponent, int):  # NaN or infinity
+        if exponent != 'n':
+            raise ValueError(value)
+        return _INT4.pack(8) + _INT2.pack(0) * 2 + b'\xc0\x00' + _INT2.pack(0)
+
+    dscale = max(-exponent, 0)
+    # decimal digits aligned to groups of 4 around the decimal point
+    integer_digits = len(digits) + exponent
+    pad_left = -integer_digits % 4
+    text = '0' * pad_left + ''.join(map(str, digits)) + '0' * max(exponent, 0)
+    text += '0' * (-len(text) % 4)
+    groups = [int(text[i:i + 4]) for i in range(0, len(text), 4)]
+    weight = (integer_digits + pad_left) // 4 - 1
+
+    while groups and not groups[-1]:
+        groups.pop()
+    while groups and not groups[0]:
+        groups.pop(0)
+        weight -= 1
+    if not groups:
+        weight = 0
+
+    data = b''.join([
+        _INT2.pack(len(groups)),
+        _INT2.pack(weight),
+        b'\x40\x00' if sign else b'\x00\x00',
+        _INT2.pack(dscale),
+        *(_INT2.pack(i) for i in groups),
+    ])
+    return _INT4.pack(len(data)) + data
+
+
+# codec returns the whole field: its length and data
+_BINARY: Final[MappingProxyType] = MappingProxyType({
+    'bool': lambda x: _FIELD_BOOL.pack(1, x),
+    'int2': lambda x: _FIELD_INT2.pack(2, x),
+    'int4': lambda x: _FIELD_INT4.pack(4, x),
+    'int8': lambda x: _FIELD_INT8.pack(8, x),
+    'float4': lambda x: _FIELD_FLOAT4.pack(4, x),
+    'float8': lambda x: _FIELD_FLOAT8.pack(8, x),
+    'numeric': _binary_numeric,
+    'text': _binary_text,
+    'bytea': _binary_bytea,
+    'json': _binary_json,
+    'jsonb': _binary_jsonb,
+    'uuid': lambda x: _INT4.pack(16) + x.bytes,
+    'date': lambda x: _FIELD_INT4.pack(4, (x - _EPOCH_DATE).days),
+    'time': _binary_time,
+    'timestamp': lambda x: _FIELD_INT8.pack(8, _microseconds(x - _EPOCH)),
+    'timestamptz': _binary_timestamptz,
+})
+
+
+def _text_bool(value: bool) -> str:
+    return 't' if value else 'f'
+
+
+def _text_float(value: float) -> str:
+    if value != value:
+        return 'NaN'
+    elif value in (float('inf'), float('-inf')):
+        return 'Infinity' if value > 0 else '-Infinity'
+    return repr(value)
+
+
+def _text_json(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _text_timestamptz(value: datetime) -> str:
+    if value.tzinfo is None:
+        raise ValueError(value)
+    return value.isoformat()
+
+
+# codec returns the value as postgres reads it, before escaping of text/csv format
+_TEXT: Final[MappingProxyType] = MappingProxyType({
+    'bool': _text_bool,
+    'float4': _text_float,
+    'float8': _text_float,
+    'bytea': lambda x: '\\x' + bytes(x).hex(),
+    'json': _text_json,
+    'jsonb': _text_json,
+    'date': date.isoformat,
+    'time': time.isoformat,
+    'timestamp': datetime.isoformat,
+    'timestamptz': _text_timestamptz,
+})
+
+# fixed size binary field: normalized type -> big-endian numpy dtype of its data
+_BINARY_FIXED: Final[MappingProxyType] = MappingProxyType({
+    'bool': '?',
+    'int2': '>i2',
+    'int4': '>i4',
+    'int8': '>i8',
+    'float4': '>f4',
+    'float8': '>f8',
+})
+
+_TEXT_ESCAPES: Final[dict[int, str]] = str.maketrans({
+    '\\': '\\\\',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\t': '\\t',
+})
+_CSV_SPECIAL: Final[frozenset[str]] = frozenset(',"\n\r\\')
+
+
+def _normalize_type(type_: str) -> str:
+    name = type_.split('(', 1)[0].strip().lower()
+    if name.endswith(']'):
+        raise ValueError(type_)  # arrays aren't supported
+    return _ALIASES.get(name, name)
+
+
+def _csv_quote(value: str) -> str:
+    if not value or not _CSV_SPECIAL.isdisjoint(value) or value.strip() != value:
+        return '"%s"' % value.replace('"', '""')
+    return value
+
+
+@lru_cache(maxsize=64)
+def _row_encoder(types: tuple[str, ...], format: str) -> Callable[[Sequence], bytes]:
+    """Encoder of a single row, cached per process, so pool workers build it once"""
+    names = [_normalize_type(i) for i in types]
+    size = len(names)
+
+    if format == 'binary':
+        if unknown := [types[index] for index, i in enumerate(names) if i not in _BINARY]:
+            raise ValueError(unknown)
+        codecs = [_BINARY[i] for i in names]
+        count = _INT2.pack(size)
+
+        def encode(row: Sequence) -> bytes:
+            if len(row) != size:
+                raise ValueError((len(row), size))
+            parts = [count]
+            for codec, value in zip(codecs, row, strict=True):
+                parts.append(_NULL_FIELD if value is None else codec(value))
+            return b''.join(parts)
+
+        return encode
+
+    codecs = [_TEXT.get(i, str) for i in names]
+    if format == 'text':
+        sep, null = '\t', '\\N'
+
+        def escape(value: str) -> str:
+            return value.translate(_TEXT_ESCAPES)
+    else:
+        sep, null, escape = ',', '', _csv_quote
+
+    def encode(row: Sequence) -> bytes:
+        if len(row) != size:
+            raise ValueError((len(row), size))
+        return (sep.join([
+            null if value is None else escape(codec(value))
+            for codec, value in zip(codecs, row, strict=True)
+        ]) + '\n').encode()
+
+    return encode
+
+
+def _encode_rows(types: tuple[str, ...], format: str, rows: list[Sequence]) -> bytes:
+    encode = _row_encoder(types, format)
+    return b''.join([encode(i) for i in rows])
+
+
+def _encode_columns(columns: list, dtype, batch_size: int) -> Iterator[bytes]:
+    import numpy as np
+
+    count = len(columns[0])
+    rows = np.empty(min(count, batch_size), dtype=dtype)
+    rows['count'] = len(columns)
+    for index in range(len(columns)):
+        rows['size%d' % index] = dtype['value%d' % index].itemsize
+
+    for start in range(0, count, batch_size):
+        stop = min(start + batch_size, count)
+        batch = rows[:stop - start]
+        for index, col in enumerate(columns):
+            batch['value%d' % index] = col[start:stop]
+        yield batch.tobytes()
+
+
+class CopyEncoder:
+    """
+    Rows to `COPY ... FROM STDIN` data of the given format, with a codec per column type.
+    Yields chunks of `chunk_size` bytes (the last one can be shorter),
+    rows are read lazily and can span chunks, as COPY protocol allows it.
+    Binary format supports bool, int2/4/8, float4/8, numeric, text types, bytea,
+    json/jsonb, uuid, date, time, timestamp, timestamptz; text and csv take any type.
+    """
+
+    def __init__(
+        self,
+        types: Sequence[str],
+        format: TypeLiteral['binary', 'text', 'csv'] = 'binary',
+        chunk_size: int = 1 << 16,
+    ):
+        if format not in FORMATS:
+            raise ValueError(format)
+        if chunk_size < 1:
+            raise ValueError(chunk_size)
+        if isinstance(types, str) or not types:
+            raise ValueError(types)
+
+        self.types = tuple(types)
+        self.format = format
+        self.chunk_size = chunk_size
+        _row_encoder(self.types, format)  # validate types early
+
+    def encode(
+        self,
+        rows: Iterable[Sequence],
+        executor: Executor | None = None,
+        batch_size: int = 10_000,
+        prefetch: int = 4,
+    ) -> Iterator[bytes]:
+        """
+        With `executor` (e.g. ProcessPoolExecutor) rows are encoded in batches of `batch_size`
+        on its workers, at most `prefetch` batches ahead of the consumer.
+        """
+        return self._chunks(self._encode_batches(rows, executor, batch_size, prefetch))
+
+    def encode_columns(self, columns: Sequence, batch_size: int = 65536) -> Iterator[bytes]:
+        """
+        Binary data from columns of the same length: numpy arrays, array.array, memoryview
+        or anything numpy.asarray takes. Rows are packed by numpy, `batch_size` at a time,
+        without a python object per value. Requires numpy; fixed size types only
+        (bool, int2/4/8, float4/8), no NULLs, column dtype must cast to its type safely.
+        """
+        import numpy as np
+
+        if self.format != 'binary':
+            raise ValueError(self.format)
+        if unknown := [i for i in self.types if _normalize_type(i) not in _BINARY_FIXED]:
+            raise ValueError(unknown)
+        if isinstance(columns, str) or len(columns) != len(self.types):
+            raise ValueError(len(columns))
+
+        formats = [_BINARY_FIXED[_normalize_type(i)] for i in self.types]
+        columns = [np.asarray(i) for i in columns]
+        if bad := [i.shape for i in columns if i.ndim != 1 or len(i) != len(columns[0])]:
+            raise ValueError(bad)
+        if bad := [
+            (str(col.dtype), type_)
+            for col, type_, fmt in zip(columns, self.types, formats, strict=True)
+            if not np.can_cast(col.dtype, fmt, casting='safe')
+        ]:
+            raise TypeError(bad)
+
+        # row: fields count, then length and value of every field
+        dtype = np.dtype([('count', '>i2')] + [
+            item
+            for index, fmt in enumerate(formats)
+            for item in (('size%d' % index, '>i4'), ('value%d' % index, fmt))
+        ])
+        return self._chunks(_encode_columns(columns, dtype, batch_size))
+
+    def _chunks(self, data: Iterable[bytes]) -> Iterator[bytes]:
+        buf = bytearray()
+        size = self.chunk_size
+        if self.format == 'binary':
+            buf += BINARY_HEADER
+
+        for item in data:
+            buf += item
+            if len(buf) >= size:
+                view = memoryview(buf)
+                end = len(buf) - len(buf) % size
+                for i in range(0, end, size):
+                    yield bytes(view[i:i + size])
+                view.release()
+                del buf[:end]
+
+        if self.format == 'binary':
+            buf += BINARY_TRAILER
+        for i in range(0, len(buf), size):
+            yield bytes(buf[i:i + size])
+
+    def _encode_batches(
+        self,
+        rows: Iterable[Sequence],
+        executor: Executor | None,
+        batch_size: int,
+        prefetch: int,
+    ) -> Iterator[bytes]:
+        rows = iter(rows)
+        if executor is None:
+            encode = _row_encoder(self.types, self.format)
+            for row in rows:
+                yield encode(row)
+            return
+
+        pending = deque()
+        while batch := list(islice(rows, batch_size)):
+            pending.append(executor.submit(_encode_rows, self.types, self.format, batch))
+            if len(pending) >= prefetch:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
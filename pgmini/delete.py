@@ -1,9 +1,10 @@
 import attrs
 
+from .clauses import Clauses, to_clauses
 from .column import prepare_column
 from .subquery import Subquery
 from .table import Table
-from .utils import CTX_CTE, CompileABC, build_returning, build_where, build_with
+from .utils import CTX_STATE, CompileABC, build_returning, build_where, build_with, evolve
 
 
 def _convert_returning(value):
@@ -14,25 +15,26 @@ def _convert_returning(value):
 class Delete(CompileABC):
     _table: Table = attrs.field(alias='table')
     _with: tuple[Subquery, ...] = attrs.field(alias='x_with', factory=tuple)
-    _where: tuple[CompileABC, ...] = attrs.field(alias='x_where', factory=tuple)
+    _where: Clauses = attrs.field(alias='x_where', converter=to_clauses, factory=Clauses)
     _returning: tuple[CompileABC, ...] = attrs.field(alias='x_returning', factory=tuple)
 
     def Where(self, *statements: CompileABC):
         """New statements will be added to old ones"""
-        return attrs.evolve(self, x_where=self._where + statements)
+        return evolve(self, x_where=self._where + statements)
 
     def Returning(self, *columns):
-        return attrs.evolve(self, x_returning=columns)
+        return evolve(self, x_returning=columns)
 
     def Subquery(self, alias: str, materialized: bool = False) -> Subquery:
         return Subquery(self, alias=alias, materialized=materialized)
 
     def _build(self, params: list | dict) -> str:
         parts = []
+        state = CTX_STATE.get()
         if self._with:
-            if CTX_CTE.get():
+            if state.cte:
                 raise ValueError
-            CTX_CTE.set(self._with)
+            state.cte = self._with
             parts.append(build_with(self._with, params))
 
         parts.append('DELETE FROM %s' % self._table._name)
@@ -1,12 +1,11 @@
-import attrs
-
 from .marks import Marks
+from .utils import evolve
 
 
 class DistinctMX:
     def Distinct(self):
         if self._marks:
-            marks = attrs.evolve(self._marks, distinct=True)
+            marks = evolve(self._marks, distinct=True)
         else:
             marks = Marks(distinct=True)
-        return attrs.evolve(self, x_marks=marks)
+        return evolve(self, x_marks=marks)
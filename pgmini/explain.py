@@ -0,0 +1,118 @@
+from typing import Any, Literal as TypeLiteral
+
+import attrs
+
+from .delete import Delete
+from .insert import Insert
+from .param import Param
+from .plan import parse_plan
+from .select import Select, _keeps_rows
+from .table import Table
+from .update import Update
+from .utils import evolve
+from .writer import WriterABC
+
+
+@attrs.frozen
+class Explain(WriterABC):
+    """
+    `EXPLAIN (options) query`, params of the query are built as usual.
+    Mind that with analyze=True the query is executed, for Insert/Update/Delete too.
+    JSON output is parsed by pgmini.plan.parse_plan.
+    """
+
+    _query: Select | Insert | Update | Delete = attrs.field(
+        alias='query',
+        validator=attrs.validators.instance_of((Select, Insert, Update, Delete)),
+    )
+    _analyze: bool = attrs.field(
+        alias='analyze',
+        validator=attrs.validators.in_({True, False}),
+        default=False,
+    )
+    _buffers: bool = attrs.field(
+        alias='buffers',
+        validator=attrs.validators.in_({True, False}),
+        default=False,
+    )
+    _format: TypeLiteral['text', 'json', 'yaml', 'xml'] = attrs.field(
+        alias='format',
+        validator=attrs.validators.in_({'text', 'json', 'yaml', 'xml'}),
+        default='json',
+    )
+    _settings: bool = attrs.field(
+        alias='settings',
+        validator=attrs.validators.in_({True, False}),
+        default=False,
+    )
+
+    def _write(self, buf: list[str], params: list | dict) -> None:
+        options = [
+            name
+            for name, enabled in (
+                ('ANALYZE', self._analyze),
+                ('BUFFERS', self._buffers),
+                ('SETTINGS', self._settings),
+            )
+            if enabled
+        ]
+        options.append('FORMAT %s' % self._format.upper())
+        buf.append('EXPLAIN (%s) ' % ', '.join(options))
+        self._query._write(buf, params)
+
+
+def plan_rows(plan: str | bytes | list | dict) -> int:
+    """
+    Estimated rows of the top node of `EXPLAIN (FORMAT JSON)` output:
+    json text or already decoded document (drivers return either of them).
+    """
+    return int(parse_plan(plan).root.plan_rows)
+
+
+@attrs.frozen
+class CountEstimate(WriterABC):
+    """
+    Planner estimate of rows count, a cheap alternative to count(*) of large tables:
+    `reltuples` of pg_class for a table or a select of all its rows,
+    `EXPLAIN (FORMAT JSON)` of a filtered select (see Select.ToCount for what is dropped).
+    The fetched value is turned into a number by `parse`.
+    """
+
+    _query: Table | Select = attrs.field(
+        alias='query',
+        validator=attrs.validators.instance_of((Table, Select)),
+    )
+
+    def parse(self, value: Any) -> int:
+        """
+        Rows count from the single value of the result: `est.parse(await conn.fetchval(...))`.
+        For a table it's -1 until the table is vacuumed or analyzed (PostgreSQL 14+).
+        """
+        if self._table() is not None:
+            return int(value)
+        return plan_rows(value)
+
+    def _table(self) -> Table | None:
+        q = self._query
+        if isinstance(q, Table):
+            return q
+        elif (
+            len(q._from) == 1
+            and isinstance(q._from[0], Table)
+            and not (
+                q._with or q._join or q._where or q._group_by or q._having
+                or q._distinct_on or q._union
+            )
+            and _keeps_rows(q._columns)
+        ):
+            return q._from[0]
+        return None
+
+    def _write(self, buf: list[str], params: list | dict) -> None:
+        if (table := self._table()) is not None:
+            buf.append('SELECT reltuples::bigint FROM pg_class WHERE oid = ')
+            Param(table._name).Cast('regclass')._write(buf, params)
+            return
+
+        q = self._query
+        Explain(evolve(q._derived_base(), x_with=q._with))._write(buf, params)
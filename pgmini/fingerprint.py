@@ -0,0 +1,227 @@
+from hashlib import blake2b
+from operator import attrgetter
+from typing import Any, Callable, Final, Iterator
+
+import attrs
+
+from .clauses import Clauses
+from .param import Param
+from .utils import CompileABC, FromABC
+from .vectors import vector_type
+
+
+# not an identifier, so it can't collide with dynamic columns stored in __dict__
+_KEY: Final[str] = 'pgmini.fingerprint'
+_DIGEST_KEY: Final[str] = 'pgmini.fingerprint.digest'
+_NODES: Final[tuple] = (CompileABC, FromABC)
+_NULL_BOOL: Final[tuple] = (type(None), bool)
+
+
+def _fields(node) -> tuple:
+    if isinstance(node, Param):
+        # value doesn't change sql, except of None/bool which switches `=` to `IS`
+        # and vectors which are cast to the array of their items type
+        if isinstance(node._value, _NULL_BOOL):
+            kind = type(node._value).__name__
+        else:
+            kind = vector_type(node._value)
+        return node._marks, kind
+    elif attrs.has(type(node)):
+        return tuple(getattr(node, i.name) for i in attrs.fields(type(node)))
+    return ()
+
+
+def _iter_nodes(value) -> Iterator:
+    if isinstance(value, _NODES):
+        yield value
+    elif isinstance(value, (tuple, list, Clauses)):
+        for i in value:
+            yield from _iter_nodes(i)
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            yield from _iter_nodes(k)
+            yield from _iter_nodes(v)
+    elif isinstance(value, slice):
+        yield from _iter_nodes((value.start, value.stop, value.step))
+    elif attrs.has(type(value)):
+        yield from _iter_nodes(_fields(value))
+
+
+class _Seq:
+    """Token of a tuple/list/Clauses followed by its length and items"""
+
+
+class _Map:
+    """Token of a dict followed by its length and items"""
+
+
+class _Ref:
+    """Token of a table/subquery/CTE met before followed by its index"""
+
+
+class _Later:
+    """Token of a field or item whose tokens follow after those of its siblings"""
+
+
+# added as they are, other values are typed: 1 == 1.0 == True and 0.0 == -0.0, their sql differs
+_ATOMS: Final[frozenset[type]] = frozenset((str, int, type(None)))
+_EMPTY: Final[tuple] = ()
+_SCALARS: Final[frozenset[type]] = frozenset((str, int, float))
+_SEQS: Final[tuple] = (tuple, list, Clauses)
+
+# value kinds, decided once per class
+_NODE, _PARAM, _SOURCE, _SEQ, _MAP, _SLICE, _ARRAY, _VIEW, _VALUE = range(9)
+_CLASSES: dict[type, tuple[int, Callable[[Any], tuple]]] = {}
+_NAMES: dict[type, tuple[str]] = {}
+# classes defined in a function are new on every call, don't keep them all
+_MAX_CLASSES: Final[int] = 4096
+
+
+def _no_fields(value) -> tuple:
+    return ()
+
+
+def _kind(cls: type) -> int:
+    if issubclass(cls, Param):
+        return _PARAM
+    elif issubclass(cls, FromABC):
+        return _SOURCE
+    elif issubclass(cls, CompileABC) or attrs.has(cls):
+        return _NODE
+    elif issubclass(cls, _SEQS):
+        return _SEQ
+    elif issubclass(cls, dict):
+        return _MAP
+    elif cls is slice:
+        return _SLICE
+    elif cls.__name__ == 'ndarray' and cls.__module__ == 'numpy':
+        return _ARRAY
+    elif cls is memoryview:
+        return _VIEW
+    return _VALUE
+
+
+def _class_info(cls: type) -> tuple[int, Callable[[Any], tuple]]:
+    """Kind of values of the class and getter of their fields in reversed order"""
+    names = [i.name for i in reversed(attrs.fields(cls))] if attrs.has(cls) else []
+    if not names:
+        getter = _no_fields
+    elif len(names) == 1:
+        name = names[0]
+        getter = lambda node: (getattr(node, name),)  # noqa: E731
+    else:
+        getter = attrgetter(*names)
+
+    if len(_CLASSES) >= _MAX_CLASSES:
+        _CLASSES.clear()
+    res = _CLASSES[cls] = (_kind(cls), getter)
+    return res
+
+
+def _other(value, kind: int) -> tuple[tuple, Any]:
+    """Tokens and reversed children of a value which is not a node or a sequence"""
+    if kind == _MAP:
+        return (_Map, len(value)), reversed([i for pair in value.items() for i in pair])
+    elif kind == _SLICE:
+        return (slice,), (value.step, value.stop, value.start)
+    elif kind == _ARRAY:
+        return (type(value), value.dtype.str, value.shape, value.tobytes()), ()
+    elif kind == _VIEW:
+        return (type(value), value.format, value.shape, value.tobytes()), ()
+    # numbers, decimals, dates etc.: equal values may differ in sql, e.g. 1.0 and 1.00
+    return (type(value), repr(value)), ()
+
+
+def _walk(item: CompileABC | FromABC) -> tuple[tuple, tuple[Param, ...]]:
+    """
+    Structure and params of the tree in a single pass, memoized on the root.
+    The tree is flattened to tokens: classes, field values and lengths, so equal trees
+    give equal tuples, cheap to hash and compare. Tables, subqueries and CTEs met again
+    are tokens of their first index, since sql depends on which of them are the same object:
+    a column of the only FROM table has no table prefix, a CTE of WITH is referenced by name.
+    """
+    if (res := item.__dict__.get(_KEY)) is not None:
+        return res
+
+    tokens: list = []
+    add = tokens.append
+    params: list[Param] = []
+    sources: dict[int, int] = {}
+    classes, atoms = _CLASSES, _ATOMS
+    # explicit stack instead of recursion: expressions built in loops can be very deep
+    stack = [item]
+    push, pop = stack.append, stack.pop
+    while stack:
+        value = pop()
+        kind, getter = classes.get(type(value)) or _class_info(type(value))
+        if kind == _NODE:
+            add(type(value))
+            children = getter(value)
+        elif kind == _SEQ:
+            value = tuple(value)
+            tokens += (_Seq, len(value))
+            children = reversed(value)
+        elif kind == _PARAM:
+            params.append(value)
+            add(type(value))
+            # reversed _fields, without a call for the most common values
+            children = (
+                (None, value._marks) if type(value._value) in _SCALARS
+                else reversed(_fields(value))
+            )
+        elif kind == _SOURCE:
+            if (index := sources.get(id(value))) is not None:
+                tokens += (_Ref, index)
+                continue
+            sources[id(value)] = len(sources)
+            add(type(value))
+            children = getter(value)
+        else:
+            other, children = _other(value, kind)
+            tokens += other
+
+        # children come in reversed order: strings and empty tuples are added at once,
+        # others are marked and pushed, so they are popped in the original order
+        for child in children:
+            if type(child) in atoms or child is _EMPTY:
+                add(child)
+            else:
+                add(_Later)
+                push(child)
+
+    res = item.__dict__[_KEY] = (tuple(tokens), tuple(params))
+    return res
+
+
+def _name(cls: type) -> tuple[str]:
+    # in a tuple, so it's never equal to a string value
+    if len(_NAMES) >= _MAX_CLASSES:
+        _NAMES.clear()
+    res = _NAMES[cls] = ('%s.%s' % (cls.__module__, cls.__qualname__),)
+    return res
+
+
+def structure(item: CompileABC | FromABC) -> tuple:
+    """Tokens of the query structure: equal for trees which produce the same sql"""
+    return _walk(item)[0]
+
+
+def fingerprint(item: CompileABC | FromABC) -> str:
+    """
+    Hash of the query structure: the same for trees which produce the same sql,
+    regardless of parameters values. Calculated once per query object.
+    """
+    if (res := item.__dict__.get(_DIGEST_KEY)) is None:
+        # classes by name: repr of a class is far slower than of a string
+        tokens = [
+            (_NAMES.get(i) or _name(i)) if isinstance(i, type) else i
+            for i in structure(item)
+        ]
+        res = blake2b(repr(tokens).encode(), digest_size=16).hexdigest()
+        item.__dict__[_DIGEST_KEY] = res
+    return res
+
+
+def collect_params(item: CompileABC | FromABC) -> tuple[Param, ...]:
+    """Params in structural order: the same positions for trees with equal structure"""
+    return _walk(item)[1]
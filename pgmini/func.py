@@ -2,25 +2,29 @@ from typing import Callable, Final
 
 import attrs
 
-from .alias import AliasMX, extract_alias
+from .alias import AliasMX
 from .cast import CastMX
-from .column import Column, prepare_column
+from .clauses import Clauses, to_clauses
+from .column import Column, ColumnsMX, prepare_column
 from .distinct import DistinctMX
 from .literal import Literal
 from .marks import MARKS_FIELD, MARKS_TYPE
 from .operation import OperationMX
 from .order_by import OrderByMX, do_order_by
 from .utils import (
-    CTX_ALIAS_ONLY,
+    CTX_STATE,
     ITERABLES,
+    PREC_ATOM,
+    PREC_COMPOUND,
     STAR_SIGN,
     CompileABC,
     FromABC,
     SelectMX,
-    build_where,
-    set_context,
-    wrap_brackets_if_needed,
+    evolve,
+    write_column,
+    write_where,
 )
+from .writer import MarkedWriterABC, write_joined
 
 
 __all__ = ['F', 'Func']
@@ -71,54 +75,58 @@ def _converter_params(value):
 
 
 @attrs.frozen(eq=False, unsafe_hash=True)
-class _Func(CompileABC, FromABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
+class _Func(
+    MarkedWriterABC, FromABC, ColumnsMX, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX,
+    SelectMX,
+):
     _name: str = attrs.field(alias='x_name', converter=lambda x: x.upper())
     _params: tuple[CompileABC, ...] = attrs.field(alias='x_params', converter=_converter_params)
     _over: Over | None = attrs.field(alias='x_over', default=None)
     _where: tuple[CompileABC, ...] = attrs.field(alias='x_where', factory=tuple)
-    _order_by: tuple[CompileABC, ...] = attrs.field(alias='x_order_by', factory=tuple)
+    _order_by: Clauses = attrs.field(alias='x_order_by', converter=to_clauses, factory=Clauses)
     _marks: MARKS_TYPE = MARKS_FIELD
 
     def Over(self, *, partition_by=None, order_by=None):
-        return attrs.evolve(self, x_over=Over(partition_by=partition_by, order_by=order_by))
+        return evolve(self, x_over=Over(partition_by=partition_by, order_by=order_by))
 
     def Where(self, *statements: CompileABC):
-        return attrs.evolve(self, x_where=statements)
+        return evolve(self, x_where=statements)
 
     def OrderBy(self, *statements):
         return do_order_by(self, statements)
 
-    def _build(self, params: list | dict) -> str:
-        if alias := extract_alias(self):
-            return alias
-
-        args = ', '.join(
-            (
-                STAR_SIGN
-                if isinstance(i, Literal) and i._value == STAR_SIGN and self._name == 'COUNT'
-                else wrap_brackets_if_needed(i._build(params), obj=i)
-            )
-            for i in self._params
-        )
+    def _write_value(self, buf: list[str], params: list | dict) -> None:
+        buf.append('%s(' % self._name)
+        for index, i in enumerate(self._params):
+            if index:
+                buf.append(', ')
+            if isinstance(i, Literal) and i._value == STAR_SIGN and self._name == 'COUNT':
+                buf.append(STAR_SIGN)
+            else:
+                write_column(buf, i, params)
+
         if self._order_by:
-            with set_context({CTX_ALIAS_ONLY: True}):
-                if self._order_by:
-                    args = '%s ORDER BY %s' % (
-                        args,
-                        ', '.join(i._build(params) for i in self._order_by)
-                    )
-
-        parts = ['%s(%s)' % (self._name, args)]
+            state = CTX_STATE.get()
+            alias_only = state.alias_only
+            state.alias_only = True
+            buf.append(' ORDER BY ')
+            write_joined(buf, self._order_by, params)
+            state.alias_only = alias_only
+        buf.append(')')
+
         if self._over is not None:
-            parts.append(self._over.build(params))
+            buf.append(' ')
+            buf.append(self._over.build(params))
 
         if self._where:
-            parts.append('FILTER (%s)' % build_where(self._where, params=params))
+            buf.append(' FILTER (')
+            write_where(buf, self._where, params=params)
+            buf.append(')')
 
-        res = ' '.join(parts)
-        if self._marks:
-            res = self._marks.build(res)
-        return res
+    def _precedence(self) -> int:
+        if self._over is not None or self._where:
+            return PREC_COMPOUND
+        return PREC_ATOM
 
     def _get_from_statement(self, params: list) -> str:
         return self._build(params)
@@ -128,11 +136,8 @@ class _Func(CompileABC, FromABC, CastMX, AliasMX, DistinctMX, OrderByMX, Operati
 
     STAR: Final[Column] = Column(STAR_SIGN, table=None)
 
-    def __getattribute__(self, item: str) -> Column:
-        try:
-            return object.__getattribute__(self, item)
-        except AttributeError:
-            return Column(item, table=None)
+    def _columns_table(self) -> None:
+        return None
 
 
 class FuncCls:
@@ -1,24 +1,25 @@
-from typing import Any, Iterable
+from typing import Any, Iterable, Sequence
 
 import attrs
 
 from .column import Column, prepare_column
+from .func import F
+from .param import Param
 from .select import Select
 from .subquery import Subquery
 from .table import Table
 from .utils import (
-    CTX_CTE,
-    CTX_DISABLE_TABLE_IN_COLUMN,
-    CTX_FORCE_CAST_BRACKETS,
-    RE_FUNC_PARENTHESIZED,
-    RE_NEED_BRACKETS,
-    RE_PARENTHESIZED,
+    CTX_STATE,
+    PREC_ATOM,
     CompileABC,
     build_returning,
     build_set,
     build_with,
-    set_context,
+    evolve,
+    get_precedence,
 )
+from .vectors import is_ndarray, vector_kind, vector_type
+from .writer import WriterABC, write_joined
 
 
 def _convert_do_update(value):
@@ -26,14 +27,14 @@ def _convert_do_update(value):
         return {k: prepare_column(v) for k, v in value.items()}
 
 
-def _wrap_index_elements_with_brackets(value: str) -> str:
-    if (
-        RE_NEED_BRACKETS.search(value)
-        and not RE_PARENTHESIZED.fullmatch(value)
-        and not RE_FUNC_PARENTHESIZED.fullmatch(value)
-    ):
-        value = '(%s)' % value
-    return value
+def _build_index_element(item: str | CompileABC, params: list | dict) -> str:
+    if not isinstance(item, CompileABC):
+        return item
+
+    res = item._build(params)
+    if get_precedence(item) < PREC_ATOM:
+        res = '(%s)' % res
+    return res
 
 
 @attrs.frozen(kw_only=True)
@@ -68,23 +69,22 @@ class OnConflict:
         if self.constraint is not None:
             res.append('ON CONSTRAINT %s' % self.constraint)
 
+        state = CTX_STATE.get()
+        disable_table_in_column = state.disable_table_in_column
+        state.disable_table_in_column = True
+
         if self.index_elements is not None:
-            with set_context({
-                CTX_FORCE_CAST_BRACKETS: True,
-                CTX_DISABLE_TABLE_IN_COLUMN: True,
-            }):
-                res.append('(%s)' % ', '.join(
-                    _wrap_index_elements_with_brackets(
-                        i._build(params)
-                        if isinstance(i, CompileABC)
-                        else i
-                    )
-                    for i in self.index_elements
-                ))
+            force_cast_brackets = state.force_cast_brackets
+            state.force_cast_brackets = True
+            res.append('(%s)' % ', '.join(
+                _build_index_element(i, params) for i in self.index_elements
+            ))
+            state.force_cast_brackets = force_cast_brackets
 
         if self.index_where is not None:
-            with set_context({CTX_DISABLE_TABLE_IN_COLUMN: True}):
-                res.append('WHERE %s' % self.index_where._build(params))
+            res.append('WHERE %s' % self.index_where._build(params))
+
+        state.disable_table_in_column = disable_table_in_column
 
         if self.do_update is not None:
             res.append(
@@ -110,7 +110,7 @@ def _convert_values(value):
 
 
 @attrs.frozen
-class Insert(CompileABC):
+class Insert(WriterABC):
     _table: Table = attrs.field(alias='table')
     _columns: Iterable[str | Column] = attrs.field(alias='columns')
     _with: tuple[Subquery, ...] = attrs.field(alias='x_with', factory=tuple)
@@ -149,10 +149,66 @@ class Insert(CompileABC):
                     raise TypeError(bad)
 
     def Values(self, *rows):
-        return attrs.evolve(self, x_values=rows)
+        return evolve(self, x_values=rows)
 
     def Select(self, select: Select):
-        return attrs.evolve(self, x_select=select)
+        return evolve(self, x_select=select)
+
+    def Rows(self, rows: Iterable[Sequence], types: Sequence[str | None] | None = None):
+        """
+        Bulk insert as `SELECT * FROM unnest($1::type1[], $2::type2[], ...)`:
+        one array param per column, so sql is the same for any number of rows.
+        Rows can be a 2-d numpy array, its columns are passed as they are.
+        Type of None (or all types if None) is taken from the column of numpy array.
+        """
+        if is_ndarray(rows) and rows.ndim == 2:
+            if rows.shape[1] != len(self._columns):
+                raise ValueError((rows.shape[1], len(self._columns)))
+            return self._unnest([rows[:, i] for i in range(rows.shape[1])], types)
+
+        rows = rows if isinstance(rows, (list, tuple)) else list(rows)
+        if bad := [i for i in rows if len(i) != len(self._columns)]:
+            raise ValueError((len(bad[0]), len(self._columns)))
+        if rows:
+            columns = [list(i) for i in zip(*rows, strict=True)]
+        else:
+            columns = [[] for _ in self._columns]
+        return self._unnest(columns, types)
+
+    def Columns(self, types: Sequence[str | None] | None, /, **values: Sequence):
+        """
+        Same as Rows with values given per column: `Columns(types, name=[...], status=[...])`.
+        numpy arrays, array.array and memoryview are passed as they are.
+        """
+        names = [col._name if isinstance(col, Column) else col for col in self._columns]
+        if values.keys() != set(names):
+            raise ValueError(sorted(values.keys() ^ set(names)))
+        columns = [
+            values[i] if vector_kind(values[i]) is not None else list(values[i])
+            for i in names
+        ]
+        if len({len(i) for i in columns}) > 1:
+            raise ValueError({name: len(i) for name, i in zip(names, columns, strict=True)})
+        return self._unnest(columns, types)
+
+    def _unnest(self, columns: list[Sequence], types: Sequence[str | None] | None):
+        if types is None:
+            types = [None] * len(self._columns)
+        elif isinstance(types, str) or len(types) != len(self._columns):
+            raise ValueError(types)
+
+        types = [
+            vector_type(values) if type_ is None else type_
+            for values, type_ in zip(columns, types, strict=True)
+        ]
+        if None in types:
+            raise ValueError(types)
+
+        func = F.unnest(*(
+            Param(values).Cast('%s[]' % type_)
+            for values, type_ in zip(columns, types, strict=True)
+        ))
+        return evolve(self, x_select=Select(func.STAR).From(func))
 
     def OnConflict(
         self, *,
@@ -162,7 +218,7 @@ class Insert(CompileABC):
         do_update: dict | None = None,
         do_nothing: bool = False,
     ):
-        return attrs.evolve(self, x_on_conflict=OnConflict(
+        return evolve(self, x_on_conflict=OnConflict(
             constraint=constraint,
             index_elements=index_elements,
             index_where=index_where,
@@ -171,39 +227,48 @@ class Insert(CompileABC):
         ))
 
     def Returning(self, *columns):
-        return attrs.evolve(self, x_returning=columns)
+        return evolve(self, x_returning=columns)
 
     def Subquery(self, alias: str, materialized: bool = False) -> Subquery:
         return Subquery(self, alias=alias, materialized=materialized)
 
-    def _build(self, params: list | dict) -> str:
-        parts = []
+    def _write(self, buf: list[str], params: list | dict) -> None:
+        state = CTX_STATE.get()
         if self._with:
-            if CTX_CTE.get():
+            if state.cte:
                 raise ValueError
-            CTX_CTE.set(self._with)
-            parts.append(build_with(self._with, params))
-
-        with set_context({CTX_DISABLE_TABLE_IN_COLUMN: True}):
-            parts.append('INSERT INTO %s (%s)' % (
-                self._table._get_from_statement(params),
-                ', '.join(
-                    col._build(params) if isinstance(col, Column) else col
-                    for col in self._columns
-                ),
-            ))
+            state.cte = self._with
+            buf.append(build_with(self._with, params))
+            buf.append(' ')
+
+        disable_table_in_column = state.disable_table_in_column
+        state.disable_table_in_column = True
+        buf.append('INSERT INTO %s (%s)' % (
+            self._table._get_from_statement(params),
+            ', '.join(
+                col._build(params) if isinstance(col, Column) else col
+                for col in self._columns
+            ),
+        ))
+        state.disable_table_in_column = disable_table_in_column
 
         if self._values:
-            parts.append('VALUES %s' % ', '.join(
-                '(%s)' % ', '.join(i._build(params) for i in row)
-                for row in self._values
-            ))
+            buf.append(' VALUES ')
+            # rows are flat and many, so each one is joined on its own to keep the buffer short
+            row_buf = []
+            for index, row in enumerate(self._values):
+                if index:
+                    buf.append(', ')
+                write_joined(row_buf, row, params)
+                buf.append('(%s)' % ''.join(row_buf))
+                row_buf.clear()
 
         if self._select is not None:
-            parts.append(self._select._build(params))
+            buf.append(' ')
+            self._select._write(buf, params)
         if self._on_conflict is not None:
-            parts.append(self._on_conflict.build(params))
+            buf.append(' ')
+            buf.append(self._on_conflict.build(params))
         if self._returning:
-            parts.append(build_returning(self._returning, params=params))
-
-        return ' '.join(parts)
+            buf.append(' ')
+            buf.append(build_returning(self._returning, params=params))
@@ -10,7 +10,9 @@ from .distinct import DistinctMX
 from .marks import MARKS_FIELD, MARKS_TYPE
 from .operation import OperationMX
 from .order_by import OrderByMX
-from .utils import CompileABC, SelectMX
+from .utils import PREC_ATOM, PREC_COMPOUND, SelectMX
+from .vectors import join_vector, vector_kind
+from .writer import WriterABC
 
 
 _TYPES: Final[MappingProxyType] = MappingProxyType({
@@ -24,14 +26,25 @@ _TYPES: Final[MappingProxyType] = MappingProxyType({
 })
 
 
+# types whose repr() is the sql literal, so arrays of them are rendered by repr of the tuple
+_PLAIN_TYPES: Final[frozenset[type]] = frozenset([int, float])
+
+
 def _convert_value(value):
     if isinstance(value, (set, frozenset, list)):
         value = tuple(value)
     return value
 
 
+def _join_items(value: tuple) -> str:
+    if set(map(type, value)) <= _PLAIN_TYPES:
+        res = repr(value)[1:-1]
+        return res[:-1] if len(value) == 1 else res  # `(1,)`
+    return ', '.join([_TYPES[type(i)](i) for i in value])
+
+
 @attrs.frozen(repr=False, eq=False)
-class Literal(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
+class Literal(WriterABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
     _value: Any = attrs.field(alias='value', converter=_convert_value)
     _marks: MARKS_TYPE = MARKS_FIELD
 
@@ -40,23 +53,34 @@ class Literal(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, S
         if isinstance(value, tuple):
             if not value:
                 raise ValueError(value)
-            elif bad := [i for i in value if type(i) not in _TYPES]:
-                raise TypeError(bad)
+            elif not set(map(type, value)).issubset(_TYPES):
+                raise TypeError([i for i in value if type(i) not in _TYPES])
+        elif vector_kind(value) is not None and not len(value):
+            raise ValueError(value)
 
-    def _build(self, params: list | dict) -> str:
+    def _write(self, buf: list[str], params: list | dict) -> None:
         if alias := extract_alias(self):
-            return alias
+            buf.append(alias)
+            return
 
         if handler := _TYPES.get(type(self._value)):
             res = handler(self._value)
         elif isinstance(self._value, tuple):
-            res = "ARRAY[%s]" % ', '.join(_TYPES[type(i)](i) for i in self._value)
+            res = 'ARRAY[%s]' % _join_items(self._value)
+        elif kind := vector_kind(self._value):
+            # array.array or numpy array of numbers, it isn't copied
+            res = 'ARRAY[%s]' % join_vector(self._value, kind)
         else:
             raise TypeError('unhandled type %s' % type(self._value))
 
         if self._marks:
-            res = self._marks.build(res)
-        return res
+            res = self._marks.build(res, obj=self)
+        buf.append(res)
+
+    def _precedence(self) -> int:
+        if isinstance(self._value, (int, float)) and self._value < 0:
+            return PREC_COMPOUND  # unary minus
+        return PREC_ATOM
 
     def __repr__(self):
         res = 'Literal(%s)' % str(self._value)
@@ -31,17 +31,24 @@ class Marks:
             or self.distinct
         )
 
-    def build(self, value: str) -> str:
-        from .cast import build_cast
-        from .order_by import build_order_by
+    def affixes(self, obj) -> tuple[str, str]:
+        """Text around the value of marked object: `build(value)` is `prefix + value + suffix`"""
+        from .cast import cast_affixes
+        from .order_by import order_by_suffix
 
         if self.cast:
-            value = build_cast(value, cast=self.cast)
+            prefix, suffix = cast_affixes(self.cast, precedence=obj._precedence())
+        else:
+            prefix = suffix = ''
         if self.alias:
-            value = '%s AS %s' % (value, self.alias)
+            suffix = '%s AS %s' % (suffix, self.alias)
         if self.distinct:
-            value = 'DISTINCT %s' % value
-        return build_order_by(value, marks=self)
+            prefix = 'DISTINCT %s' % prefix
+        return prefix, suffix + order_by_suffix(self)
+
+    def build(self, value: str, obj) -> str:
+        prefix, suffix = self.affixes(obj)
+        return prefix + value + suffix
 
     def __repr__(self):
         items = []
@@ -57,13 +57,19 @@ class OperationMX:
         from .operations import OperationMath
         return OperationMath(self, right=other, operator='IS NOT')
 
-    def In(self, other):
-        from .operations import OperationIn
-        return OperationIn(self, items=other)
-
-    def NotIn(self, other):
-        from .operations import OperationIn
-        return OperationIn(self, items=other, operator='NOT IN')
+    def In(self, other, array_threshold: int | None = None, cast: str | None = None):
+        """
+        With `array_threshold` a list of at least that many values becomes `= ANY($1)`
+        with a single array param, so sql doesn't depend on the list length.
+        Array is casted to `cast[]`, by default to the declared type of a schema column.
+        """
+        from .operations import in_operation
+        return in_operation(self, other, 'IN', array_threshold=array_threshold, cast=cast)
+
+    def NotIn(self, other, array_threshold: int | None = None, cast: str | None = None):
+        """Same as In, array form is `<> ALL($1)`"""
+        from .operations import in_operation
+        return in_operation(self, other, 'NOT IN', array_threshold=array_threshold, cast=cast)
 
     def Any(self, other):
         from .operations import OperationAny
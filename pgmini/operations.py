@@ -2,17 +2,26 @@ from typing import Any, Final
 
 import attrs
 
-from .alias import AliasMX, extract_alias
+from .alias import AliasMX
 from .cast import CastMX
-from .column import prepare_column
+from .column import Column, declared_type, prepare_column
 from .distinct import DistinctMX
 from .literal import Literal
 from .marks import MARKS_FIELD, MARKS_TYPE
 from .operation import OperationMX
-from .operators import And, Or
 from .order_by import OrderByMX
 from .param import Param
-from .utils import ITERABLES, RE_NEED_BRACKETS, RE_PARENTHESIZED, CompileABC, SelectMX
+from .placeholder import Placeholder
+from .utils import (
+    CTX_STATE,
+    ITERABLES,
+    PREC_COMPOUND,
+    PREC_OPERATION,
+    CompileABC,
+    SelectMX,
+    get_precedence,
+)
+from .writer import ExpressionABC
 
 
 _NOT_SET = object()
@@ -26,14 +35,17 @@ def _convert_right(value):
 
 
 @attrs.frozen(eq=False)
-class Operation(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
+class Operation(ExpressionABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
     _left: Any = attrs.field(alias='left')
     _right: Any = attrs.field(alias='right', converter=_convert_right)
     _marks: MARKS_TYPE = MARKS_FIELD
 
-    def _build(self, params: list | dict) -> str:
+    def _parts(self, params: list | dict) -> tuple | list:
         raise NotImplementedError
 
+    def _precedence(self) -> int:
+        return PREC_OPERATION
+
 
 _NULL_BOOL: Final[tuple] = (type(None), bool)
 
@@ -46,23 +58,10 @@ def _check_null_or_bool(left, right) -> bool:
     return False
 
 
-def _build(elem, params: list | dict) -> str:
-    from .select import Select
-
-    res = elem._build(params)
-    if (
-        (isinstance(elem, Operation) and not RE_PARENTHESIZED.fullmatch(res))
-        or isinstance(elem, Select)
-    ):
-        res = '(%s)' % res
-    return res
-
-
-def _wrap_operation_member(item) -> str:
-    if isinstance(item, (And, Or)):
-        return '(%s)'
-    else:
-        return '%s'
+def _operand(elem) -> tuple:
+    if get_precedence(elem) <= PREC_OPERATION:
+        return '(', elem, ')'
+    return (elem,)
 
 
 @attrs.frozen(eq=False)
@@ -76,27 +75,13 @@ class OperationEquality(Operation):
         elif self._operator_is is _NOT_SET:
             raise ValueError
 
-    def _build(self, params: list | dict) -> str:
-        if alias := extract_alias(self):
-            return alias
-
+    def _parts(self, params: list | dict) -> tuple | list:
         if _check_null_or_bool(self._left, self._right):
             op = self._operator_is
         else:
             op = self._operator_equal
 
-        expr = '%s %s %s' % (
-            _wrap_operation_member(self._left),
-            op,
-            _wrap_operation_member(self._right),
-        )
-        res = expr % (
-            _build(self._left, params),
-            _build(self._right, params),
-        )
-        if self._marks:
-            res = self._marks.build(res)
-        return res
+        return *_operand(self._left), ' %s ' % op, *_operand(self._right)
 
 
 @attrs.frozen(eq=False)
@@ -107,61 +92,53 @@ class OperationMath(Operation):
         if self._operator is _NOT_SET:
             raise ValueError
 
-    def _build(self, params: list | dict) -> str:
-        if alias := extract_alias(self):
-            return alias
+    def _parts(self, params: list | dict) -> tuple | list:
+        return *_operand(self._left), ' %s ' % self._operator, *_operand(self._right)
 
-        expr = '%s %s %s' % (
-            _wrap_operation_member(self._left),
-            self._operator,
-            _wrap_operation_member(self._right),
-        )
-        res = expr % (
-            _build(self._left, params),
-            _build(self._right, params),
-        )
-        if self._marks:
-            res = self._marks.build(res)
-        return res
+
+def _convert_index(value):
+    if isinstance(value, slice):
+        return slice(*(
+            None if i is None else _convert_right(i)
+            for i in (value.start, value.stop, value.step)
+        ))
+    return _convert_right(value)
 
 
 @attrs.frozen(eq=False)
 class OperationSlice(Operation):
-    _right: Any = attrs.field(alias='right', default=_NOT_SET)
-
-    def _build(self, params: list | dict) -> str:
-        if alias := extract_alias(self):
-            return alias
+    _right: Any = attrs.field(alias='right', converter=_convert_index, default=_NOT_SET)
 
-        part1 = _build(self._left, params)
+    def _parts(self, params: list | dict) -> tuple | list:
+        # only column or server side param can be subscripted as is
         if (
-            self._left._marks is not None
-            and self._left._marks.cast is not None
-            and not RE_PARENTHESIZED.fullmatch(part1)
-        ) or RE_NEED_BRACKETS.search(part1):
-            part1 = '(%s)' % part1
-
-        if isinstance(self._right, slice):
-            part2 = '%s:%s' % (
-                (
-                    ''
-                    if self._right.start is None
-                    else _build(_convert_right(self._right.start), params)
-                ),
-                (
-                    ''
-                    if self._right.stop is None
-                    else _build(_convert_right(self._right.stop), params)
-                ),
+            (
+                isinstance(self._left, Column)
+                or (
+                    isinstance(self._left, (Param, Placeholder))
+                    and CTX_STATE.get().param_style.server_side
+                )
             )
+            and not self._left._marks
+        ):
+            res = [self._left, '[']
         else:
-            part2 = _build(_convert_right(self._right), params)
+            res = ['(', self._left, ')[']
 
-        res = '%s[%s]' % (part1, part2)
-        if self._marks:
-            res = self._marks.build(res)
+        if isinstance(self._right, slice):
+            if self._right.start is not None:
+                res.extend(_operand(self._right.start))
+            res.append(':')
+            if self._right.stop is not None:
+                res.extend(_operand(self._right.stop))
+        else:
+            res.extend(_operand(self._right))
+        res.append(']')
         return res
 
+    def _precedence(self) -> int:
+        return PREC_COMPOUND
+
 
 def _convert_items(value):
     from .select import Select
@@ -173,12 +150,11 @@ def _convert_items(value):
     else:
         if not isinstance(value, Select):
             raise TypeError(value)
-
     return value
 
 
 @attrs.frozen(eq=False)
-class OperationIn(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
+class OperationIn(ExpressionABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
     _left: Any = attrs.field(alias='left')
     _items: CompileABC | tuple[CompileABC, ...] = attrs.field(
         alias='items',
@@ -187,78 +163,86 @@ class OperationIn(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationM
     _marks: MARKS_TYPE = MARKS_FIELD
     _operator: str = attrs.field(alias='operator', default='IN')
 
-    def _build(self, params: list | dict) -> str:
-        if alias := extract_alias(self):
-            return alias
-
-        expr = '%s %s' % (_wrap_operation_member(self._left), self._operator)
-        res = expr % _build(self._left, params)
-
+    def _parts(self, params: list | dict) -> tuple | list:
+        res = [*_operand(self._left), ' %s (' % self._operator]
         if isinstance(self._items, tuple):
-            res = '%s (%s)' % (res, ', '.join(i._build(params) for i in self._items))
+            for index, i in enumerate(self._items):
+                if index:
+                    res.append(', ')
+                res.append(i)
         else:
-            res = '%s (%s)' % (res, self._items._build(params))
-
-        if self._marks:
-            res = self._marks.build(res)
+            res.append(self._items)
+        res.append(')')
         return res
 
+    def _precedence(self) -> int:
+        return PREC_OPERATION
+
 
 @attrs.frozen(eq=False)
-class OperationBetween(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
+class OperationBetween(
+    ExpressionABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX,
+):
     _left: Any = attrs.field(alias='left')
     _start: CompileABC = attrs.field(alias='start', converter=prepare_column)
     _end: CompileABC = attrs.field(alias='end', converter=prepare_column)
     _marks: MARKS_TYPE = MARKS_FIELD
 
-    def _build(self, params: list | dict) -> str:
-        if alias := extract_alias(self):
-            return alias
-
-        expr = '%s BETWEEN %%s AND %%s' % _wrap_operation_member(self._left)
-        res = expr % (
-            _build(self._left, params),
-            _build(self._start, params),
-            _build(self._end, params),
+    def _parts(self, params: list | dict) -> tuple | list:
+        return (
+            *_operand(self._left),
+            ' BETWEEN ',
+            *_operand(self._start),
+            ' AND ',
+            *_operand(self._end),
         )
-        if self._marks:
-            res = self._marks.build(res)
-        return res
+
+    def _precedence(self) -> int:
+        return PREC_OPERATION
 
 
 @attrs.frozen(eq=False)
 class OperationAny(Operation):
-    def _build(self, params: list | dict) -> str:
-        if alias := extract_alias(self):
-            return alias
-
-        expr = '%s = ANY(%%s)' % _wrap_operation_member(self._left)
-        res = expr % (
-            _build(self._left, params),
-            _build(self._right, params),
-        )
-        if self._marks:
-            res = self._marks.build(res)
-        return res
+    def _parts(self, params: list | dict) -> tuple | list:
+        return *_operand(self._left), ' = ANY(', *_operand(self._right), ')'
+
+
+@attrs.frozen(eq=False)
+class OperationAll(Operation):
+    def _parts(self, params: list | dict) -> tuple | list:
+        return *_operand(self._left), ' <> ALL(', *_operand(self._right), ')'
+
+
+def in_operation(
+    left: Any,
+    items: Any,
+    operator: str,
+    array_threshold: int | None,
+    cast: str | None,
+) -> Operation | OperationIn:
+    if (
+        array_threshold is not None
+        and isinstance(items, ITERABLES)
+        and items
+        and len(items) >= array_threshold
+        and not any(isinstance(i, SelectMX) for i in items)
+    ):
+        if cast is None and isinstance(left, Column):
+            cast = declared_type(left)
+        right = Param(list(items))
+        if cast is not None:
+            right = right.Cast('%s[]' % cast)
+        return (OperationAny if operator == 'IN' else OperationAll)(left, right=right)
+
+    return OperationIn(left, items=items, operator=operator)
 
 
 @attrs.frozen(eq=False)
 class OperationLike(Operation):
     _operator: str = attrs.field(alias='operator', default='LIKE')
 
-    def _build(self, params: list | dict) -> str:
-        if alias := extract_alias(self):
-            return alias
-
-        expr = '%s %%s %%s' % _wrap_operation_member(self._left)
-        res = expr % (
-            _build(self._left, params),
-            self._operator,
-            _build(self._right, params),
-        )
-        if self._marks:
-            res = self._marks.build(res)
-        return res
+    def _parts(self, params: list | dict) -> tuple | list:
+        return *_operand(self._left), ' %s ' % self._operator, *_operand(self._right)
 
 
 @attrs.frozen(eq=False)
@@ -269,15 +253,5 @@ class OperationCustom(Operation):
         if self._operator is _NOT_SET:
             raise ValueError
 
-    def _build(self, params: list | dict) -> str:
-        if alias := extract_alias(self):
-            return alias
-
-        expr = '%s %s %%s' % (_wrap_operation_member(self._left), self._operator)
-        res = expr % (
-            _build(self._left, params),
-            _build(self._right, params),
-        )
-        if self._marks:
-            res = self._marks.build(res)
-        return res
+    def _parts(self, params: list | dict) -> tuple | list:
+        return *_operand(self._left), ' %s ' % self._operator, *_operand(self._right)
@@ -1,16 +1,17 @@
 import attrs
 
-from .alias import AliasMX, extract_alias
+from .alias import AliasMX
 from .cast import CastMX
 from .distinct import DistinctMX
 from .marks import MARKS_FIELD, MARKS_TYPE
 from .operation import OperationMX
 from .order_by import OrderByMX
-from .utils import CompileABC, SelectMX
+from .utils import PREC_COMPOUND, PREC_STATEMENT, CompileABC, SelectMX, get_precedence
+from .writer import ExpressionABC
 
 
 @attrs.frozen(eq=False, repr=False, init=False)
-class And(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
+class And(ExpressionABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
     _statements: tuple[CompileABC, ...] = attrs.field(alias='statements')
     _marks: MARKS_TYPE = MARKS_FIELD
     _sql: str = 'AND'
@@ -25,23 +26,39 @@ class And(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, Selec
         self.__attrs_init__(**kwargs)
 
     def _build(self, params: list | dict) -> str | None:
-        if not self._statements:
-            return
-        elif alias := extract_alias(self):
-            return alias
+        if self._statements:
+            return super()._build(params)
 
-        if len(self._statements) == 1:
-            res = self._statements[0]._build(params)
-        else:
-            res = (' %s ' % self._sql).join(
-                '(%s)' % j if isinstance(i, Or) else j for i in self._statements
-                if (j := i._build(params)) is not None
-            )
+    def _expand(self, params: list | dict) -> tuple | list:
+        if self._statements:
+            return super()._expand(params)
+        return ()
 
-        if self._marks:
-            res = self._marks.build(res)
+    def _parts(self, params: list | dict) -> tuple | list:
+        if not self._statements:
+            return ()
+        elif len(self._statements) == 1:
+            return self._statements
+
+        sep = ' %s ' % self._sql
+        res = []
+        for i in self._statements:
+            if isinstance(i, And) and not i._statements:
+                continue  # builds nothing
+
+            if res:
+                res.append(sep)
+            if _needs_brackets(i):
+                res.extend(('(', i, ')'))
+            else:
+                res.append(i)
         return res
 
+    def _precedence(self) -> int:
+        if len(self._statements) == 1:
+            return get_precedence(self._statements[0])
+        return PREC_STATEMENT
+
     def __repr__(self):
         res = '%s(%s)' % (self.__class__.__name__, ', '.join(repr(i) for i in self._statements))
         if self._marks:
@@ -54,25 +71,30 @@ class Or(And):
     _sql: str = 'OR'
 
 
+def _needs_brackets(item: CompileABC) -> bool:
+    """Whether AND/OR operand has to be wrapped, e.g. nested OR or `a OR b` of Raw"""
+    if get_precedence(item) > PREC_STATEMENT:
+        return False
+
+    # a single statement is built as it is, so it's judged by what it holds
+    while isinstance(item, And) and len(item._statements) == 1:
+        item = item._statements[0]
+    if isinstance(item, And):
+        return isinstance(item, Or)  # AND binds tighter than OR, AND of AND is the same
+    return not isinstance(item, Not)  # NOT binds tighter than AND
+
+
 @attrs.frozen(eq=False, repr=False)
-class Not(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
+class Not(ExpressionABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
     _statement: CompileABC = attrs.field(alias='statement')
     _marks: MARKS_TYPE = MARKS_FIELD
 
-    def _build(self, params: list | dict) -> str:
+    def _parts(self, params: list | dict) -> tuple | list:
         from .operations import Operation
 
-        if alias := extract_alias(self):
-            return alias
-
         if isinstance(self._statement, Operation):
-            expr = 'NOT %s'
-        else:
-            expr = 'NOT (%s)'
-        res = expr % self._statement._build(params)
-        if self._marks:
-            res = self._marks.build(res)
-        return res
+            return 'NOT ', self._statement
+        return 'NOT (', self._statement, ')'
 
     def __repr__(self):
         res = '%s(%s)' % (self.__class__.__name__, repr(self._statement))
@@ -83,11 +105,8 @@ class Not(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, Selec
 
 @attrs.frozen(eq=False, repr=False)
 class Exists(Not):
-    def _build(self, params: list | dict) -> str:
-        if alias := extract_alias(self):
-            return alias
+    def _parts(self, params: list | dict) -> tuple | list:
+        return 'EXISTS (', self._statement, ')'
 
-        res = 'EXISTS (%s)' % self._statement._build(params)
-        if self._marks:
-            res = self._marks.build(res)
-        return res
+    def _precedence(self) -> int:
+        return PREC_COMPOUND
@@ -1,47 +1,50 @@
 from typing import TypeVar
 
-import attrs
-
 from .marks import Marks
-from .utils import CompileABC
+from .utils import CompileABC, evolve
 
 
 class OrderByMX:
     def Desc(self):
         if self._marks:
-            marks = attrs.evolve(self._marks, order_by='DESC')
+            marks = evolve(self._marks, order_by='DESC')
         else:
             marks = Marks(order_by='DESC')
-        return attrs.evolve(self, x_marks=marks)
+        return evolve(self, x_marks=marks)
 
     def Asc(self):
         if self._marks:
-            marks = attrs.evolve(self._marks, order_by='ASC')
+            marks = evolve(self._marks, order_by='ASC')
         else:
-            marks = Marks(order_by='DESC')
-        return attrs.evolve(self, x_marks=marks)
+            marks = Marks(order_by='ASC')
+        return evolve(self, x_marks=marks)
 
     def NullsFirst(self):
         if self._marks:
-            marks = attrs.evolve(self._marks, order_by_nulls='FIRST')
+            marks = evolve(self._marks, order_by_nulls='FIRST')
         else:
             marks = Marks(order_by_nulls='FIRST')
-        return attrs.evolve(self, x_marks=marks)
+        return evolve(self, x_marks=marks)
 
     def NullsLast(self):
         if self._marks:
-            marks = attrs.evolve(self._marks, order_by_nulls='LAST')
+            marks = evolve(self._marks, order_by_nulls='LAST')
         else:
             marks = Marks(order_by_nulls='LAST')
-        return attrs.evolve(self, x_marks=marks)
+        return evolve(self, x_marks=marks)
 
 
-def build_order_by(value: str, marks: Marks) -> str:
+def order_by_suffix(marks: Marks) -> str:
+    res = ''
     if marks.order_by:
-        value = '%s %s' % (value, marks.order_by)
+        res = ' %s' % marks.order_by
     if marks.order_by_nulls:
-        value = '%s NULLS %s' % (value, marks.order_by_nulls)
-    return value
+        res = '%s NULLS %s' % (res, marks.order_by_nulls)
+    return res
+
+
+def build_order_by(value: str, marks: Marks) -> str:
+    return value + order_by_suffix(marks)
 
 
 _Object = TypeVar('_Object')
@@ -55,4 +58,4 @@ def do_order_by(obj: _Object, statements: tuple[CompileABC, ...]) -> _Object:
             raise ValueError(statements)
         value = obj._order_by + statements
 
-    return attrs.evolve(obj, x_order_by=value)
+    return evolve(obj, x_order_by=value)
@@ -3,35 +3,74 @@ from typing import Any
 import attrs
 
 from .alias import AliasMX, extract_alias
-from .cast import CastMX
+from .cast import CastMX, build_cast
 from .distinct import DistinctMX
 from .marks import MARKS_FIELD, MARKS_TYPE
 from .operation import OperationMX
 from .order_by import OrderByMX
-from .utils import CompileABC, SelectMX
+from .utils import CTX_STATE, PREC_ATOM, BuildState, SelectMX
+from .vectors import vector_kind, vector_type
+from .writer import WriterABC
+
+
+def add_param(params: list | dict, value: Any) -> str:
+    return CTX_STATE.get().param_style.add(params, value)
 
 
 @attrs.frozen(repr=False, eq=False)
-class Param(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
+class Param(WriterABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
     _value: Any = attrs.field(alias='value')
     _marks: MARKS_TYPE = MARKS_FIELD
 
-    def _build(self, params: list | dict) -> str:
+    def _write(self, buf: list[str], params: list | dict) -> None:
         if alias := extract_alias(self):
-            return alias
+            buf.append(alias)
+            return
 
-        index = len(params) + 1
-        if isinstance(params, list):
-            params.append(self._value)
-            res = '$%d' % index
+        state = CTX_STATE.get()
+        value = self._value
+        if is_vector := vector_kind(value) is not None:
+            value = state.param_style.vector(value)
+
+        if state.param_slots is not None:
+            res = self._add_deduplicated(params, state, value)
         else:
-            params[f'p{index}'] = self._value
-            res = f'%(p{index})s'
+            res = state.param_style.add(params, value)
+            if state.param_sources is not None:
+                state.param_sources.append((len(params), self))
 
+        if is_vector and not (self._marks and self._marks.cast):
+            # array.array, memoryview or numpy array is typed by its items
+            if type_ := vector_type(self._value):
+                res = build_cast(res, '%s[]' % type_, PREC_ATOM)
         if self._marks:
-            res = self._marks.build(res)
+            res = self._marks.build(res, obj=self)
+        buf.append(res)
+
+    def _add_deduplicated(self, params: list | dict, state: BuildState, value: Any) -> str:
+        key = id(self)
+        if state.dedup == 'value':
+            # type is a part of the key, as True == 1 == 1.0; cast as the slot gets a single type
+            value_key = (type(value), value, self._marks.cast if self._marks else None)
+            try:
+                hash(value_key)
+            except TypeError:
+                pass
+            else:
+                key = value_key
+
+        if (slot := state.param_slots.get(key)) is not None:
+            return slot[0]
+
+        res = state.param_style.add(params, value)
+        state.param_slots[key] = (res, self)
+        if state.param_sources is not None:
+            state.param_sources.append((len(params), self))
         return res
 
+    def _precedence(self) -> int:
+        return PREC_ATOM
+
     def __repr__(self):
         res = 'Param(%s)' % str(self._value)
         if self._marks:
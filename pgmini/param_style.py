@@ -0,0 +1,143 @@
+from abc import ABC, abstractmethod
+from array import array
+from types import MappingProxyType
+from typing import Any, Final, Literal as TypeLiteral
+
+
+class _Interned:
+    """Strings made once per param number and shared by all builds"""
+
+    def __init__(self, template: str):
+        self._template = template
+        self._items: list[str] = []
+
+    def __getitem__(self, index: int) -> str:
+        items = self._items
+        if index >= len(items):
+            # a new list is assigned at once, so concurrent builds never see a partial one
+            self._items = items = items + [
+                self._template % i for i in range(len(items), max(index + 1, len(items) * 2, 64))
+            ]
+        return items[index]
+
+
+class ParamStyle(ABC):
+    """
+    How params are collected and referenced in sql, resolved once per build:
+    nodes call `add` and never check the driver themselves.
+    """
+
+    # params are bound by the server with known types, so e.g. `$1[1]` needs no brackets
+    server_side: bool = False
+    # sql of a param may be written in a few places to reference one value, needed by dedup
+    reusable_slots: bool = False
+
+    @abstractmethod
+    def new_params(self) -> list | dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def add(self, params: list | dict, value: Any) -> str:
+        """Add value to params, return its sql"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def key(self, number: int) -> int | str:
+        """Key in params of the param number `number` (counting from 1)"""
+        raise NotImplementedError
+
+    def vector(self, value: Any) -> Any:
+        """array.array, memoryview or numpy array as the driver binds it, a list by default"""
+        return value.tolist()
+
+
+class DollarStyle(ParamStyle):
+    """`$1, $2` with a list of params: asyncpg"""
+
+    server_side = True
+    reusable_slots = True
+
+    def __init__(self):
+        self._sql = _Interned('$%d')
+
+    def new_params(self) -> list:
+        return []
+
+    def add(self, params: list, value: Any) -> str:
+        params.append(value)
+        return self._sql[len(params)]
+
+    def key(self, number: int) -> int:
+        return number - 1
+
+    def vector(self, value: Any) -> Any:
+        # asyncpg binds any sized iterable but memoryview, and array.array yields plain numbers;
+        # numpy arrays yield numpy scalars, one by one they cost more than a single tolist()
+        return value if isinstance(value, array) else value.tolist()
+
+
+class FormatStyle(ParamStyle):
+    """`%s, %s` with a list of params: positional psycopg (3 and 2)"""
+
+    def new_params(self) -> list:
+        return []
+
+    def add(self, params: list, value: Any) -> str:
+        params.append(value)
+        return '%s'
+
+    def key(self, number: int) -> int:
+        return number - 1
+
+
+class _KeyedStyle(ParamStyle):
+    """Dict of params with keys `p1, p2`, the keys and sql are interned"""
+
+    reusable_slots = True
+
+    def __init__(self, template: str):
+        self._keys = _Interned('p%d')
+        self._sql = _Interned(template)
+
+    def new_params(self) -> dict:
+        return {}
+
+    def add(self, params: dict, value: Any) -> str:
+        number = len(params) + 1
+        params[self._keys[number]] = value
+        return self._sql[number]
+
+    def key(self, number: int) -> str:
+        return self._keys[number]
+
+
+class PyformatStyle(_KeyedStyle):
+    """`%(p1)s` with a dict of params: psycopg"""
+
+    def __init__(self):
+        super().__init__('%%(p%d)s')
+
+
+class NamedStyle(_KeyedStyle):
+    """`:p1` with a dict of params: sqlalchemy text(), sqlite3 etc."""
+
+    def __init__(self):
+        super().__init__(':p%d')
+
+
+PARAM_STYLES: Final[MappingProxyType] = MappingProxyType({
+    'asyncpg': DollarStyle(),
+    'psycopg': PyformatStyle(),
+    'format': FormatStyle(),
+    'named': NamedStyle(),
+})
+
+DRIVER = TypeLiteral['asyncpg', 'psycopg', 'format', 'named'] | ParamStyle
+
+
+def get_param_style(driver: DRIVER) -> ParamStyle:
+    if isinstance(driver, ParamStyle):
+        return driver
+    elif (res := PARAM_STYLES.get(driver)) is None:
+        raise ValueError(driver)
+    return res
@@ -0,0 +1,46 @@
+import attrs
+
+from .alias import AliasMX, extract_alias
+from .cast import CastMX
+from .distinct import DistinctMX
+from .marks import MARKS_FIELD, MARKS_TYPE
+from .operation import OperationMX
+from .order_by import OrderByMX
+from .param import add_param
+from .utils import PREC_ATOM, SelectMX
+from .writer import WriterABC
+
+
+@attrs.frozen(repr=False, eq=False)
+class Placeholder(WriterABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
+    """Named parameter slot, value is provided later with CompiledQuery.bind"""
+
+    _name: str = attrs.field(alias='name', validator=attrs.validators.instance_of(str))
+    _marks: MARKS_TYPE = MARKS_FIELD
+
+    @_name.validator
+    def _vld_name(self, attribute, value):
+        if not value:
+            raise ValueError(value)
+
+    def _write(self, buf: list[str], params: list | dict) -> None:
+        if alias := extract_alias(self):
+            buf.append(alias)
+            return
+
+        res = add_param(params, self)
+        if self._marks:
+            res = self._marks.build(res, obj=self)
+        buf.append(res)
+
+    def _precedence(self) -> int:
+        return PREC_ATOM
+
+    def __repr__(self):
+        res = 'Placeholder(%s)' % self._name
+        if self._marks:
+            res += f':{repr(self._marks)}'
+        return res
+
+    def __hash__(self):
+        return id(self)
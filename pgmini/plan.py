@@ -0,0 +1,171 @@
+"""Offline analysis of `EXPLAIN (FORMAT JSON)` output, see Explain"""
+import json
+from types import MappingProxyType
+from typing import Any, Iterator, Literal as TypeLiteral, Mapping
+
+import attrs
+
+
+@attrs.frozen(repr=False)
+class PlanNode:
+    node_type: str
+    plan_rows: float
+    startup_cost: float
+    total_cost: float
+    relation: str | None = None
+    alias: str | None = None
+    # EXPLAIN ANALYZE only, rows and time are per loop
+    actual_rows: float | None = None
+    actual_loops: int | None = None
+    actual_total_time: float | None = None
+    parent_relationship: str | None = None
+    children: tuple['PlanNode', ...] = ()
+    # every key of the node as postgres gives it, e.g. "Filter", "Index Name", "Sort Key"
+    fields: Mapping[str, Any] = attrs.field(factory=dict, eq=False)
+
+    @property
+    def analyzed(self) -> bool:
+        return self.actual_loops is not None
+
+    def walk(self) -> Iterator['PlanNode']:
+        """This node and all its descendants, parents first"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def __repr__(self):
+        res = self.node_type
+        if self.relation is not None:
+            res = '%s on %s' % (res, self.relation)
+        return 'PlanNode(%s, rows=%s)' % (res, self.plan_rows)
+
+
+@attrs.frozen
+class Plan:
+    root: PlanNode
+    planning_time: float | None = None
+    execution_time: float | None = None
+    settings: Mapping[str, str] = attrs.field(factory=dict, eq=False)
+
+    def nodes(self) -> Iterator[PlanNode]:
+        return self.root.walk()
+
+
+@attrs.frozen
+class Issue:
+    kind: TypeLiteral['seq_scan', 'misestimate', 'disk_sort', 'nested_loop']
+    node: PlanNode
+    detail: str
+
+
+def _node(data: Mapping[str, Any]) -> PlanNode:
+    return PlanNode(
+        node_type=data['Node Type'],
+        plan_rows=data['Plan Rows'],
+        startup_cost=data['Startup Cost'],
+        total_cost=data['Total Cost'],
+        relation=data.get('Relation Name'),
+        alias=data.get('Alias'),
+        actual_rows=data.get('Actual Rows'),
+        actual_loops=data.get('Actual Loops'),
+        actual_total_time=data.get('Actual Total Time'),
+        parent_relationship=data.get('Parent Relationship'),
+        children=tuple(_node(i) for i in data.get('Plans', ())),
+        fields=MappingProxyType(data),
+    )
+
+
+def parse_plan(document: str | bytes | list | dict) -> Plan:
+    """Plan of `EXPLAIN (FORMAT JSON)` output: json text or already decoded document"""
+    if isinstance(document, (str, bytes, bytearray)):
+        document = json.loads(document)
+    if isinstance(document, list):
+        if len(document) != 1:
+            raise ValueError(document)
+        document = document[0]
+
+    try:
+        root = _node(document['Plan'])
+    except (KeyError, TypeError):
+        raise ValueError(document) from None
+    return Plan(
+        root,
+        planning_time=document.get('Planning Time'),
+        execution_time=document.get('Execution Time'),
+        settings=MappingProxyType(document.get('Settings', {})),
+    )
+
+
+def seq_scans(plan: Plan, min_rows: float = 10_000) -> list[Issue]:
+    """
+    Sequential scans reading at least `min_rows` rows: with ANALYZE those returned
+    and removed by filter in all loops, otherwise the planner estimate of returned rows.
+    """
+    res = []
+    for node in plan.nodes():
+        if node.node_type != 'Seq Scan':
+            continue
+        if node.analyzed:
+            removed = node.fields.get('Rows Removed by Filter', 0)
+            rows = (node.actual_rows + removed) * node.actual_loops
+        else:
+            rows = node.plan_rows
+        if rows >= min_rows:
+            res.append(Issue('seq_scan', node, '%s rows of %s' % (int(rows), node.relation)))
+    return res
+
+
+def misestimates(plan: Plan, factor: float = 10, min_rows: float = 100) -> list[Issue]:
+    """
+    Nodes whose actual rows differ from the estimate at least `factor` times (ANALYZE only),
+    small ones are skipped: both numbers below `min_rows`.
+    """
+    res = []
+    for node in plan.nodes():
+        if not node.analyzed or max(node.actual_rows, node.plan_rows) < min_rows:
+            continue
+        low, high = sorted((node.actual_rows, node.plan_rows))
+        if high >= max(low, 1) * factor:
+            res.append(Issue('misestimate', node, 'estimated %s rows, actual %s' % (
+                node.plan_rows,
+                node.actual_rows,
+            )))
+    return res
+
+
+def disk_sorts(plan: Plan) -> list[Issue]:
+    """Sorts which spilled to disk, as they didn't fit work_mem (ANALYZE only)"""
+    return [
+        Issue('disk_sort', node, '%s, %s kB' % (
+            node.fields.get('Sort Method'),
+            node.fields.get('Sort Space Used'),
+        ))
+        for node in plan.nodes()
+        if node.fields.get('Sort Space Type') == 'Disk'
+    ]
+
+
+def nested_loops(plan: Plan, min_loops: float = 1000) -> list[Issue]:
+    """
+    Nested loops running the inner side at least `min_loops` times: its actual loops with
+    ANALYZE, otherwise estimated rows of the outer side.
+    """
+    res = []
+    for node in plan.nodes():
+        if node.node_type != 'Nested Loop' or len(node.children) != 2:
+            continue
+        outer, inner = node.children
+        loops = inner.actual_loops if inner.analyzed else outer.plan_rows
+        if loops >= min_loops:
+            res.append(Issue('nested_loop', node, '%s loops of %s' % (
+                int(loops),
+                inner.relation or inner.node_type,
+            )))
+    return res
+
+
+def find_issues(plan: Plan) -> list[Issue]:
+    """Issues of all the checks with their default thresholds"""
+    return [*seq_scans(plan), *misestimates(plan), *disk_sorts(plan), *nested_loops(plan)]
@@ -1,3 +1,6 @@
+import re
+from typing import Final, Pattern
+
 import attrs
 
 from .alias import AliasMX, extract_alias
@@ -6,22 +9,53 @@ from .distinct import DistinctMX
 from .marks import MARKS_FIELD, MARKS_TYPE
 from .operation import OperationMX
 from .order_by import OrderByMX
-from .utils import CompileABC, SelectMX
+from .utils import PREC_ATOM, PREC_STATEMENT, SelectMX
+from .writer import WriterABC
+
+
+_RE_SIMPLE: Final[Pattern] = re.compile("[a-z0-9$._']+|'[^']*'", flags=re.IGNORECASE)
+_RE_OPENING: Final[Pattern] = re.compile(r'[a-z0-9_.]*\(|ARRAY\[', flags=re.IGNORECASE)
+
+
+def _is_atom(value: str) -> bool:
+    """Identifier, constant, function call, array or an expression in brackets"""
+    if _RE_SIMPLE.fullmatch(value):
+        return True
+    elif (match := _RE_OPENING.match(value)) is None:
+        return False
+
+    opening = value[match.end() - 1]
+    closing = ')' if opening == '(' else ']'
+    depth = 0
+    for index in range(match.end() - 1, len(value)):
+        if value[index] == opening:
+            depth += 1
+        elif value[index] == closing:
+            depth -= 1
+            if not depth:
+                # `(a) + (b)` starts and ends with brackets, but isn't wrapped by them
+                return index == len(value) - 1
+    return False
 
 
 @attrs.frozen(repr=False, eq=False)
-class Raw(CompileABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
+class Raw(WriterABC, CastMX, AliasMX, DistinctMX, OrderByMX, OperationMX, SelectMX):
     _value: str = attrs.field(alias='value', validator=attrs.validators.instance_of(str))
     _marks: MARKS_TYPE = MARKS_FIELD
 
-    def _build(self, params: list | dict) -> str:
+    def _write(self, buf: list[str], params: list | dict) -> None:
         if alias := extract_alias(self):
-            return alias
+            buf.append(alias)
+            return
 
         res = self._value
         if self._marks:
-            res = self._marks.build(res)
-        return res
+            res = self._marks.build(res, obj=self)
+        buf.append(res)
+
+    def _precedence(self) -> int:
+        # anything else is of unknown precedence, e.g. `a OR b`, so it's always wrapped as operand
+        return PREC_ATOM if _is_atom(self._value) else PREC_STATEMENT
 
     def __repr__(self):
         res = self._value
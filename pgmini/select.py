@@ -1,30 +1,34 @@
 from __future__ import annotations
 
-from functools import partial
-from typing import Any, Literal as LiteralT
+from typing import TYPE_CHECKING, Any, Generator, Literal as LiteralT, Mapping, Sequence
 
 import attrs
 
-from .cast import build_cast
+from .array import Tuple
+from .cast import cast_affixes
+from .clauses import Clauses, to_clauses
 from .column import Column, prepare_column
 from .literal import Literal
-from .operators import And
+from .operators import And, Or
 from .order_by import do_order_by
 from .param import Param
 from .subquery import Subquery
 from .utils import (
-    CTX_ALIAS_ONLY,
-    CTX_CTE,
-    CTX_TABLES,
+    CTX_STATE,
     CompileABC,
     FromABC,
     SelectMX,
     build_from,
-    build_where,
     build_with,
-    set_context,
-    wrap_brackets_if_needed,
+    evolve,
+    write_column,
+    write_where,
 )
+from .writer import WriterABC, write_joined
+
+
+if TYPE_CHECKING:
+    from .explain import CountEstimate
 
 
 def _convert_on_statement(value):
@@ -40,26 +44,27 @@ class _Join:
     on_statement: Any = attrs.field(converter=_convert_on_statement)
     lateral: bool = attrs.field(validator=attrs.validators.in_({True, False}), default=False)
 
-    def _build(self, params: list | dict):
+    def _write(self, buf: list[str], params: list | dict) -> None:
         if self.type == 'right':
             sql = 'JOIN'
         else:
             sql = 'LEFT JOIN'
 
-        cte = self.table in CTX_CTE.get()
+        state = CTX_STATE.get()
+        cte = self.table in state.cte
         if self.lateral:
             if cte:
                 raise ValueError
             sql = '%s LATERAL' % sql
 
-        res = '%s %s' % (
+        buf.append('%s %s ON ' % (
             sql,
             self.table._get_name() if cte else self.table._get_from_statement(params),
-        )
-        with set_context({CTX_TABLES: ()}):  # should always prefix column with table name
-            res += ' ON %s' % self.on_statement._build(params)
-
-        return res
+        ))
+        tables = state.tables
+        state.tables = ()  # should always prefix column with table name
+        self.on_statement._write(buf, params)
+        state.tables = tables
 
 
 @attrs.frozen
@@ -69,11 +74,126 @@ class _Union:
     )
     select: Select
 
-    def _build(self, params: list | dict) -> str:
-        expr = 'UNION'
+    def _write(self, buf: list[str], params: list | dict) -> None:
         if self.type == 'all':
-            expr = '%s ALL' % expr
-        return '%s %s' % (expr, self.select._build(params))
+            buf.append('UNION ALL ')
+        else:
+            buf.append('UNION ')
+        self.select._write(buf, params)
+
+
+def _convert_of(value):
+    if isinstance(value, FromABC):
+        value = (value,)
+    return tuple(value)
+
+
+@attrs.frozen
+class _Locking:
+    strength: LiteralT['UPDATE', 'NO KEY UPDATE', 'SHARE', 'KEY SHARE'] = attrs.field(
+        validator=attrs.validators.in_({'UPDATE', 'NO KEY UPDATE', 'SHARE', 'KEY SHARE'}),
+    )
+    of: tuple[FromABC, ...] = attrs.field(converter=_convert_of, factory=tuple)
+    skip_locked: bool = attrs.field(validator=attrs.validators.in_({True, False}), default=False)
+    nowait: bool = attrs.field(validator=attrs.validators.in_({True, False}), default=False)
+
+    @of.validator
+    def _vld_of(self, attribute, value):
+        if bad := [i for i in value if not isinstance(i, FromABC)]:
+            raise TypeError(bad)
+
+    @nowait.validator
+    def _vld_nowait(self, attribute, value):
+        if value and self.skip_locked:
+            raise ValueError
+
+    def _write(self, buf: list[str], params: list | dict) -> None:
+        buf.append('FOR %s' % self.strength)
+        if self.of:
+            buf.append(' OF %s' % ', '.join(i._get_name() for i in self.of))
+        if self.skip_locked:
+            buf.append(' SKIP LOCKED')
+        elif self.nowait:
+            buf.append(' NOWAIT')
+
+
+def _seek_key(key: CompileABC) -> tuple[CompileABC, bool]:
+    """Expression of ORDER BY item without its order and alias marks, whether it's descending"""
+    marks = getattr(key, '_marks', None)
+    if not marks:
+        return key, False
+    elif marks.order_by_nulls is not None:
+        raise ValueError(key)  # rows with NULL keys can't be sought by comparison
+
+    rest = evolve(marks, order_by=None, alias=None)
+    return evolve(key, x_marks=rest if rest else None), marks.order_by == 'DESC'
+
+
+def _seek_value(row: Mapping | Sequence, key: CompileABC, index: int) -> Any:
+    if not (isinstance(row, Mapping) or hasattr(row, 'keys')):  # asyncpg Record isn't Mapping
+        return row[index]
+    elif key._marks and key._marks.alias:
+        return row[key._marks.alias]
+    elif isinstance(key, Column):
+        return row[key._name]
+    raise ValueError(key)  # unnamed expression, row must be a sequence
+
+
+def seek_condition(keys: Sequence[CompileABC], row: Mapping | Sequence) -> CompileABC:
+    """Rows after `row` in the order of `keys`: `(a, b) > ($1, $2)` or OR form for mixed order"""
+    if not keys:
+        raise ValueError(keys)
+    elif not (isinstance(row, Mapping) or hasattr(row, 'keys')) and len(row) != len(keys):
+        raise ValueError((len(row), len(keys)))
+
+    values = [_seek_value(row, key, index) for index, key in enumerate(keys)]
+    if any(i is None for i in values):
+        raise ValueError(values)
+    # the same Param for repeated value, so build(dedup='identity') binds it once
+    values = [i if isinstance(i, CompileABC) else Param(i) for i in values]
+    exprs, desc = zip(*(_seek_key(i) for i in keys), strict=True)
+
+    if len(set(desc)) == 1:
+        if len(exprs) == 1:
+            left, right = exprs[0], values[0]
+        else:
+            left, right = Tuple(exprs), Tuple(values)
+        return left < right if desc[0] else left > right
+
+    # mixed directions: `a > $1 OR (a = $1 AND b < $2) OR ...`, the bound of the first key
+    # is repeated, so the scan of its index starts at the right place
+    terms = [
+        And(
+            *(exprs[j] == values[j] for j in range(index)),
+            expr < value if is_desc else expr > value,
+        )
+        for index, (expr, value, is_desc) in enumerate(zip(exprs, values, desc, strict=True))
+    ]
+    first = exprs[0] <= values[0] if desc[0] else exprs[0] >= values[0]
+    return And(first, Or(*terms))
+
+
+def _keeps_rows(columns: tuple[CompileABC, ...], distinct: bool = True) -> bool:
+    """
+    Whether rows of a query are the same with columns replaced by a constant:
+    no functions (aggregate, window or set returning) or raw sql in them,
+    no DISTINCT unless `distinct` is False (e.g. only existence of rows matters).
+    """
+    from .fingerprint import _fields, _iter_nodes
+    from .func import _Func
+    from .raw import Raw
+
+    if distinct and any(getattr(i, '_marks', None) and i._marks.distinct for i in columns):
+        return False
+
+    stack = list(columns)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (_Func, Raw)):
+            return False
+        elif not isinstance(node, Select):  # scalar subquery gives one value per row
+            stack.extend(_iter_nodes(_fields(node)))
+    return True
 
 
 def _convert_columns(values):
@@ -93,16 +213,16 @@ def _convert_offset(value):
 
 
 @attrs.frozen(init=False)
-class Select(CompileABC, SelectMX):
+class Select(WriterABC, SelectMX):
     _columns: tuple[CompileABC, ...] = attrs.field(alias='x_columns', converter=_convert_columns)
     _with: tuple[Subquery, ...] = attrs.field(alias='x_with', factory=tuple)
     _from: tuple[FromABC, ...] = attrs.field(alias='x_from', factory=tuple)
     _join: tuple[_Join, ...] = attrs.field(alias='x_join', factory=tuple)
-    _where: tuple[CompileABC, ...] = attrs.field(alias='x_where', factory=tuple)
+    _where: Clauses = attrs.field(alias='x_where', converter=to_clauses, factory=Clauses)
     _group_by: tuple[CompileABC, ...] = attrs.field(alias='x_group_by', factory=tuple)
-    _having: tuple[CompileABC, ...] = attrs.field(alias='x_having', factory=tuple)
+    _having: Clauses = attrs.field(alias='x_having', converter=to_clauses, factory=Clauses)
     _distinct_on: tuple[CompileABC, ...] = attrs.field(alias='x_distinct_on', factory=tuple)
-    _order_by: tuple[CompileABC, ...] = attrs.field(alias='x_order_by', factory=tuple)
+    _order_by: Clauses = attrs.field(alias='x_order_by', converter=to_clauses, factory=Clauses)
     _limit: CompileABC | None = attrs.field(alias='x_limit', converter=_convert_limit, default=None)
     _offset: CompileABC | None = attrs.field(
         alias='x_offset',
@@ -110,6 +230,7 @@ class Select(CompileABC, SelectMX):
         default=None,
     )
     _union: tuple[_Union, ...] = attrs.field(alias='x_union', factory=tuple)
+    _locking: tuple[_Locking, ...] = attrs.field(alias='x_locking', factory=tuple)
     _cast: str | None = attrs.field(alias='x_cast', default=None)
     _alias: str | None = attrs.field(alias='x_alias', default=None)
 
@@ -133,7 +254,7 @@ class Select(CompileABC, SelectMX):
             raise TypeError(bad)
 
     def AddColumns(self, *columns):
-        return attrs.evolve(self, x_columns=self._columns + columns)
+        return evolve(self, x_columns=self._columns + columns)
 
     def GetColumns(self) -> tuple[str, ...]:
         res = []
@@ -150,47 +271,47 @@ class Select(CompileABC, SelectMX):
         return tuple(res)
 
     def From(self, *froms):
-        return attrs.evolve(self, x_from=froms)
+        return evolve(self, x_from=froms)
 
     def Join(self, other: FromABC, on_statement):
-        return attrs.evolve(
+        return evolve(
             self,
             x_join=self._join + (_Join('right', other, on_statement=on_statement),),
         )
 
     def LeftJoin(self, other: FromABC, on_statement):
-        return attrs.evolve(
+        return evolve(
             self,
             x_join=self._join + (_Join('left', other, on_statement=on_statement),),
         )
 
     def JoinLateral(self, other: FromABC, on_statement):
-        return attrs.evolve(
+        return evolve(
             self,
             x_join=self._join + (_Join('right', other, on_statement=on_statement, lateral=True),),
         )
 
     def LeftJoinLateral(self, other: FromABC, on_statement):
-        return attrs.evolve(
+        return evolve(
             self,
             x_join=self._join + (_Join('left', other, on_statement=on_statement, lateral=True),),
         )
 
     def Where(self, *statements: CompileABC):
         """New statements will be added to old ones"""
-        return attrs.evolve(self, x_where=self._where + statements)
+        return evolve(self, x_where=self._where + statements)
 
     def GroupBy(self, *statements: CompileABC):
         if self._group_by != ():
             raise ValueError(self._group_by)
-        return attrs.evolve(self, x_group_by=statements)
+        return evolve(self, x_group_by=statements)
 
     def Having(self, *statements: CompileABC):
         """New statements will be added to old ones"""
-        return attrs.evolve(self, x_having=self._having + statements)
+        return evolve(self, x_having=self._having + statements)
 
     def DistinctOn(self, *statements: CompileABC):
-        return attrs.evolve(self, x_distinct_on=statements)
+        return evolve(self, x_distinct_on=statements)
 
     def OrderBy(self, *statements):
         """
@@ -201,97 +322,241 @@ class Select(CompileABC, SelectMX):
 
     def Limit(self, value):
         """None will remove LIMIT if was set."""
-        return attrs.evolve(self, x_limit=value)
+        return evolve(self, x_limit=value)
 
     def Offset(self, value):
         """None will remove OFFSET if was set."""
-        return attrs.evolve(self, x_offset=value)
+        return evolve(self, x_offset=value)
+
+    def SeekAfter(self, last_row: Mapping | Sequence, keys: Sequence[CompileABC] | None = None):
+        """
+        Keyset pagination: rows after `last_row` (mapping by column names/aliases or values
+        in order of keys) in the order of `keys`, ORDER BY by default; sets ORDER BY if empty.
+        Keys must be unique together and NOT NULL. Unlike OFFSET, cost doesn't grow with depth.
+        """
+        keys = tuple(self._order_by if keys is None else keys)
+        res = self.Where(seek_condition(keys, last_row))
+        return res if self._order_by else res.OrderBy(*keys)
+
+    def Pages(
+        self,
+        size: int,
+        keys: Sequence[CompileABC] | None = None,
+    ) -> Generator[Select, Mapping | Sequence | None, None]:
+        """
+        Lazy queries of pages: the first one by next(), every other one by sending back
+        the last row of the previous page: `query = pages.send(rows[-1])`.
+        The caller stops after an empty (or short) page. The next page depends on the rows,
+        so a plain for loop can't drive it: next() after the first page raises TypeError.
+        """
+        if keys is None:
+            if not self._order_by:
+                raise ValueError(self._order_by)
+            keys = tuple(self._order_by)
+        base = self.Offset(None)  # pages are sought, never skipped
+        last_row = yield (base if base._order_by else base.OrderBy(*keys)).Limit(size)
+        while True:
+            if last_row is None:
+                raise TypeError('send the last row of the previous page: pages.send(rows[-1])')
+            last_row = yield base.SeekAfter(last_row, keys).Limit(size)
+
+    def ToCount(self, estimate: bool = False) -> Select | CountEstimate:
+        """
+        `SELECT count(*)` of all rows of this query regardless of LIMIT/OFFSET and ORDER BY.
+        Columns are dropped when they can't change the rows; GROUP BY, DISTINCT (ON),
+        HAVING and UNION are counted over the subquery, with columns replaced by 1 where it's safe.
+        estimate=True gives the planner estimate instead, see CountEstimate.
+        """
+        from .explain import CountEstimate
+        from .func import STAR, F
+
+        if estimate:
+            return CountEstimate(self)
+
+        base = self._derived_base()
+        if not (self._group_by or self._having or self._distinct_on or self._union):
+            if _keeps_rows(self._columns):
+                return evolve(base, x_columns=(F.count(STAR),), x_with=self._with)
+        return Select(F.count(STAR), x_with=self._with).From(base.Subquery('counted'))
+
+    def ToExists(self) -> Select:
+        """`SELECT EXISTS (...)` of this query without ORDER BY, LIMIT/OFFSET and its columns"""
+        from .operators import Exists
+
+        return Select(Exists(self._derived_base(distinct=False)), x_with=self._with)
+
+    def _derived_base(self, distinct: bool = True) -> Select:
+        """The query without what doesn't change its rows, columns are 1 if they don't either"""
+        from .raw import Raw
+
+        columns = self._columns
+        # UNION members must match, GROUP BY can refer to the columns by alias,
+        # by ordinal (`GROUP BY 1`) or in raw sql
+        if not (
+            self._union
+            or any(
+                isinstance(i, (Literal, Raw)) or (getattr(i, '_marks', None) and i._marks.alias)
+                for i in self._group_by
+            )
+        ) and _keeps_rows(columns, distinct=distinct):
+            columns = (Literal(1),)
+
+        return evolve(
+            self,
+            x_columns=columns,
+            x_with=(),
+            x_order_by=(),
+            x_limit=None,
+            x_offset=None,
+            x_locking=(),
+            x_cast=None,
+            x_alias=None,
+        )
+
+    def ForUpdate(
+        self,
+        of: FromABC | tuple[FromABC, ...] = (),
+        skip_locked: bool = False,
+        nowait: bool = False,
+    ):
+        """
+        Row locking clause, `of` limits it to the given tables. Clauses of different tables
+        can be combined: `.ForUpdate(of=t1).ForShare(of=t2)`.
+        """
+        return self._lock('UPDATE', of, skip_locked, nowait)
+
+    def ForNoKeyUpdate(
+        self,
+        of: FromABC | tuple[FromABC, ...] = (),
+        skip_locked: bool = False,
+        nowait: bool = False,
+    ):
+        return self._lock('NO KEY UPDATE', of, skip_locked, nowait)
+
+    def ForShare(
+        self,
+        of: FromABC | tuple[FromABC, ...] = (),
+        skip_locked: bool = False,
+        nowait: bool = False,
+    ):
+        return self._lock('SHARE', of, skip_locked, nowait)
+
+    def ForKeyShare(
+        self,
+        of: FromABC | tuple[FromABC, ...] = (),
+        skip_locked: bool = False,
+        nowait: bool = False,
+    ):
+        return self._lock('KEY SHARE', of, skip_locked, nowait)
+
+    def _lock(self, strength: str, of, skip_locked: bool, nowait: bool):
+        locking = _Locking(strength, of=of, skip_locked=skip_locked, nowait=nowait)
+        return evolve(self, x_locking=self._locking + (locking,))
 
     def Union(self, other: Select):
-        return attrs.evolve(self, x_union=self._union + (_Union('distinct', select=other),))
+        return evolve(self, x_union=self._union + (_Union('distinct', select=other),))
 
     def UnionAll(self, other: Select):
-        return attrs.evolve(self, x_union=self._union + (_Union('all', select=other),))
+        return evolve(self, x_union=self._union + (_Union('all', select=other),))
 
     def As(self, alias: str):
-        return attrs.evolve(self, x_alias=alias)
+        return evolve(self, x_alias=alias)
 
     def Cast(self, to: str):
-        return attrs.evolve(self, x_cast=to)
+        return evolve(self, x_cast=to)
 
     def Subquery(self, alias: str, materialized: bool = False):
         return Subquery(self, alias=alias, materialized=materialized)
 
-    def _build(self, params: list | dict) -> str:
-        parts = []
+    def _write(self, buf: list[str], params: list | dict) -> None:
+        if self._alias is not None:
+            buf.append('(')
+        if self._cast is not None:
+            cast_prefix, cast_suffix = cast_affixes(self._cast, precedence=self._precedence())
+            buf.append(cast_prefix)
+
+        self._write_statement(buf, params)
+
+        if self._cast is not None:
+            buf.append(cast_suffix)
+        if self._alias is not None:
+            buf.append(') AS %s' % self._alias)
 
+    def _write_statement(self, buf: list[str], params: list | dict) -> None:
+        state = CTX_STATE.get()
         if self._with:
-            if CTX_CTE.get():
+            if state.cte:
                 raise ValueError
-            CTX_CTE.set(self._with)
-            parts.append(build_with(self._with, params))
+            state.cte = self._with
+            buf.append(build_with(self._with, params))
+            buf.append(' ')
 
-        ctx = partial(set_context, {CTX_TABLES: self._from + tuple(i.table for i in self._join)})
+        tables = state.tables
+        state.tables = self._from + tuple(i.table for i in self._join)
 
-        with ctx():
-            if self._distinct_on:
-                select = (
-                    'SELECT DISTINCT ON (%s)'
-                    % ', '.join(dst._build(params) for dst in self._distinct_on)
-                )
-            else:
-                select = 'SELECT'
+        if self._distinct_on:
+            buf.append('SELECT DISTINCT ON (')
+            write_joined(buf, self._distinct_on, params)
+            buf.append(') ')
+        else:
+            buf.append('SELECT ')
 
-            parts.append('%s %s' % (select, ', '.join(
-                wrap_brackets_if_needed(i._build(params), obj=i)
-                for i in self._columns
-            )))
+        for index, i in enumerate(self._columns):
+            if index:
+                buf.append(', ')
+            write_column(buf, i, params)
+
+        select_tables, state.tables = state.tables, tables
 
         if self._from:
-            parts.append(build_from(self._from, params))
+            buf.append(' ')
+            buf.append(build_from(self._from, params))
 
-        if self._join:
-            parts.extend(obj._build(params) for obj in self._join)
+        for obj in self._join:
+            buf.append(' ')
+            obj._write(buf, params)
 
-        with ctx():
-            if self._where:
-                parts.append(build_where(self._where, params=params))
+        state.tables = select_tables
 
-            with set_context({CTX_ALIAS_ONLY: True}):
-                if self._group_by:
-                    parts.append('GROUP BY %s' % ', '.join(
-                        i._build(params) for i in self._group_by
-                    ))
+        if self._where:
+            buf.append(' ')
+            write_where(buf, self._where, params=params)
 
-            if self._having:
-                if len(self._having) > 1:
-                    statements = And(*self._having)
-                else:
-                    statements = self._having[0]
-                parts.append('HAVING %s' % statements._build(params))
+        alias_only = state.alias_only
+        if self._group_by:
+            state.alias_only = True
+            buf.append(' GROUP BY ')
+            write_joined(buf, self._group_by, params)
+            state.alias_only = alias_only
 
-            with set_context({CTX_ALIAS_ONLY: True}):
-                if self._order_by:
-                    parts.append('ORDER BY %s' % ', '.join(
-                        i._build(params) for i in self._order_by
-                    ))
+        if self._having:
+            if len(self._having) > 1:
+                statements = And(*self._having)
+            else:
+                statements = self._having[0]
+            buf.append(' HAVING ')
+            statements._write(buf, params)
 
-            if self._limit is not None:
-                parts.append('LIMIT %s' % self._limit._build(params))
+        if self._order_by:
+            state.alias_only = True
+            buf.append(' ORDER BY ')
+            write_joined(buf, self._order_by, params)
+            state.alias_only = alias_only
 
-            if self._offset is not None:
-                parts.append('OFFSET %s' % self._offset._build(params))
+        if self._limit is not None:
+            buf.append(' LIMIT ')
+            self._limit._write(buf, params)
 
-        if self._union:
-            for obj in self._union:
-                parts.append(obj._build(params))
+        if self._offset is not None:
+            buf.append(' OFFSET ')
+            self._offset._write(buf, params)
 
-        res = ' '.join(parts)
+        for obj in self._locking:
+            buf.append(' ')
+            obj._write(buf, params)
 
-        if self._cast is not None:
-            res = build_cast(res, cast=self._cast)
-
-        if self._alias is not None:
-            res = '(%s) AS %s' % (res, self._alias)
+        state.tables = tables
 
-        return res
+        for obj in self._union:
+            buf.append(' ')
+            obj._write(buf, params)
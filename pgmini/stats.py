@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+from typing import Callable, Final
+
+from .fingerprint import _fields, _iter_nodes
+from .param_style import DRIVER
+from .utils import CompileABC
+
+
+_FILE: Final[str] = os.path.abspath(__file__)
+_PACKAGE_DIR: Final[str] = os.path.dirname(_FILE) + os.sep
+
+
+class CallStats:
+    __slots__ = ('count', 'time')
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0  # cumulative seconds, nested calls of the same function counted once
+
+    def __repr__(self):
+        return 'CallStats(count=%d, time=%.6f)' % (self.count, self.time)
+
+
+def _key(frame) -> str:
+    code = frame.f_code
+    if code.co_argcount and code.co_varnames[0] == 'self':
+        # per node class, so inherited methods like WriterABC._build are split by class
+        return '%s.%s' % (type(frame.f_locals['self']).__name__, code.co_name)
+    return code.co_name
+
+
+def _tree_stats(item: CompileABC) -> tuple[int, int]:
+    nodes = depth = 0
+    stack = [(item, 1)]
+    while stack:
+        node, level = stack.pop()
+        nodes += 1
+        depth = max(depth, level)
+        stack.extend((i, level + 1) for i in _iter_nodes(_fields(node)))
+    return nodes, depth
+
+
+class BuildStats:
+    """
+    Opt-in instrumentation of build(): `build(q, stats=stats)`.
+    Records calls of pgmini functions with sys.setprofile only while building,
+    so there are no hooks in the code and no cost when it is not passed.
+    Accumulates over all builds it was passed to.
+    """
+
+    def __init__(self):
+        self.builds = 0
+        self.time = 0.0
+        self.nodes = 0
+        self.params = 0
+        self.sql_length = 0
+        self.max_depth = 0
+        self.calls: dict[str, CallStats] = {}
+
+    def top(self, n: int = 10) -> list[tuple[str, CallStats]]:
+        """The most expensive functions by cumulative time"""
+        return sorted(self.calls.items(), key=lambda x: x[1].time, reverse=True)[:n]
+
+    def record(self, run: Callable[..., tuple], item: CompileABC, driver: DRIVER) -> tuple:
+        calls = self.calls
+        clock = time.perf_counter
+        frames = []
+        active = {}
+
+        def hook(frame, event, arg):
+            if event == 'call':
+                filename = frame.f_code.co_filename
+                if not filename.startswith(_PACKAGE_DIR) or filename == _FILE:
+                    frames.append(None)
+                    return
+
+                key = _key(frame)
+                if (stats := calls.get(key)) is None:
+                    stats = calls[key] = CallStats()
+                stats.count += 1
+                active[key] = active.get(key, 0) + 1
+                frames.append((key, clock()))
+            elif event == 'return' and frames and (entry := frames.pop()) is not None:
+                key, started = entry
+                active[key] -= 1
+                if not active[key]:
+                    calls[key].time += clock() - started
+
+        previous = sys.getprofile()
+        started = clock()
+        sys.setprofile(hook)
+        try:
+            sql, params = run(item, driver)
+        finally:
+            sys.setprofile(previous)
+        self.time += clock() - started
+
+        nodes, depth = _tree_stats(item)
+        self.builds += 1
+        self.nodes += nodes
+        self.params += len(params)
+        self.sql_length += len(sql or '')
+        self.max_depth = max(self.max_depth, depth)
+        return sql, params
+
+    def __repr__(self):
+        return (
+            'BuildStats(builds=%d, time=%.6f, nodes=%d, params=%d, sql_length=%d, max_depth=%d)'
+            % (self.builds, self.time, self.nodes, self.params, self.sql_length, self.max_depth)
+        )
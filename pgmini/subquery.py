@@ -1,19 +1,19 @@
 import attrs
 
-from .column import Column
-from .utils import STAR_SIGN, CompileABC, FromABC
+from .column import Column, ColumnsMX
+from .utils import STAR_SIGN, CompileABC, FromABC, evolve
 
 
 def _convert_statement(value):
     from .select import Select
 
     if isinstance(value, Select) and (value._cast is not None or value._alias is not None):
-        value = attrs.evolve(value, x_cast=None, x_alias=None)
+        value = evolve(value, x_cast=None, x_alias=None)
     return value
 
 
 @attrs.frozen
-class Subquery(FromABC):
+class Subquery(ColumnsMX, FromABC):
     _statement: CompileABC = attrs.field(alias='statement', converter=_convert_statement)
     _alias: str = attrs.field(alias='alias')
     _materialized: bool = attrs.field(
@@ -31,14 +31,8 @@ class Subquery(FromABC):
     def STAR(self) -> Column:
         return Column(STAR_SIGN, table=self)
 
-    def __getattribute__(self, item: str) -> Column:
-        try:
-            return object.__getattribute__(self, item)
-        except AttributeError:
-            return Column(item, table=self)
-
     def As(self, alias: str, materialized: bool = False):
-        return attrs.evolve(self, alias=alias, materialized=materialized)
+        return evolve(self, alias=alias, materialized=materialized)
 
     def _get_from_statement(self, params: list) -> str:
         return '(%s) AS %s' % (self._statement._build(params), self._alias)
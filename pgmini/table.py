@@ -2,8 +2,8 @@ from typing import Final
 
 import attrs
 
-from .column import Column
-from .utils import STAR_SIGN, FromABC
+from .column import Column, ColumnsMX
+from .utils import STAR_SIGN, FromABC, evolve
 
 
 _RESERVED: Final[frozenset[str]] = frozenset(['user', 'role'])
@@ -16,23 +16,17 @@ def _convert_name(value):
 
 
 @attrs.frozen(eq=False)
-class Table(FromABC):
+class Table(ColumnsMX, FromABC):
     _name: str = attrs.field(alias='name', converter=_convert_name)
     _alias: str | None = attrs.field(alias='x_alias', default=None)
 
     def As(self, alias: str):
-        return attrs.evolve(self, x_alias=alias)
+        return evolve(self, x_alias=alias)
 
     @property
     def STAR(self) -> Column:
         return Column(STAR_SIGN, table=self)
 
-    def __getattribute__(self, item: str) -> Column:
-        try:
-            return object.__getattribute__(self, item)
-        except AttributeError:
-            return Column(item, table=self)
-
     def _get_from_statement(self, params: list) -> str:
         res = self._name
         if self._alias is not None:
@@ -1,12 +1,14 @@
-from typing import Any
+from typing import Any, Iterable
 
 import attrs
 
+from .clauses import Clauses, to_clauses
 from .column import Column, prepare_column
+from .select import Select
 from .subquery import Subquery
 from .table import Table
 from .utils import (
-    CTX_CTE,
+    CTX_STATE,
     CompileABC,
     FromABC,
     build_from,
@@ -14,6 +16,7 @@ from .utils import (
     build_set,
     build_where,
     build_with,
+    evolve,
 )
 
 
@@ -36,7 +39,7 @@ class Update(CompileABC):
         default=None,
     )
     _from: tuple[FromABC, ...] = attrs.field(alias='x_from', factory=tuple)
-    _where: tuple[CompileABC, ...] = attrs.field(alias='x_where', factory=tuple)
+    _where: Clauses = attrs.field(alias='x_where', converter=to_clauses, factory=Clauses)
     _returning: tuple[CompileABC, ...] = attrs.field(
         alias='x_returning',
         converter=_convert_returning,
@@ -49,17 +52,17 @@ class Update(CompileABC):
             raise TypeError(bad)
 
     def Set(self, items: dict[str | Column, Any]):
-        return attrs.evolve(self, x_set=items)
+        return evolve(self, x_set=items)
 
     def From(self, *froms):
-        return attrs.evolve(self, x_from=froms)
+        return evolve(self, x_from=froms)
 
     def Where(self, *statements: CompileABC):
         """New statements will be added to old ones"""
-        return attrs.evolve(self, x_where=self._where + statements)
+        return evolve(self, x_where=self._where + statements)
 
     def Returning(self, *columns):
-        return attrs.evolve(self, x_returning=columns)
+        return evolve(self, x_returning=columns)
 
     def Subquery(self, alias: str, materialized: bool = False) -> Subquery:
         return Subquery(self, alias=alias, materialized=materialized)
@@ -69,10 +72,11 @@ class Update(CompileABC):
             raise ValueError
 
         parts = []
+        state = CTX_STATE.get()
         if self._with:
-            if CTX_CTE.get():
+            if state.cte:
                 raise ValueError
-            CTX_CTE.set(self._with)
+            state.cte = self._with
             parts.append(build_with(self._with, params))
 
         parts.extend([
@@ -87,3 +91,25 @@ class Update(CompileABC):
             parts.append(build_returning(self._returning, params=params))
 
         return ' '.join(parts)
+
+
+def claim(
+    table: Table,
+    values: dict[str | Column, Any],
+    where: Iterable[CompileABC] = (),
+    limit: int = 1,
+    order_by: Iterable[CompileABC] = (),
+    returning: Iterable = (),
+    key: str = 'id',
+) -> Update:
+    """
+    Queue claim in one statement: `UPDATE t SET ... WHERE id IN (SELECT id FROM t WHERE ...
+    ORDER BY ... LIMIT n FOR UPDATE SKIP LOCKED) RETURNING ...`.
+    Concurrent workers skip rows locked by each other instead of waiting for them.
+    """
+    column = getattr(table, key)
+    candidates = (
+        Select(column).From(table).Where(*where).OrderBy(*order_by)
+        .Limit(limit).ForUpdate(skip_locked=True)
+    )
+    return Update(table).Set(values).Where(column.In(candidates)).Returning(*returning)
@@ -1,19 +1,43 @@
-import re
 from abc import ABC, abstractmethod
-from contextlib import contextmanager
 from contextvars import ContextVar
-from typing import Any, Final, Pattern
+from typing import Any, Final, TypeVar
+
+import attrs
+
+from .param_style import PARAM_STYLES, ParamStyle
 
 
 class SelectMX:
     pass
 
 
+# How tightly node's sql (without marks) binds, decides where brackets are needed.
+PREC_ATOM: Final[int] = 3  # column, param, literal, function call, array: `x::type` as is
+PREC_COMPOUND: Final[int] = 2  # case, window function, subscript etc.: safe as operand only
+PREC_OPERATION: Final[int] = 1  # binary operators, IN, BETWEEN
+PREC_STATEMENT: Final[int] = 0  # NOT, AND, OR, SELECT
+
+
 class CompileABC(ABC):
+    # expression written by parts with explicit stack, see writer.ExpressionABC
+    _STACKED: bool = False
+
     @abstractmethod
     def _build(self, params: list | dict) -> str | None:
         raise NotImplementedError
 
+    def _write(self, buf: list[str], params: list | dict) -> None:
+        """Append sql to the buffer shared by the whole build"""
+        if (res := self._build(params)) is not None:
+            buf.append(res)
+
+    def _precedence(self) -> int:
+        return PREC_STATEMENT
+
+    def Fingerprint(self) -> str:
+        from .fingerprint import fingerprint
+        return fingerprint(self)
+
 
 class FromABC(ABC):
     @abstractmethod
@@ -24,47 +48,127 @@ class FromABC(ABC):
     def _get_name(self) -> str:
         raise NotImplementedError
 
+    def Fingerprint(self) -> str:
+        from .fingerprint import fingerprint
+        return fingerprint(self)
+
 
-RE_NEED_BRACKETS: Final[Pattern] = re.compile("[^a-z0-9$._']", flags=re.IGNORECASE)
-RE_PARENTHESIZED: Final[Pattern] = re.compile(r'\(.*\)')
-RE_FUNC_PARENTHESIZED: Final[Pattern] = re.compile(r'[a-z0-9_.]+\([^()]*\)', flags=re.IGNORECASE)
-RE_SINGLE_QUOTED: Final[Pattern] = re.compile("'[^']*'")
-RE_ARRAY: Final[Pattern] = re.compile(r'ARRAY\[.*\]')
-RE_PSYCOPG_PARAM: Final[Pattern] = re.compile(r'%\(p[0-9]+\)s')
 ITERABLES: Final[tuple] = (list, tuple, set, frozenset)
 STAR_SIGN: Final[str] = '*'
-CTX_FORCE_CAST_BRACKETS: Final[ContextVar[bool]] = ContextVar('force_cast_brackets')
-CTX_CTE: Final[ContextVar[tuple]] = ContextVar('cte')
-CTX_DISABLE_TABLE_IN_COLUMN: Final[ContextVar[bool]] = ContextVar('disable_table_in_column')
-CTX_TABLES: Final[ContextVar[tuple[FromABC, ...]]] = ContextVar('tables')
-CTX_ALIAS_ONLY: Final[ContextVar[bool]] = ContextVar('alias_only')
 
 
-@contextmanager
-def set_context(items: dict[ContextVar, Any]):
-    tokens = {ctx: ctx.set(value) for ctx, value in items.items()}
-
-    yield
-
-    for ctx, token in tokens.items():
-        ctx.reset(token)
+class BuildState:
+    """Mutable state of a single build() call, nodes change it while building their parts"""
 
+    __slots__ = (
+        'cte',
+        'tables',
+        'alias_only',
+        'disable_table_in_column',
+        'force_cast_brackets',
+        'param_sources',
+        'dedup',
+        'param_slots',
+        'param_style',
+    )
 
-def build_where(statements, params: list) -> str:
+    def __init__(
+        self,
+        param_sources: list | None = None,
+        dedup: str | None = None,
+        param_style: ParamStyle = PARAM_STYLES['asyncpg'],
+    ):
+        self.cte: tuple = ()
+        self.tables: tuple[FromABC, ...] = ()
+        self.alias_only: bool = False
+        self.disable_table_in_column: bool = False
+        self.force_cast_brackets: bool = False
+        self.param_sources: list | None = param_sources
+        self.dedup: str | None = dedup
+        # dedup key -> (sql of param slot, Param), Param is kept alive so its id isn't reused
+        self.param_slots: dict[Any, tuple[str, Any]] | None = {} if dedup else None
+        self.param_style: ParamStyle = param_style
+
+
+CTX_STATE: Final[ContextVar[BuildState]] = ContextVar('build_state')
+
+
+T = TypeVar('T')
+
+# attrs class -> (attribute names, alias -> attribute)
+_EVOLVE_FIELDS: Final[dict[type, tuple[tuple[str, ...], dict[str, attrs.Attribute]]]] = {}
+
+
+def evolve(inst: T, **changes: Any) -> T:
+    """
+    Like attrs.evolve, but converters and validators run for changed fields only:
+    the rest were already checked when `inst` was created and can't change since it's frozen,
+    so a step of builder chain costs as much as what it changes.
+    """
+    cls = inst.__class__
+    if (fields := _EVOLVE_FIELDS.get(cls)) is None:
+        fields = _EVOLVE_FIELDS[cls] = (
+            tuple(i.name for i in attrs.fields(cls)),
+            {i.alias: i for i in attrs.fields(cls)},
+        )
+    names, aliases = fields
+
+    res = object.__new__(cls)
+    setattr_ = object.__setattr__
+    for name in names:
+        setattr_(res, name, getattr(inst, name))
+
+    changed = []
+    for key, value in changes.items():
+        if (field := aliases.get(key)) is None:
+            raise TypeError(key)
+        if field.converter is not None:
+            value = field.converter(value)
+        setattr_(res, field.name, value)
+        changed.append((field, value))
+
+    if not attrs.validators.get_disabled():
+        for field, value in changed:
+            if field.validator is not None:
+                field.validator(res, field, value)
+    if (post_init := getattr(cls, '__attrs_post_init__', None)) is not None:
+        post_init(res)
+    return res
+
+
+def get_precedence(obj: CompileABC) -> int:
+    """Precedence of rendered sql, including cast mark"""
+    if (marks := getattr(obj, '_marks', None)) is not None and marks.cast is not None:
+        return PREC_ATOM if CTX_STATE.get().force_cast_brackets else PREC_COMPOUND
+    return obj._precedence()
+
+
+def write_where(buf: list[str], statements, params: list) -> None:
     from .operators import And
 
     if len(statements) > 1:
         statement = And(*statements)
     else:
         statement = statements[0]
-    return 'WHERE %s' % statement._build(params)
+    buf.append('WHERE ')
+    statement._write(buf, params)
 
 
-def wrap_brackets_if_needed(item: str, obj) -> str:
+def build_where(statements, params: list) -> str:
+    buf = []
+    write_where(buf, statements, params)
+    return ''.join(buf)
+
+
+def write_column(buf: list[str], obj: CompileABC, params: list) -> None:
     from .select import Select
+
     if isinstance(obj, Select) and obj._cast is None and obj._alias is None:
-        item = '(%s)' % item
-    return item
+        buf.append('(')
+        obj._write(buf, params)
+        buf.append(')')
+    else:
+        obj._write(buf, params)
 
 
 def build_with(statements, params: list) -> str:
@@ -72,8 +176,9 @@ def build_with(statements, params: list) -> str:
 
 
 def build_from(statements, params: list) -> str:
+    cte = CTX_STATE.get().cte
     return 'FROM %s' % ', '.join(
-        i._alias if any(i is t for t in CTX_CTE.get()) else i._get_from_statement(params)
+        i._alias if any(i is t for t in cte) else i._get_from_statement(params)
         for i in statements
     )
 
@@ -83,11 +188,14 @@ def build_returning(columns, params: list) -> str:
 
 
 def build_set(items: dict, params: list) -> str:
+    state = CTX_STATE.get()
     parts = []
     for k, v in items.items():
         if isinstance(k, CompileABC):
-            with set_context({CTX_DISABLE_TABLE_IN_COLUMN: True}):
-                col = k._build(params)
+            disable_table_in_column = state.disable_table_in_column
+            state.disable_table_in_column = True
+            col = k._build(params)
+            state.disable_table_in_column = disable_table_in_column
         else:
             col = k
         parts.append('%s = %s' % (col, v._build(params)))
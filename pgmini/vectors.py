@@ -0,0 +1,69 @@
+from array import array
+from types import MappingProxyType
+from typing import Any, Final
+
+
+# array.array typecode or memoryview format -> numpy dtype kind: 'b' bool, 'i', 'u', 'f'
+_TYPECODE_KINDS: Final[MappingProxyType] = MappingProxyType({
+    '?': 'b',
+    'b': 'i', 'h': 'i', 'i': 'i', 'l': 'i', 'q': 'i',
+    'B': 'u', 'H': 'u', 'I': 'u', 'L': 'u', 'Q': 'u',
+    'f': 'f', 'd': 'f',
+})
+_NUMPY_KINDS: Final[frozenset[str]] = frozenset('biuf')
+
+# (kind, item size) -> postgres type able to hold every value
+_PG_TYPES: Final[MappingProxyType] = MappingProxyType({
+    ('b', 1): 'bool',
+    ('i', 1): 'int2',
+    ('i', 2): 'int2',
+    ('i', 4): 'int4',
+    ('i', 8): 'int8',
+    ('u', 1): 'int2',
+    ('u', 2): 'int4',
+    ('u', 4): 'int8',
+    ('u', 8): 'numeric',
+    ('f', 2): 'float4',
+    ('f', 4): 'float4',
+    ('f', 8): 'float8',
+})
+
+
+def is_ndarray(value: Any) -> bool:
+    # checked by the type name, so numpy is imported only by the code which made the value
+    cls = type(value)
+    return cls.__name__ == 'ndarray' and cls.__module__ == 'numpy'
+
+
+def vector_kind(value: Any) -> str | None:
+    """
+    Kind of 1-d array.array, memoryview or numpy array of numbers:
+    'b' bool, 'i' signed, 'u' unsigned or 'f' float; None for any other value.
+    """
+    cls = type(value)
+    if cls is array:
+        return _TYPECODE_KINDS.get(value.typecode)
+    elif cls is memoryview:
+        return _TYPECODE_KINDS.get(value.format) if value.ndim == 1 else None
+    elif (
+        cls.__name__ == 'ndarray'
+        and cls.__module__ == 'numpy'
+        and value.ndim == 1
+        and value.dtype.kind in _NUMPY_KINDS
+    ):
+        return value.dtype.kind
+    return None
+
+
+def vector_type(value: Any) -> str | None:
+    """Postgres type of items of a vector (see vector_kind), None for any other value"""
+    if (kind := vector_kind(value)) is None:
+        return None
+    return _PG_TYPES.get((kind, value.dtype.itemsize if is_ndarray(value) else value.itemsize))
+
+
+def join_vector(value: Any, kind: str) -> str:
+    """Items as sql literals joined by `, `: converted all at once by tolist(), then list repr"""
+    if kind == 'b':
+        return ', '.join(['TRUE' if i else 'FALSE' for i in value.tolist()])
+    return repr(value.tolist())[1:-1]
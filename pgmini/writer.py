@@ -0,0 +1,84 @@
+from abc import abstractmethod
+
+from .alias import extract_alias
+from .utils import CompileABC
+
+
+class WriterABC(CompileABC):
+    """
+    Node appending its sql to the buffer shared by the whole build,
+    so nested nodes don't copy the same text on every level.
+    """
+
+    @abstractmethod
+    def _write(self, buf: list[str], params: list | dict) -> None:
+        raise NotImplementedError
+
+    def _build(self, params: list | dict) -> str:
+        buf = []
+        self._write(buf, params)
+        return ''.join(buf)
+
+
+class MarkedWriterABC(WriterABC):
+    """Writer of an expression which can be casted, aliased, ordered etc."""
+
+    @abstractmethod
+    def _write_value(self, buf: list[str], params: list | dict) -> None:
+        raise NotImplementedError
+
+    def _write(self, buf: list[str], params: list | dict) -> None:
+        if alias := extract_alias(self):
+            buf.append(alias)
+        elif self._marks:
+            prefix, suffix = self._marks.affixes(self)
+            if prefix:
+                buf.append(prefix)
+            self._write_value(buf, params)
+            if suffix:
+                buf.append(suffix)
+        else:
+            self._write_value(buf, params)
+
+
+class ExpressionABC(WriterABC):
+    """
+    Expression which can nest itself to any depth, like chains built in loops:
+    written with an explicit stack instead of recursion.
+    """
+
+    _STACKED: bool = True
+
+    @abstractmethod
+    def _parts(self, params: list | dict) -> tuple | list:
+        """Sql fragments and child nodes in output order"""
+        raise NotImplementedError
+
+    def _expand(self, params: list | dict) -> tuple | list:
+        if alias := extract_alias(self):
+            return (alias,)
+        elif self._marks:
+            prefix, suffix = self._marks.affixes(self)
+            return (prefix, *self._parts(params), suffix)
+        return self._parts(params)
+
+    def _write(self, buf: list[str], params: list | dict) -> None:
+        stack = [self]
+        pop, push, write = stack.pop, stack.extend, buf.append
+        while stack:
+            item = pop()
+            if item.__class__ is str:
+                write(item)
+            elif not item._STACKED:
+                item._write(buf, params)
+            elif item._marks:
+                push(reversed(item._expand(params)))
+            else:
+                push(reversed(item._parts(params)))
+
+
+def write_joined(buf: list[str], items, params: list | dict, sep: str = ', ') -> None:
+    for index, i in enumerate(items):
+        if index:
+            buf.append(sep)
+        i._write(buf, params)
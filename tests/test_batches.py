@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from pgmini import (
+    Insert as Ins,
+    Literal as L,
+    Select as S,
+    Table as T,
+    With as W,
+    build,
+    build_batches,
+)
+
+
+t = T('t')
+
+
+def test_list():
+    rows = [(i, 'n%d' % i) for i in range(5)]
+    batches = list(build_batches(Ins(t, ('id', 'name')), rows, max_params=4))
+    assert batches == [
+        ('INSERT INTO t (id, name) VALUES ($1, $2), ($3, $4)', [0, 'n0', 1, 'n1']),
+        ('INSERT INTO t (id, name) VALUES ($1, $2), ($3, $4)', [2, 'n2', 3, 'n3']),
+        ('INSERT INTO t (id, name) VALUES ($1, $2)', [4, 'n4']),
+    ]
+    # the same as building each batch on its own
+    assert batches[0] == build(Ins(t, ('id', 'name')).Values(*rows[:2]))
+
+
+def test_generator_with_other_params():
+    sq = S(t.id).From(t).Where(t.id > 100).Subquery('sq')
+    q = (
+        W(sq).Insert(t, ('id', 'x'))
+        .OnConflict(index_elements=('id',), do_update={'x': t.x + 1})
+        .Returning(t.id)
+    )
+    batches = list(build_batches(q, ((i, i) for i in range(3)), max_params=6))
+    sql = (
+        'WITH sq AS (SELECT id FROM t WHERE id > $1)'
+        ' INSERT INTO t (id, x) VALUES ($2, $3), ($4, $5)'
+        ' ON CONFLICT (id) DO UPDATE SET x = t.x + $6 RETURNING t.id'
+    )
+    assert batches == [
+        (sql, [100, 0, 0, 1, 1, 1]),
+        (sql.replace(', ($4, $5)', '').replace('$6', '$4'), [100, 2, 2, 1]),
+    ]
+
+
+def test_psycopg():
+    batches = build_batches(Ins(t, ('a',)), [(1,), (2,), (3,)], max_params=2, driver='psycopg')
+    assert list(batches) == [
+        ('INSERT INTO t (a) VALUES (%(p1)s), (%(p2)s)', {'p1': 1, 'p2': 2}),
+        ('INSERT INTO t (a) VALUES (%(p1)s)', {'p1': 3}),
+    ]
+
+
+def test_expressions_in_rows():
+    batches = build_batches(Ins(t, ('a', 'b')), [(1, L(5)), (2, 3)], max_params=10)
+    assert list(batches) == [('INSERT INTO t (a, b) VALUES ($1, 5), ($2, $3)', [1, 2, 3])]
+
+
+def test_numpy_column():
+    np = pytest.importorskip('numpy')
+    rows = [(i, np.arange(i, dtype='int32')) for i in range(3)]
+    batches = list(build_batches(Ins(t, ('id', 'tags')), rows, max_params=4, driver='psycopg'))
+    assert batches == [
+        (
+            'INSERT INTO t (id, tags) VALUES (%(p1)s, %(p2)s::int4[]), (%(p3)s, %(p4)s::int4[])',
+            {'p1': 0, 'p2': [], 'p3': 1, 'p4': [0]},
+        ),
+        ('INSERT INTO t (id, tags) VALUES (%(p1)s, %(p2)s::int4[])', {'p1': 2, 'p2': [0, 1]}),
+    ]
+    assert batches[0] == build(Ins(t, ('id', 'tags')).Values(*rows[:2]), driver='psycopg')
+
+
+def test_async():
+    async def rows():
+        for i in range(3):
+            yield i, i
+
+    async def collect():
+        return [i async for i in build_batches(Ins(t, ('a', 'b')), rows(), max_params=4)]
+
+    assert asyncio.run(collect()) == [
+        ('INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4)', [0, 0, 1, 1]),
+        ('INSERT INTO t (a, b) VALUES ($1, $2)', [2, 2]),
+    ]
+
+
+def test_empty():
+    assert list(build_batches(Ins(t, ('a',)), [])) == []
+
+
+@pytest.mark.parametrize('q,rows,max_params', [
+    pytest.param(Ins(t, ('a', 'b')), [(1,)], 10, id='row length'),
+    pytest.param(Ins(t, ('a', 'b')), [(1, 2)], 1, id='max params'),
+    pytest.param(Ins(t, ('a',)).Values((1,)), [(1,)], 10, id='values'),
+])
+def test_invalid(q, rows, max_params):
+    with pytest.raises(ValueError):
+        list(build_batches(q, rows, max_params=max_params))
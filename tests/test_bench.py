@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from pgmini import build
+from pgmini.bench import SHAPES, compare, main
+
+
+@pytest.mark.parametrize('name', SHAPES)
+def test_shapes_build(name):
+    sql, _ = build(SHAPES[name]())
+    assert sql
+
+
+def test_compare():
+    results = {'a': {'ops': 85.0}, 'b': {'ops': 95.0}, 'c': {'ops': 10.0}}
+    baseline = {'a': {'ops': 100.0}, 'b': {'ops': 100.0}}
+    assert compare(results, baseline, tolerance=0.1) == {'a': pytest.approx(-0.15)}
+
+
+def test_main_save_compare(tmp_path, capsys):
+    path = tmp_path / 'baseline.json'
+    assert main(['--filter', 'readme_select', '--min-time', '0', '--save', str(path)]) == 0
+    data = json.loads(path.read_text())
+    assert set(data['results']) == {'readme_select'}
+    assert set(data['results']['readme_select']) == {'ops', 'p50_us', 'p99_us', 'peak_kib'}
+
+    data['results']['readme_select']['ops'] *= 1000
+    path.write_text(json.dumps(data))
+    assert main(['--filter', 'readme_select', '--min-time', '0', '--compare', str(path)]) == 1
+    assert 'regressions: readme_select' in capsys.readouterr().out
+
+
+def test_main_cached(tmp_path):
+    path = tmp_path / 'baseline.json'
+    args = ['--filter', 'readme_where', '--min-time', '0']
+    assert main([*args, '--cached', '--save', str(path)]) == 0
+    assert json.loads(path.read_text())['cached'] is True
+
+    with pytest.raises(SystemExit):
+        main([*args, '--compare', str(path)])
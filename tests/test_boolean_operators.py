@@ -1,6 +1,17 @@
 import pytest
 
-from pgmini import And, Exists as E, Literal as L, Not, Or, Param as P, Select as S, Table, build
+from pgmini import (
+    And,
+    Exists as E,
+    Literal as L,
+    Not,
+    Or,
+    Param as P,
+    Raw,
+    Select as S,
+    Table,
+    build,
+)
 
 from .utils import compact
 
@@ -38,6 +49,17 @@ def test_wrapper_ignored(cls):
     assert build(cls(Or(L(1) == 2, L(3) == 4))) == ('1 = $1 OR 3 = $2', [2, 4])
 
 
+def test_empty_skipped():
+    assert build(And(L(1) == 2, Or(), And(), L(3) == 4)) == ('1 = $1 AND 3 = $2', [2, 4])
+
+
+def test_nested():
+    cond = L(0) == t.x
+    for i in range(1, 4):
+        cond = (Or if i % 2 else And)(cond, L(i) == t.x)
+    assert build(cond)[0] == '(0 = t.x OR 1 = t.x) AND 2 = t.x OR 3 = t.x'
+
+
 def test_And_cast_alias():
     assert build(And(L(1) == 2, L(True) == True).Cast('bool').As('val')) == (  # noqa: E712
         '(1 = $1 AND TRUE IS $2)::bool AS val',
@@ -66,6 +88,18 @@ def test_Or_with_brackets():
     )
 
 
+def test_single_element_Or_with_brackets():
+    assert build(And(And(Or(t.a == 1, t.b == 2)), t.c == 3)) == (
+        '(t.a = $1 OR t.b = $2) AND t.c = $3',
+        [1, 2, 3],
+    )
+
+
+def test_Raw_with_brackets():
+    assert build(And(Raw('a OR b'), t.c == 3)) == ('(a OR b) AND t.c = $1', [3])
+    assert build(And(Raw('flag'), Not(t.c == 3))) == ('flag AND NOT t.c = $1', [3])
+
+
 def test_And_operationable():
     assert build(And(L(1) == L(2), L(3) == L(4)) == L(5))[0] == '(1 = 2 AND 3 = 4) = 5'
 
@@ -1,4 +1,19 @@
-from pgmini import Param as P, Select as S, build
+import pytest
+
+from pgmini import (
+    Case as C,
+    Not,
+    Or,
+    Param as P,
+    ParamStyle,
+    Placeholder as Ph,
+    Select as S,
+    Table as T,
+    With as W,
+    build,
+    compile,
+)
+from pgmini.utils import CTX_STATE
 
 
 def test_asyncpg_dollar_sign():
@@ -9,3 +24,64 @@ def test_psycopg2_params():
     sql, params = build(S(1, P('a').Cast('str')), driver='psycopg')
     assert sql == 'SELECT %(p1)s, %(p2)s::str'
     assert params == {'p1': 1, 'p2': 'a'}
+
+
+def test_format_params():
+    t = T('t')
+    q = S(t.id).From(t).Where(t.id == 1, t.tags[P(1)] == P([1, 2])[2])
+    assert build(q, driver='format') == (
+        'SELECT id FROM t WHERE id = %s AND tags[%s] = (%s)[%s]', [1, 1, [1, 2], 2],
+    )
+
+
+def test_named_params():
+    q = S(1, P('a').Cast('text'), Ph('x'))
+    sql, params = build(q, driver='named')
+    assert sql == 'SELECT :p1, :p2::text, :p3'
+    assert list(params) == ['p1', 'p2', 'p3']
+    assert compile(q, driver='named').bind(x=3) == {'p1': 1, 'p2': 'a', 'p3': 3}
+
+
+def test_custom_param_style():
+    class QMark(ParamStyle):
+        def new_params(self):
+            return []
+
+        def add(self, params, value):
+            params.append(value)
+            return '?'
+
+        def key(self, number):
+            return number - 1
+
+    assert build(S(1, P('a')), driver=QMark()) == ('SELECT ?, ?', [1, 'a'])
+
+
+def test_unknown_driver():
+    with pytest.raises(ValueError):
+        build(S(1), driver='mysql')
+
+
+def test_state_reset():
+    t = T('t')
+    with pytest.raises(ValueError):
+        build(W(S(t.id).From(t).Subquery('x')).Select(1).From(W(S(1).Subquery('y')).Select(1).Subquery('z')))
+    with pytest.raises(LookupError):
+        CTX_STATE.get()
+    assert build(S(t.id).From(t)) == ('SELECT id FROM t', [])
+
+
+def test_deep_chain():
+    t, depth = T('t'), 10_000
+    expr, cond = t.x, t.x == 0
+    for i in range(depth):
+        expr = expr + t.y
+        cond = Or(Not(cond), C((t.y == i, 1), Else=t.z) > i)
+
+    assert build(expr) == ('(' * (depth - 1) + 't.x + t.y' + ') + t.y' * (depth - 1), [])
+
+    sql, params = build(cond)
+    case = 'CASE WHEN t.y = $%d THEN $%d ELSE t.z END > $%d'
+    assert sql.startswith('NOT (' * (depth - 1) + 'NOT t.x = $1 OR %s)' % (case % (2, 3, 4)))
+    assert sql.endswith(') OR %s' % (case % tuple(range(depth * 3 - 1, depth * 3 + 2))))
+    assert len(params) == depth * 3 + 1
@@ -0,0 +1,205 @@
+import time
+
+import pytest
+
+from pgmini import (
+    Excluded,
+    Insert as Ins,
+    Literal as L,
+    Param as P,
+    Placeholder as Ph,
+    Select as S,
+    Table as T,
+    TemplateCache,
+    build,
+    build_many,
+    compile,
+)
+
+from .utils import compact
+
+
+t = T('t')
+
+
+def test_bind():
+    q = S(t.id).From(t).Where(t.id == Ph('user_id'), t.status == Ph('status')).Limit(10)
+    cq = compile(q)
+    assert cq.sql == 'SELECT id FROM t WHERE id = $1 AND status = $2 LIMIT $3'
+    assert cq.names == {'user_id', 'status'}
+    assert cq.bind(user_id=5, status='active') == [5, 'active', 10]
+    assert cq.bind(status='deleted', user_id=7) == [7, 'deleted', 10]
+
+
+def test_bind_psycopg():
+    cq = compile(S(t.id).From(t).Where(t.id == Ph('id'), t.x > 1), driver='psycopg')
+    assert cq.sql == 'SELECT id FROM t WHERE id = %(p1)s AND x > %(p2)s'
+    assert cq.bind(id=3) == {'p1': 3, 'p2': 1}
+
+
+def test_bind_repeated_name():
+    cq = compile(S(t.id).From(t).Where(Ph('x').Cast('int') < t.id, t.id < Ph('x')))
+    assert cq.sql == 'SELECT id FROM t WHERE $1::int < id AND id < $2'
+    assert cq.bind(x=5) == [5, 5]
+
+
+def test_bind_not_shared():
+    cq = compile(Ins(t, columns=('a', 'b')).Values((Ph('a'), L(1))))
+    params = cq.bind(a=1)
+    params.append(2)
+    assert cq.bind(a=3) == [3]
+
+
+def test_bind_missing():
+    cq = compile(S(Ph('a'), Ph('b')))
+    with pytest.raises(TypeError):
+        cq.bind(a=1)
+    with pytest.raises(TypeError):
+        cq.bind(a=1, b=2, c=3)
+
+
+def test_empty_name():
+    with pytest.raises(ValueError):
+        Ph('')
+
+
+def test_cache():
+    cache = TemplateCache(maxsize=2)
+    q1, q2, q3 = S(Ph('a')), S(Ph('b')), S(Ph('c'))
+
+    cq = cache.compile(q1)
+    assert cache.compile(q1) is cq
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.compile(q1, driver='psycopg').sql == 'SELECT %(p1)s'
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    cache.compile(q2)
+    cache.compile(q3)
+    assert len(cache) == 2
+    assert cache.compile(q1) is not cq
+    assert (cache.hits, cache.misses) == (1, 5)
+
+    cache.clear()
+    assert (len(cache), cache.hits, cache.misses) == (0, 0, 0)
+
+
+def test_cache_structural_key():
+    def query(user_id: int, limit: int):
+        t = T('t')
+        return (
+            S(t.id).From(t)
+            .Where(t.user_id == user_id, t.status == Ph('status'), t.id[1:2] > 0)
+            .Limit(limit)
+        )
+
+    cache = TemplateCache()
+    cq1 = cache.compile(query(1, 10))
+    cq2 = cache.compile(query(2, 20))
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cq1.sql == cq2.sql == compact('''
+        SELECT id FROM t
+        WHERE user_id = $1 AND status = $2 AND id[$3:$4] > $5
+        LIMIT $6
+    ''')
+    assert cq1.bind(status='a') == [1, 'a', 1, 2, 0, 10]
+    assert cq2.bind(status='b') == [2, 'b', 1, 2, 0, 20]
+
+
+def test_cache_null_param():
+    cache = TemplateCache()
+    assert cache.compile(S(t.id).From(t).Where(t.id == 1)).sql == 'SELECT id FROM t WHERE id = $1'
+    assert cache.compile(S(t.id).From(t).Where(t.id == None)).sql == (  # noqa: E711
+        'SELECT id FROM t WHERE id IS $1'
+    )
+    assert cache.misses == 2
+
+
+def test_cache_shared_param():
+    cache = TemplateCache()
+    p1, p2 = P(1), P(2)
+    assert cache.compile(S(p1, p1), driver='psycopg').bind() == {'p1': 1, 'p2': 1}
+    assert cache.compile(S(p1, p2), driver='psycopg').bind() == {'p1': 1, 'p2': 2}
+    assert cache.compile(S(p2, p2), driver='psycopg').bind() == {'p1': 2, 'p2': 2}
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_same_tables():
+    # sql depends on which tables are the same object, not only on their names
+    cache = TemplateCache()
+    t1, t2 = T('t'), T('t')
+    assert cache.compile(S(t1.id).From(t1)).sql == 'SELECT id FROM t'
+    assert cache.compile(S(t1.id).From(t2)).sql == 'SELECT t.id FROM t'
+    assert cache.compile(S(t2.id).From(t2)).sql == 'SELECT id FROM t'
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_hit_cheaper_than_build():
+    # a hit walks the tree once, cheaper than building its sql; the same object is memoized
+    from pgmini.bench import SHAPES
+
+    make = SHAPES['wide_select']
+    cache = TemplateCache()
+    cache.compile(make())
+
+    def best(fn) -> float:
+        res = []
+        for q in [make() for _ in range(5)]:
+            start = time.perf_counter()
+            fn(q)
+            res.append(time.perf_counter() - start)
+        return min(res)
+
+    assert best(cache.compile) < best(build)
+    assert cache.hits == 5
+
+    q = make()
+    assert cache.compile(q).sql == build(q)[0]
+    assert best(lambda _: cache.compile(q)) < best(build) / 5
+
+
+def test_build_many():
+    q = (
+        Ins(t, ('id', 'name')).Values((Ph('id'), Ph('name')))
+        .OnConflict(index_elements=('id',), do_update={'name': Excluded('name'), 'cnt': t.cnt + 1})
+    )
+    sql, params = build_many(q, [{'id': 1, 'name': 'a', 'other': 0}, (2, 'b')])
+    assert sql == compact('''
+        INSERT INTO t (id, name) VALUES ($1, $2)
+        ON CONFLICT (id) DO UPDATE SET name = excluded.name, cnt = t.cnt + $3
+    ''')
+    assert list(params) == [(1, 'a', 1), (2, 'b', 1)]
+
+
+def test_build_many_psycopg():
+    q = Ins(t, ('a', 'b')).Values((Ph('b'), Ph('a').Cast('int')))
+    sql, params = build_many(q, [{'a': 1, 'b': 2}, (3, 4)], driver='psycopg')
+    assert sql == 'INSERT INTO t (a, b) VALUES (%(p1)s, %(p2)s::int)'
+    assert compile(q).ordered_names == ('b', 'a')
+    assert list(params) == [{'p1': 2, 'p2': 1}, {'p1': 3, 'p2': 4}]
+
+
+def test_build_many_same_as_build():
+    rows = [(i, 'x%d' % i) for i in range(3)]
+    q = Ins(t, ('a', 'b', 'c')).Values((Ph('a'), L(5), Ph('b'))).Returning(t.a)
+    _, params = build_many(q, rows)
+    for row, row_params in zip(rows, params, strict=True):
+        assert build(Ins(t, ('a', 'b', 'c')).Values((row[0], L(5), row[1])).Returning(t.a)) == (
+            'INSERT INTO t (a, b, c) VALUES ($1, 5, $2) RETURNING t.a',
+            list(row_params),
+        )
+
+
+def test_build_many_invalid():
+    q = Ins(t, ('a', 'b')).Values((Ph('a'), Ph('b')))
+    with pytest.raises(TypeError):
+        list(build_many(q, [{'a': 1}])[1])
+    with pytest.raises(TypeError):
+        list(build_many(q, [(1, 2, 3)])[1])
+
+
+def test_cache_vectors():
+    np = pytest.importorskip('numpy')
+    cache = TemplateCache()
+    cache.compile(S(P(np.arange(2))), driver='psycopg')
+    cq = cache.compile(S(P(np.arange(3))), driver='psycopg')
+    assert (cache.hits, cq.sql, cq.bind()) == (1, 'SELECT %(p1)s::int8[]', {'p1': [0, 1, 2]})
@@ -0,0 +1,202 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+
+from pgmini import Copy, CopyEncoder, Table as T, build
+
+
+t = T('t')
+
+HEADER = b'PGCOPY\n\xff\r\n\x00' + b'\x00' * 8
+TRAILER = b'\xff\xff'
+
+
+def encode(types, rows, format='binary', **kwargs) -> bytes:
+    return b''.join(CopyEncoder(types, format=format).encode(rows, **kwargs))
+
+
+def test_statement():
+    q = Copy(t, ('id', t.name))
+    assert build(q) == ('COPY t (id, name) FROM STDIN WITH (FORMAT binary)', [])
+    assert build(q.Format('csv')) == ('COPY t (id, name) FROM STDIN WITH (FORMAT csv)', [])
+    assert q.Format('text').Encoder(('int', 'text')).format == 'text'
+
+    with pytest.raises(ValueError):
+        q.Format('json')
+    with pytest.raises(ValueError):
+        q.Encoder(('int',))
+    with pytest.raises(ValueError):
+        Copy(t, ())
+
+
+def test_binary():
+    assert encode(('int8', 'varchar(10)'), [(1, 'a'), (None, 'bc')]) == b''.join([
+        HEADER,
+        b'\x00\x02', b'\x00\x00\x00\x08', b'\x00\x00\x00\x00\x00\x00\x00\x01',
+        b'\x00\x00\x00\x01', b'a',
+        b'\x00\x02', b'\xff\xff\xff\xff', b'\x00\x00\x00\x02', b'bc',
+        TRAILER,
+    ])
+
+
+@pytest.mark.parametrize('type_,value,field', [
+    pytest.param('bool', True, b'\x00\x00\x00\x01\x01', id='bool'),
+    pytest.param('smallint', -2, b'\x00\x00\x00\x02\xff\xfe', id='int2'),
+    pytest.param('integer', 258, b'\x00\x00\x00\x04\x00\x00\x01\x02', id='int4'),
+    pytest.param('float4', 1.5, b'\x00\x00\x00\x04\x3f\xc0\x00\x00', id='float4'),
+    pytest.param(
+        'double precision', -2.0, b'\x00\x00\x00\x08\xc0\x00\x00\x00\x00\x00\x00\x00', id='float8',
+    ),
+    pytest.param('bytea', b'\x00\x01', b'\x00\x00\x00\x02\x00\x01', id='bytea'),
+    pytest.param('text', 'й', b'\x00\x00\x00\x02\xd0\xb9', id='text utf8'),
+    pytest.param('json', {'a': 1}, b'\x00\x00\x00\x08{"a": 1}', id='json'),
+    pytest.param('jsonb', '[]', b'\x00\x00\x00\x03\x01[]', id='jsonb'),
+    pytest.param(
+        'uuid',
+        UUID('12345678-1234-5678-1234-567812345678'),
+        b'\x00\x00\x00\x10' + bytes.fromhex('12345678123456781234567812345678'),
+        id='uuid',
+    ),
+    pytest.param('date', date(2000, 1, 2), b'\x00\x00\x00\x04\x00\x00\x00\x01', id='date'),
+    pytest.param('date', date(1999, 12, 31), b'\x00\x00\x00\x04\xff\xff\xff\xff', id='date before'),
+    pytest.param(
+        'time', time(0, 0, 1, 5), b'\x00\x00\x00\x08' + (1_000_005).to_bytes(8, 'big'), id='time',
+    ),
+    pytest.param(
+        'timestamp',
+        datetime(2000, 1, 1, 0, 0, 1),
+        b'\x00\x00\x00\x08' + (1_000_000).to_bytes(8, 'big'),
+        id='timestamp',
+    ),
+    pytest.param(
+        'timestamptz',
+        datetime(2000, 1, 1, 2, tzinfo=timezone(timedelta(hours=1))),
+        b'\x00\x00\x00\x08' + (3_600_000_000).to_bytes(8, 'big'),
+        id='timestamptz',
+    ),
+])
+def test_binary_types(type_, value, field):
+    assert encode((type_,), [(value,)]) == HEADER + b'\x00\x01' + field + TRAILER
+
+
+def _numeric(ndigits, weight, sign, dscale, *digits) -> bytes:
+    items = (ndigits, weight, sign, dscale, *digits)
+    data = b''.join((i & 0xFFFF).to_bytes(2, 'big') for i in items)
+    return len(data).to_bytes(4, 'big') + data
+
+
+@pytest.mark.parametrize('value,field', [
+    pytest.param(Decimal('12345.678'), _numeric(3, 1, 0, 3, 1, 2345, 6780), id='fraction'),
+    pytest.param(Decimal('-0.0012'), _numeric(1, -1, 0x4000, 4, 12), id='negative small'),
+    pytest.param(Decimal('0.00001'), _numeric(1, -2, 0, 5, 1000), id='leading zero groups'),
+    pytest.param(Decimal('1E+5'), _numeric(1, 1, 0, 0, 10), id='exponent'),
+    pytest.param(Decimal('0.00'), _numeric(0, 0, 0, 2), id='zero'),
+    pytest.param(10000, _numeric(1, 1, 0, 0, 1), id='int'),
+    pytest.param(1.25, _numeric(2, 0, 0, 2, 1, 2500), id='float'),
+    pytest.param(Decimal('NaN'), _numeric(0, 0, 0xC000, 0), id='nan'),
+])
+def test_binary_numeric(value, field):
+    assert encode(('numeric(10, 2)',), [(value,)]) == HEADER + b'\x00\x01' + field + TRAILER
+
+
+def test_text():
+    rows = [
+        (1, 'a\tb\\c\nd', True, None),
+        (2, '', False, b'\x01'),
+        (3, 'x', None, b''),
+    ]
+    assert encode(('int', 'text', 'bool', 'bytea'), rows, format='text') == (
+        b'1\ta\\tb\\\\c\\nd\tt\t\\N\n'
+        b'2\t\tf\t\\\\x01\n'
+        b'3\tx\t\\N\t\\\\x\n'
+    )
+
+
+def test_csv():
+    rows = [
+        (1.5, 'a,b', {'k': 'v'}, date(2020, 1, 2)),
+        (float('nan'), '', None, None),
+        (float('-inf'), 'say "hi"', [1], date(2020, 1, 3)),
+    ]
+    assert encode(('float8', 'text', 'jsonb', 'date'), rows, format='csv') == (
+        b'1.5,"a,b","{""k"": ""v""}",2020-01-02\n'
+        b'NaN,"",,\n'
+        b'-Infinity,"say ""hi""",[1],2020-01-03\n'
+    )
+
+
+def test_chunks():
+    rows = [(i, 'x' * i) for i in range(50)]
+    data = encode(('int4', 'text'), rows)
+    chunks = list(CopyEncoder(('int4', 'text'), chunk_size=100).encode(iter(rows)))
+    assert b''.join(chunks) == data
+    assert {len(i) for i in chunks[:-1]} == {100}
+    assert 0 < len(chunks[-1]) <= 100
+
+
+@pytest.mark.parametrize('executor_cls', [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_executor(executor_cls):
+    rows = [(i, 'n%d' % i, None) for i in range(1_000)]
+    types = ('bigint', 'text', 'timestamptz')
+    with executor_cls(max_workers=2) as executor:
+        for format in ('binary', 'text'):
+            assert encode(types, rows, format=format, executor=executor, batch_size=64) == (
+                encode(types, rows, format=format)
+            )
+
+
+@pytest.mark.parametrize('types,format', [
+    pytest.param(('int[]',), 'text', id='array'),
+    pytest.param(('money',), 'binary', id='unknown binary'),
+    pytest.param('int', 'binary', id='str'),
+    pytest.param((), 'binary', id='empty'),
+    pytest.param(('int',), 'xml', id='format'),
+])
+def test_invalid_types(types, format):
+    with pytest.raises(ValueError):
+        CopyEncoder(types, format=format)
+
+
+@pytest.mark.parametrize('types,row', [
+    pytest.param(('int', 'int'), (1,), id='row length'),
+    pytest.param(('timestamptz',), (datetime(2000, 1, 1),), id='naive timestamptz'),
+    pytest.param(('numeric',), (Decimal('Infinity'),), id='numeric infinity'),
+])
+def test_invalid_rows(types, row):
+    with pytest.raises(ValueError):
+        encode(types, [row])
+
+
+def test_encode_columns():
+    np = pytest.importorskip('numpy')
+    types = ('bigint', 'float8', 'bool', 'int2', 'int4')
+    columns = [
+        np.arange(5),
+        np.linspace(0, 1, 5),
+        np.array([1, 0, 1, 0, 1], dtype=bool),
+        np.arange(-2, 3, dtype='int8'),
+        array('i', range(5)),
+    ]
+    rows = list(zip(*[i.tolist() for i in columns], strict=True))
+    for batch_size in (2, 10):
+        chunks = list(CopyEncoder(types, chunk_size=64).encode_columns(columns, batch_size))
+        assert b''.join(chunks) == encode(types, rows)
+        assert {len(i) for i in chunks[:-1]} == {64}
+
+
+@pytest.mark.parametrize('types,columns,error', [
+    pytest.param(('text',), [['a']], ValueError, id='not fixed size'),
+    pytest.param(('int4',), [[1], [2]], ValueError, id='columns count'),
+    pytest.param(('int4', 'int4'), [[1], [2, 3]], ValueError, id='lengths'),
+    pytest.param(('int4',), [array('q', [1])], TypeError, id='unsafe cast'),
+])
+def test_encode_columns_invalid(types, columns, error):
+    pytest.importorskip('numpy')
+    with pytest.raises(error):
+        CopyEncoder(types).encode_columns(columns)
+    with pytest.raises(ValueError):
+        CopyEncoder(('int4',), format='csv').encode_columns([[1]])
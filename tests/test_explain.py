@@ -0,0 +1,123 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from pgmini import (
+    CountEstimate,
+    Delete as D,
+    Explain,
+    F,
+    Insert as I,
+    Select as S,
+    Table as T,
+    Update as U,
+    With as W,
+    build,
+)
+from pgmini.explain import plan_rows
+
+
+t, u = T('orders'), T('users').As('u')
+
+PLANS = Path(__file__).parent / 'fixtures' / 'plans'
+
+
+@pytest.mark.parametrize('query', [
+    pytest.param(t, id='table'),
+    pytest.param(S(t.id, t.status).From(t).OrderBy(t.id).Limit(10), id='select of all rows'),
+])
+def test_count_estimate_table(query):
+    est = CountEstimate(query)
+    assert build(est) == (
+        'SELECT reltuples::bigint FROM pg_class WHERE oid = $1::regclass', ['orders'],
+    )
+    assert est.parse(1_000_000) == 1_000_000
+
+
+def test_count_estimate_select():
+    q = (
+        S(t.id, u.name).From(t).Join(u, u.id == t.user_id).Where(t.status == 'new')
+        .OrderBy(t.id).Limit(10)
+    )
+    est = q.ToCount(estimate=True)
+    assert build(est, driver='psycopg') == (
+        'EXPLAIN (FORMAT JSON) SELECT 1 FROM orders JOIN users AS u ON u.id = orders.user_id '
+        'WHERE orders.status = %(p1)s',
+        {'p1': 'new'},
+    )
+
+    text = (PLANS / 'estimate_filter.json').read_text()
+    assert est.parse(text) == est.parse(text.encode()) == est.parse(json.loads(text)) == 49810
+
+
+def test_count_estimate_group_by():
+    sq = S(t.id).From(t).Subquery('sq')
+    q = W(sq).Select(sq.id, F.count('*')).From(sq).GroupBy(sq.id)
+    assert build(CountEstimate(q)) == (
+        'EXPLAIN (FORMAT JSON) WITH sq AS (SELECT id FROM orders) '
+        'SELECT id, COUNT(*) FROM sq GROUP BY id',
+        [],
+    )
+
+
+@pytest.mark.parametrize('plan', [
+    pytest.param('[]', id='empty'),
+    pytest.param([{'Plan': {}}, {'Plan': {}}], id='few documents'),
+    pytest.param({'Plan': {'Node Type': 'Seq Scan'}}, id='no rows'),
+    pytest.param('{"Query": 1}', id='no plan'),
+])
+def test_plan_rows_invalid(plan):
+    with pytest.raises(ValueError):
+        plan_rows(plan)
+
+
+def test_count_estimate_invalid():
+    with pytest.raises(TypeError):
+        CountEstimate(S(1).Subquery('x'))
+
+
+def test_explain():
+    q = S(t.id).From(t).Where(t.status == 'new')
+    assert build(Explain(q)) == (
+        'EXPLAIN (FORMAT JSON) SELECT id FROM orders WHERE status = $1', ['new'],
+    )
+    assert build(Explain(q, analyze=True, buffers=True, settings=True, format='text')) == (
+        'EXPLAIN (ANALYZE, BUFFERS, SETTINGS, FORMAT TEXT) '
+        'SELECT id FROM orders WHERE status = $1',
+        ['new'],
+    )
+
+
+@pytest.mark.parametrize('query, sql', [
+    pytest.param(
+        I(t, columns=('id', 'status')).Values((1, 'new')),
+        'INSERT INTO orders (id, status) VALUES (%(p1)s, %(p2)s)',
+        id='insert',
+    ),
+    pytest.param(
+        U(t).Set({'status': 'new'}).Where(t.id == 1),
+        'UPDATE orders SET status = %(p1)s WHERE orders.id = %(p2)s',
+        id='update',
+    ),
+    pytest.param(
+        D(t).Where(t.status == 'new').Returning(t.id),
+        'DELETE FROM orders WHERE orders.status = %(p1)s RETURNING orders.id',
+        id='delete',
+    ),
+])
+def test_explain_modify(query, sql):
+    # params are the same as of the query itself
+    explained_sql, params = build(Explain(query, analyze=True), driver='psycopg')
+    assert (explained_sql, params) == ('EXPLAIN (ANALYZE, FORMAT JSON) ' + sql, params)
+    assert params == build(query, driver='psycopg')[1]
+
+
+@pytest.mark.parametrize('kwargs', [
+    pytest.param({'query': t}, id='table'),
+    pytest.param({'query': S(1), 'format': 'csv'}, id='format'),
+    pytest.param({'query': S(1), 'analyze': 'yes'}, id='analyze'),
+])
+def test_explain_invalid(kwargs):
+    with pytest.raises((TypeError, ValueError)):
+        Explain(**kwargs)
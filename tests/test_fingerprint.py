@@ -0,0 +1,76 @@
+from pgmini import (
+    F,
+    Insert as Ins,
+    Literal as L,
+    Param as P,
+    Placeholder as Ph,
+    Select as S,
+    Table as T,
+    Update as U,
+    With as W,
+    build,
+)
+
+
+def query(t: T, user_id, status: str):
+    return (
+        S(t.id, F.count('*').As('cnt')).From(t)
+        .Where(t.user_id == user_id, t.status.In([status, 'x']))
+        .GroupBy(t.id)
+        .Limit(10)
+    )
+
+
+def test_params_values_ignored():
+    assert query(T('t'), 1, 'a').Fingerprint() == query(T('t'), 2, 'b').Fingerprint()
+
+
+def test_structure():
+    t = T('t')
+    fp = query(t, 1, 'a').Fingerprint()
+    assert query(T('t2'), 1, 'a').Fingerprint() != fp
+    assert query(t, 1, 'a').Limit(None).Fingerprint() != fp
+    assert query(t, L(1), 'a').Fingerprint() != fp
+    assert query(t, P(1).Cast('int'), 'a').Fingerprint() != fp
+    assert query(t, None, 'a').Fingerprint() != fp  # `IS` instead of `=`
+    assert S(Ph('a')).Fingerprint() != S(Ph('b')).Fingerprint()
+    assert L(1).Fingerprint() != L(2).Fingerprint()
+    assert len({L(i).Fingerprint() for i in (1, 1.0, True, 0.0, -0.0)}) == 5
+    assert t.x[1].Fingerprint() == t.x[2].Fingerprint() != t.x[1:2].Fingerprint()
+
+
+def test_same_sources():
+    # equal tables which are different objects render differently: `id` vs `t.id`
+    t1, t2 = T('t'), T('t')
+    assert build(S(t1.id).From(t1))[0] != build(S(t1.id).From(t2))[0]
+    assert S(t1.id).From(t1).Fingerprint() == S(t2.id).From(t2).Fingerprint()
+    assert S(t1.id).From(t1).Fingerprint() != S(t1.id).From(t2).Fingerprint()
+
+    sq1, sq2 = S(t1.id).From(t1).Subquery('sq'), S(t1.id).From(t1).Subquery('sq')
+    assert W(sq1).Select(sq1.id).From(sq1).Fingerprint() != (
+        W(sq1).Select(sq1.id).From(sq2).Fingerprint()
+    )
+
+
+def test_statements():
+    t = T('t')
+    assert (
+        Ins(t, ('a', 'b')).Values((1, 2)).OnConflict(do_update={t.a: 1}).Fingerprint()
+        == Ins(t, ('a', 'b')).Values((3, 4)).OnConflict(do_update={t.a: 2}).Fingerprint()
+        != Ins(t, ('a', 'b')).Values((3, 4), (5, 6)).OnConflict(do_update={t.a: 2}).Fingerprint()
+    )
+    assert U(t).Set({t.a: 1}).Fingerprint() != U(t).Set({t.b: 1}).Fingerprint()
+
+
+def test_memoized():
+    q = query(T('t'), 1, 'a')
+    assert q.Fingerprint() is q.Fingerprint()
+    assert q.Where(T('t').x == 1).Fingerprint() != q.Fingerprint()
+
+
+def test_deep():
+    t = T('t')
+    expr = t.x
+    for i in range(10_000):
+        expr = expr + i
+    assert expr.Fingerprint() == expr.Fingerprint()
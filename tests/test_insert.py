@@ -1,3 +1,7 @@
+from array import array
+
+import pytest
+
 from pgmini import (
     NULL,
     And,
@@ -200,3 +204,88 @@ def test_on_conflict_do_update_multiple():
             col4 = excluded.col15 * t.col44::float
     ''')
     assert params == [12, 5, 88]
+
+
+def test_chain_keeps_values():
+    q = Ins(t, ('a', 'b')).Values((1, 2), (3, 4))
+    q2 = q.OnConflict(do_nothing=True).Returning(t.a)
+    assert q2._values is q._values  # not converted and validated again
+    assert build(q2) == (
+        'INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4) ON CONFLICT DO NOTHING RETURNING t.a',
+        [1, 2, 3, 4],
+    )
+
+    with pytest.raises(ValueError):
+        q.Values((1,))
+    with pytest.raises(ValueError):
+        q.Select(S(1, 2))
+
+
+def test_rows():
+    q = (
+        Ins(t, ('id', t.name))
+        .Rows([(1, 'a'), (2, 'b'), (3, 'c')], types=('int', 'text'))
+        .OnConflict(index_elements=('id',), do_update={'name': Excluded('name')})
+        .Returning(t.id)
+    )
+    assert build(q) == (
+        compact('''
+            INSERT INTO t (id, name) SELECT * FROM UNNEST($1::int[], $2::text[])
+            ON CONFLICT (id) DO UPDATE SET name = excluded.name
+            RETURNING t.id
+        '''),
+        [[1, 2, 3], ['a', 'b', 'c']],
+    )
+    # sql doesn't depend on number of rows
+    assert build(Ins(t, ('id', 'name')).Rows((), types=('int', 'text'))) == (
+        'INSERT INTO t (id, name) SELECT * FROM UNNEST($1::int[], $2::text[])',
+        [[], []],
+    )
+
+
+def test_columns():
+    q = Ins(t, (t.id, 'name')).Columns(('bigint', 'varchar(10)'), name=('a', 'b'), id=[1, 2])
+    assert build(q, driver='psycopg') == (
+        'INSERT INTO t (id, name) SELECT * FROM UNNEST(%(p1)s::bigint[], %(p2)s::varchar(10)[])',
+        {'p1': [1, 2], 'p2': ['a', 'b']},
+    )
+
+
+def test_columns_vectors():
+    ids, scores = array('q', [1, 2]), array('f', [0.5, 1.5])
+    q = Ins(t, ('id', 'score', 'name'))
+    q = q.Columns((None, None, 'text'), id=ids, score=scores, name='ab')
+    assert build(q) == (
+        compact('''
+            INSERT INTO t (id, score, name)
+            SELECT * FROM UNNEST($1::int8[], $2::float4[], $3::text[])
+        '''),
+        [ids, scores, ['a', 'b']],
+    )
+    with pytest.raises(ValueError):
+        Ins(t, ('id', 'name')).Columns(None, id=ids, name=['a', 'b'])
+
+
+def test_rows_numpy():
+    np = pytest.importorskip('numpy')
+    q = Ins(t, ('a', 'b')).Rows(np.array([[1, 2], [3, 4], [5, 6]], dtype='int32'))
+    assert build(q, driver='psycopg') == (
+        'INSERT INTO t (a, b) SELECT * FROM UNNEST(%(p1)s::int4[], %(p2)s::int4[])',
+        {'p1': [1, 3, 5], 'p2': [2, 4, 6]},
+    )
+    with pytest.raises(ValueError):
+        Ins(t, ('a',)).Rows(np.zeros((2, 2)))
+
+
+@pytest.mark.parametrize('make', [
+    pytest.param(lambda q: q.Rows([(1, 2), (1,)], types=('int', 'int')), id='row length'),
+    pytest.param(lambda q: q.Rows([(1, 2)], types=('int',)), id='types length'),
+    pytest.param(lambda q: q.Rows([(1, 2)], types='int'), id='types str'),
+    pytest.param(lambda q: q.Columns(('int', 'int'), a=[1]), id='missing column'),
+    pytest.param(lambda q: q.Columns(('int', 'int'), a=[1], b=[1], c=[1]), id='extra column'),
+    pytest.param(lambda q: q.Columns(('int', 'int'), a=[1], b=[1, 2]), id='column lengths'),
+    pytest.param(lambda q: q.Values((1, 2)).Rows([(1, 2)], types=('int', 'int')), id='values'),
+])
+def test_rows_invalid(make):
+    with pytest.raises(ValueError):
+        make(Ins(t, ('a', 'b')))
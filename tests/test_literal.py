@@ -1,3 +1,5 @@
+from array import array
+
 import pytest
 
 from pgmini import Literal as L, build
@@ -18,6 +20,39 @@ from pgmini import Literal as L, build
         "ARRAY[101, 102.55, 103, -5, NULL, '255', TRUE, FALSE, 0, 1]",
         id='to array',
     ),
+    pytest.param(L(list(range(-2, 3))), 'ARRAY[-2, -1, 0, 1, 2]', id='ints array'),
+    pytest.param(L([0.5, 1e20, 2.0]), 'ARRAY[0.5, 1e+20, 2.0]', id='floats array'),
+    pytest.param(L([7]), 'ARRAY[7]', id='single int array'),
+    pytest.param(L(array('q', [1, -2, 3])), 'ARRAY[1, -2, 3]', id='array.array of ints'),
+    pytest.param(
+        L(array('d', [0.5, 1.5])).Cast('float8[]'), 'ARRAY[0.5, 1.5]::float8[]',
+        id='array.array of floats',
+    ),
 ])
 def test(value: L, res: str):
     assert build(value) == (res, [])  # not modified
+
+
+def test_vector_invalid():
+    with pytest.raises(ValueError):
+        L(array('i'))
+    with pytest.raises(TypeError):
+        build(L(array('u', 'ab')))
+
+
+def test_numpy():
+    np = pytest.importorskip('numpy')
+    assert build(L(np.arange(3, dtype='int16'))) == ('ARRAY[0, 1, 2]', [])
+    assert build(L(np.array([0.5, -1.0]))) == ('ARRAY[0.5, -1.0]', [])
+    assert build(L(np.array([True, False]))) == ('ARRAY[TRUE, FALSE]', [])
+
+    with pytest.raises(ValueError):
+        L(np.array([], dtype='int64'))
+    with pytest.raises(TypeError):
+        build(L(np.array([[1, 2]])))
+
+    # fingerprint has every item, though repr of a large array skips the middle
+    a, b = np.arange(10_000), np.arange(10_000)
+    b[5000] = 0
+    assert L(a).Fingerprint() != L(b).Fingerprint()
+    assert L(a).Fingerprint() == L(np.arange(10_000)).Fingerprint()
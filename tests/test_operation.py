@@ -2,7 +2,7 @@ from datetime import date
 
 import pytest
 
-from pgmini import F, Literal as L, Param as P, Select as S, Table, build
+from pgmini import F, Literal as L, Param as P, Raw as R, Select as S, Table, build
 
 
 t, t2 = Table('t'), Table('t2')
@@ -199,6 +199,94 @@ def test_multiple():
         '(ARRAY_AGG(t.col))[$1]', [1],
         id='slice of function',
     ),
+    pytest.param(
+        (t.col + t.col2)[1],
+        '(t.col + t.col2)[$1]', [1],
+        id='slice of operation',
+    ),
+    pytest.param(
+        ((t.a == t.b) == (t.c == t.d)) == t.e,
+        '((t.a = t.b) = (t.c = t.d)) = t.e', [],
+        id='nested brackets',
+    ),
+    pytest.param(
+        F.coalesce(F.now(), t.col).Cast('int'),
+        'COALESCE(NOW(), t.col)::int', [],
+        id='cast of nested function',
+    ),
+    pytest.param(
+        R('(a) + (b)').Cast('int') + R('(a + b)').Cast('int'),
+        '((a) + (b))::int + (a + b)::int', [],
+        id='cast of raw',
+    ),
+    pytest.param(
+        R('a + b') * 2,
+        '(a + b) * $1', [2],
+        id='raw operand',
+    ),
+    pytest.param(
+        R('f(a)') * R('(a + b)') - R('x[1]'),
+        '(f(a) * (a + b)) - (x[1])', [],
+        id='raw atoms',
+    ),
+    pytest.param(
+        R('a OR b') == R('c'),
+        '(a OR b) = c', [],
+        id='raw of unknown precedence',
+    ),
+    pytest.param(
+        L(-1).Cast('int') - 1,
+        '(-1)::int - $1', [1],
+        id='cast of negative literal',
+    ),
 ])
 def test_other(operation, res: str, updated: list):
     assert build(operation) == (res, updated)
+
+
+class _Schema(Table):
+    id: int
+    name: 'str | None'
+    other: 'Unknown'  # noqa: F821
+
+
+s = _Schema('s')
+
+
+@pytest.mark.parametrize('operation,res,updated', [
+    pytest.param(t.col.In([1, 2], array_threshold=3), 't.col IN ($1, $2)', [1, 2], id='below'),
+    pytest.param(t.col.In((1, 2, 3), array_threshold=3), 't.col = ANY($1)', [[1, 2, 3]], id='in'),
+    pytest.param(
+        t.col.NotIn({'a'}, array_threshold=0), 't.col <> ALL($1)', [['a']], id='not in',
+    ),
+    pytest.param(
+        t.col.In([1, 2], array_threshold=1, cast='int'), 't.col = ANY($1::int[])', [[1, 2]],
+        id='cast',
+    ),
+    pytest.param(s.id.In([1], array_threshold=1), 's.id = ANY($1::bigint[])', [[1]], id='declared'),
+    pytest.param(
+        s.name.NotIn(['a'], array_threshold=1), 's.name <> ALL($1::text[])', [['a']],
+        id='declared optional',
+    ),
+    pytest.param(
+        s.name.In(['a'], array_threshold=1, cast='varchar'), 's.name = ANY($1::varchar[])', [['a']],
+        id='explicit over declared',
+    ),
+    pytest.param(s.other.In([1], array_threshold=1), 's.other = ANY($1)', [[1]], id='unknown type'),
+    pytest.param(
+        t.col.In([1, t.x], array_threshold=1), 't.col IN ($1, t.x)', [1], id='with expressions',
+    ),
+    pytest.param(
+        t.col.In(S(t2.id).From(t2), array_threshold=0), 't.col IN (SELECT id FROM t2)', [],
+        id='select',
+    ),
+])
+def test_in_array(operation, res: str, updated: list):
+    assert build(operation) == (res, updated)
+
+
+def test_in_array_same_sql():
+    q1 = S(t.id).From(t).Where(t.id.In(list(range(10)), array_threshold=5))
+    q2 = S(t.id).From(t).Where(t.id.In(list(range(1000)), array_threshold=5))
+    assert build(q1)[0] == build(q2)[0] == 'SELECT id FROM t WHERE id = ANY($1)'
+    assert q1.Fingerprint() == q2.Fingerprint()
@@ -1,6 +1,10 @@
+from array import array
+
 import pytest
 
-from pgmini import Param, build
+from pgmini import F, Param, Select as S, Table as T, With as W, build
+
+from .utils import compact
 
 
 @pytest.mark.parametrize('value,res,params', [
@@ -22,3 +26,101 @@ def test_value_not_copied():
     obj = Param(raw)
     raw.append(4)
     assert build(obj)[1] == [[1, 2, 3, 4]]
+
+
+def _dedup_query():
+    t = T('t')
+    tenant = Param(7)
+    sq = S(t.id).From(t).Where(t.tenant_id == tenant, t.ts > 10).Subquery('sq')
+    return (
+        W(sq).Select(sq.id).From(sq)
+        .Where(
+            t.tenant_id == tenant,
+            t.x == 7,
+            t.y == Param(7).Cast('bigint'),
+            t.z == Param(7).Cast('bigint'),
+            t.flag == True,  # noqa: E712
+            t.n == 1,
+            t.ids == [1],
+            t.ids2 == [1],
+        )
+        .Union(S(t.id).From(t).Where(t.tenant_id == tenant, t.ts > 10))
+    )
+
+
+def test_dedup_identity():
+    assert build(_dedup_query(), dedup='identity') == (
+        compact('''
+            WITH sq AS (SELECT id FROM t WHERE tenant_id = $1 AND ts > $2)
+            SELECT id FROM sq
+            WHERE t.tenant_id = $1 AND t.x = $3 AND t.y = $4::bigint AND t.z = $5::bigint
+                AND t.flag IS $6 AND t.n = $7 AND t.ids = $8 AND t.ids2 = $9
+            UNION SELECT id FROM t WHERE tenant_id = $1 AND ts > $10
+        '''),
+        [7, 10, 7, 7, 7, True, 1, [1], [1], 10],
+    )
+
+
+def test_dedup_value():
+    assert build(_dedup_query(), dedup='value') == (
+        compact('''
+            WITH sq AS (SELECT id FROM t WHERE tenant_id = $1 AND ts > $2)
+            SELECT id FROM sq
+            WHERE t.tenant_id = $1 AND t.x = $1 AND t.y = $3::bigint AND t.z = $3::bigint
+                AND t.flag IS $4 AND t.n = $5 AND t.ids = $6 AND t.ids2 = $7
+            UNION SELECT id FROM t WHERE tenant_id = $1 AND ts > $2
+        '''),
+        [7, 10, 7, True, 1, [1], [1]],
+    )
+
+
+def test_dedup_psycopg():
+    t = T('t')
+    p = Param('a')
+    assert build(S(p, p.Cast('text'), Param('a')).From(t), driver='psycopg', dedup='value') == (
+        'SELECT %(p1)s, %(p2)s::text, %(p1)s FROM t',
+        {'p1': 'a', 'p2': 'a'},
+    )
+
+
+def test_dedup_invalid():
+    with pytest.raises(ValueError):
+        build(Param(1), dedup='all')
+
+
+@pytest.mark.parametrize('dedup', ['identity', 'value'])
+def test_dedup_format(dedup):
+    # `%s` can't reference a value twice, a shared slot would leave fewer params than `%s`
+    t = T('t')
+    p = Param(5)
+    q = S(t.a).From(t).Where(t.a == p, t.b == p)
+    with pytest.raises(ValueError):
+        build(q, driver='format', dedup=dedup)
+    assert build(q, driver='format') == ('SELECT a FROM t WHERE a = %s AND b = %s', [5, 5])
+    assert build(q, driver='named', dedup=dedup) == (
+        'SELECT a FROM t WHERE a = :p1 AND b = :p1', {'p1': 5},
+    )
+
+
+def test_vector():
+    ids = array('i', [1, 2])
+    assert build(S(Param(ids))) == ('SELECT $1::int4[]', [ids])  # asyncpg takes it as is
+    assert build(S(Param(ids).Cast('bigint[]')), driver='psycopg') == (
+        'SELECT %(p1)s::bigint[]', {'p1': [1, 2]},
+    )
+    assert build(S(Param(memoryview(array('H', [3]))))) == ('SELECT $1::int4[]', [[3]])
+    chars = array('u', 'ab')
+    assert build(S(Param(chars))) == ('SELECT $1', [chars])  # not a vector of numbers
+
+
+def test_numpy():
+    np = pytest.importorskip('numpy')
+    t = T('t')
+    q = S(t.id).From(t).Where(t.id == F.any(Param(np.arange(3))), t.x == Param(np.array([0.5])))
+    sql, params = build(q)
+    assert sql == 'SELECT id FROM t WHERE id = ANY($1::int8[]) AND x = $2::float8[]'
+    assert params == [[0, 1, 2], [0.5]] and type(params[0][0]) is int
+    assert build(S(Param(np.array([True]))), driver='format') == ('SELECT %s::bool[]', [[True]])
+
+    assert Param(np.arange(3)).Fingerprint() != Param(np.arange(3, dtype='int32')).Fingerprint()
+    assert Param(np.arange(3)).Fingerprint() == Param(np.arange(5)).Fingerprint()
@@ -0,0 +1,88 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from pgmini.plan import disk_sorts, find_issues, misestimates, nested_loops, parse_plan, seq_scans
+
+
+PLANS = Path(__file__).parent / 'fixtures' / 'plans'
+
+
+def load(name: str):
+    return parse_plan((PLANS / name).read_text())
+
+
+def test_parse_plan():
+    text = (PLANS / 'analyze_issues.json').read_text()
+    plan = parse_plan(text)
+    assert plan == parse_plan(text.encode()) == parse_plan(json.loads(text))
+    assert plan.planning_time == 0.412
+    assert plan.execution_time == 2032.118
+    assert plan.settings == {'work_mem': '4MB', 'random_page_cost': '1.1'}
+
+    assert [(i.node_type, i.relation, i.alias) for i in plan.nodes()] == [
+        ('Sort', None, None),
+        ('Nested Loop', None, None),
+        ('Seq Scan', 'orders', 'o'),
+        ('Index Scan', 'users', 'u'),
+    ]
+    sort, loop, scan, index = plan.nodes()
+    assert sort.children == (loop,)
+    assert loop.children == (scan, index)
+    assert (scan.parent_relationship, index.parent_relationship) == ('Outer', 'Inner')
+    assert (index.plan_rows, index.actual_rows, index.actual_loops) == (1, 1, 120480)
+    assert index.fields['Index Name'] == 'users_pkey'
+    assert sort.fields['Sort Key'] == ['o.created_at DESC']
+    assert sort.analyzed
+
+
+def test_parse_plan_not_analyzed():
+    plan = load('estimate_filter.json')
+    assert plan.planning_time is plan.execution_time is None
+    assert not any(i.analyzed for i in plan.nodes())
+    assert [i.actual_rows for i in plan.nodes()] == [None] * 4
+
+
+def test_find_issues():
+    plan = load('analyze_issues.json')
+    sort, loop, scan, _ = plan.nodes()
+
+    assert [(i.kind, i.node, i.detail) for i in find_issues(plan)] == [
+        ('seq_scan', scan, '1000000 rows of orders'),
+        ('misestimate', scan, 'estimated 5000 rows, actual 120480'),
+        ('disk_sort', sort, 'external merge, 6544 kB'),
+        ('nested_loop', loop, '120480 loops of users'),
+    ]
+    assert find_issues(load('analyze_clean.json')) == []
+
+
+def test_thresholds():
+    plan = load('analyze_issues.json')
+    assert seq_scans(plan, min_rows=1_000_001) == []
+    assert [i.node.node_type for i in misestimates(plan, factor=2)] == [
+        'Sort', 'Nested Loop', 'Seq Scan',
+    ]
+    assert misestimates(plan, factor=25) == []
+    assert nested_loops(plan, min_loops=200_000) == []
+    assert disk_sorts(load('analyze_clean.json')) == []
+
+
+def test_not_analyzed():
+    # estimates only: rows of a scan are those planned, and nothing is known of misestimates
+    plan = load('estimate_filter.json')
+    assert [i.detail for i in seq_scans(plan)] == ['49810 rows of orders']
+    assert [i.node.relation for i in seq_scans(plan, min_rows=950)] == ['orders', 'users']
+    assert misestimates(plan) == disk_sorts(plan) == nested_loops(plan) == []
+
+
+@pytest.mark.parametrize('document', [
+    pytest.param('[]', id='empty'),
+    pytest.param([{'Plan': {}}, {'Plan': {}}], id='few documents'),
+    pytest.param({'Plan': {'Node Type': 'Seq Scan'}}, id='no rows'),
+    pytest.param('{"Query": 1}', id='no plan'),
+    pytest.param('["Seq Scan"]', id='not a document'),
+])
+def test_parse_plan_invalid(document):
+    with pytest.raises(ValueError):
+        parse_plan(document)
@@ -260,6 +260,10 @@ def test_order_by_desc():
     assert build(S(L(1)).From(t).OrderBy(t.id.Desc()))[0] == 'SELECT 1 FROM t ORDER BY id DESC'
 
 
+def test_order_by_asc():
+    assert build(S(L(1)).From(t).OrderBy(t.id.Asc()))[0] == 'SELECT 1 FROM t ORDER BY id ASC'
+
+
 def test_order_by_nulls_last():
     assert (
         build(S(L(1)).From(t).OrderBy(t.id.NullsLast()))[0]
@@ -575,3 +579,203 @@ def test_cte_with_select_from_function():
         'SELECT t.id FROM t JOIN sq ON sq.name = t.name2'
     )
     assert args == [[5, 6]]
+
+
+def test_chain_keeps_columns():
+    q = S(t.id, 1).From(t)
+    q2 = q.Where(t.id > 1).Where(t.id < 5).OrderBy(t.id).Limit(10)
+    assert q2._columns is q._columns
+    assert build(q2) == (
+        'SELECT id, $1 FROM t WHERE id > $2 AND id < $3 ORDER BY id LIMIT $4',
+        [1, 1, 5, 10],
+    )
+
+    with pytest.raises(ValueError):
+        q.From(1)
+
+
+def test_where_chain_shared():
+    base = S(t.id).From(t).Where(t.id > 0)
+    q1 = base.Where(t.x == 1).OrderBy(t.x)
+    q2 = base.Where(t.y == 2).Having(t.y > 3).Where(t.z == 3)
+    assert build(base) == ('SELECT id FROM t WHERE id > $1', [0])
+    assert build(q1) == ('SELECT id FROM t WHERE id > $1 AND x = $2 ORDER BY x', [0, 1])
+    assert build(q2) == (
+        'SELECT id FROM t WHERE id > $1 AND y = $2 AND z = $3 HAVING y > $4',
+        [0, 2, 3, 3],
+    )
+    assert q2.Fingerprint() != q1.Fingerprint()
+    assert q1.OrderBy(None)._order_by == ()
+
+
+def test_where_chain_long():
+    q = S(t.id).From(t)
+    for i in range(1_000):
+        q = q.Where(t.id != i)
+    sql, params = build(q)
+    assert sql.count(' AND ') == 999
+    assert params == list(range(1_000))
+
+
+def test_seek_after():
+    q = S(t.id).From(t).OrderBy(t.created.Desc(), t.id.Desc())
+    assert build(q.SeekAfter({'created': 5, 'id': 3}).Limit(10)) == (
+        compact('''
+            SELECT id FROM t WHERE (created, id) < ($1, $2)
+            ORDER BY created DESC, id DESC LIMIT $3
+        '''),
+        [5, 3, 10],
+    )
+    assert build(S(t.id).From(t).Where(t.x == 1).SeekAfter((7,), keys=(t.id,))) == (
+        'SELECT id FROM t WHERE x = $1 AND id > $2 ORDER BY id',
+        [1, 7],
+    )
+
+
+def test_seek_after_mixed():
+    q = S(t.id, (t.x + 1).As('y')).From(t).SeekAfter(
+        {'created': 5, 'y': 2, 'id': 3},
+        keys=(t.created.Desc(), (t.x + 1).As('y'), t.id.Asc()),
+    )
+    assert build(q, dedup='identity') == (
+        compact('''
+            SELECT id, x + $1 AS y FROM t
+            WHERE created <= $2
+                AND (
+                    created < $2
+                    OR created = $2 AND (x + $3) > $4
+                    OR created = $2 AND (x + $3) = $4 AND id > $5
+                )
+            ORDER BY created DESC, y, id ASC
+        '''),
+        [1, 5, 1, 2, 3],
+    )
+
+
+@pytest.mark.parametrize('keys,row', [
+    pytest.param((), (), id='no keys'),
+    pytest.param((t.id,), (1, 2), id='row length'),
+    pytest.param((t.id,), (None,), id='null value'),
+    pytest.param((t.id.NullsLast(),), (1,), id='nulls order'),
+    pytest.param((t.x + 1,), {'x': 1}, id='unnamed key'),
+])
+def test_seek_after_invalid(keys, row):
+    with pytest.raises(ValueError):
+        S(t.id).From(t).SeekAfter(row, keys=keys)
+
+
+def test_pages():
+    pages = S(t.id).From(t).Offset(100).Pages(2, keys=(t.id,))
+    assert build(next(pages)) == ('SELECT id FROM t ORDER BY id LIMIT $1', [2])
+    assert build(pages.send((2,))) == (
+        'SELECT id FROM t WHERE id > $1 ORDER BY id LIMIT $2', [2, 2],
+    )
+    assert build(pages.send({'id': 4})) == (
+        'SELECT id FROM t WHERE id > $1 ORDER BY id LIMIT $2', [4, 2],
+    )
+    with pytest.raises(TypeError):
+        next(pages)
+
+    with pytest.raises(ValueError):
+        next(S(t.id).From(t).Pages(2))
+
+
+def test_pages_for_loop():
+    # the next page is after the last fetched row, so iteration without send is an error,
+    # not a silent stop after the first page
+    seen = []
+    with pytest.raises(TypeError):
+        for page in S(t.id).From(t).Pages(2, keys=(t.id,)):
+            seen.append(build(page))
+    assert seen == [('SELECT id FROM t ORDER BY id LIMIT $1', [2])]
+
+
+@pytest.mark.parametrize('make,sql', [
+    pytest.param(lambda q: q.ForUpdate(), 'FOR UPDATE', id='update'),
+    pytest.param(lambda q: q.ForUpdate(skip_locked=True), 'FOR UPDATE SKIP LOCKED', id='skip'),
+    pytest.param(lambda q: q.ForNoKeyUpdate(nowait=True), 'FOR NO KEY UPDATE NOWAIT', id='nowait'),
+    pytest.param(lambda q: q.ForShare(of=t), 'FOR SHARE OF t', id='of'),
+    pytest.param(
+        lambda q: q.ForUpdate(of=(t, t2.As('x'))).ForKeyShare(of=t3),
+        'FOR UPDATE OF t, x FOR KEY SHARE OF t3',
+        id='multiple',
+    ),
+])
+def test_locking(make, sql):
+    q = S(t.id).From(t).Where(t.x == 1).Limit(5)
+    assert build(make(q)) == ('SELECT id FROM t WHERE x = $1 LIMIT $2 %s' % sql, [1, 5])
+
+
+def test_locking_invalid():
+    with pytest.raises(ValueError):
+        S(t.id).From(t).ForUpdate(skip_locked=True, nowait=True)
+    with pytest.raises(TypeError):
+        S(t.id).From(t).ForUpdate(of='t')
+
+
+@pytest.mark.parametrize('q,sql', [
+    pytest.param(
+        S(t.id, t.name).From(t).Join(t2, t2.id == t.t2_id).Where(t.x == 1)
+        .OrderBy(t.id).Limit(10).Offset(20).ForUpdate(),
+        'SELECT COUNT(*) FROM t JOIN t2 ON t2.id = t.t2_id WHERE t.x = $1',
+        id='plain',
+    ),
+    pytest.param(
+        S(t.status, F.count('*')).From(t).GroupBy(t.status),
+        'SELECT COUNT(*) FROM (SELECT status, COUNT(*) FROM t GROUP BY status) AS counted',
+        id='group by aggregate',
+    ),
+    pytest.param(
+        S(t.status).From(t).GroupBy(t.status).Having(F.count('*') > 1),
+        'SELECT COUNT(*) FROM (SELECT 1 FROM t GROUP BY status HAVING COUNT(*) > $1) AS counted',
+        id='group by having',
+    ),
+    pytest.param(
+        S(t.id, t.status).From(t).DistinctOn(t.status).OrderBy(t.status, t.id.Desc()),
+        'SELECT COUNT(*) FROM (SELECT DISTINCT ON (status) 1 FROM t) AS counted',
+        id='distinct on',
+    ),
+    pytest.param(
+        S(t.status.Distinct()).From(t),
+        'SELECT COUNT(*) FROM (SELECT DISTINCT status FROM t) AS counted',
+        id='distinct',
+    ),
+    pytest.param(
+        S(F.max(t.x)).From(t),
+        'SELECT COUNT(*) FROM (SELECT MAX(x) FROM t) AS counted',
+        id='aggregate',
+    ),
+    pytest.param(
+        S(t.id).From(t).Union(S(t2.id).From(t2)).Limit(5),
+        'SELECT COUNT(*) FROM (SELECT id FROM t UNION SELECT id FROM t2) AS counted',
+        id='union',
+    ),
+    pytest.param(
+        S((t.x + 1).As('y'), t.id).From(t).GroupBy((t.x + 1).As('y')),
+        'SELECT COUNT(*) FROM (SELECT x + $1 AS y, id FROM t GROUP BY y) AS counted',
+        id='group by alias',
+    ),
+    pytest.param(
+        S(t.status, t.kind).From(t).GroupBy(L(1), Raw('kind')),
+        'SELECT COUNT(*) FROM (SELECT status, kind FROM t GROUP BY 1, kind) AS counted',
+        id='group by ordinal and raw',
+    ),
+    pytest.param(
+        W(S(t.id).From(t).Subquery('sq')).Select(t.id, S(t2.x).From(t2).Limit(1)).From(t),
+        'WITH sq AS (SELECT id FROM t) SELECT COUNT(*) FROM t',
+        id='cte and scalar subquery',
+    ),
+])
+def test_to_count(q, sql):
+    assert build(q.ToCount())[0] == sql
+
+
+def test_to_exists():
+    q = S(t.id.Distinct(), t.name).From(t).Where(t.x == 1).OrderBy(t.id).Limit(10)
+    assert build(q.ToExists()) == ('SELECT EXISTS (SELECT 1 FROM t WHERE x = $1)', [1])
+    assert build(S(F.max(t.x)).From(t).ToExists()) == (
+        'SELECT EXISTS (SELECT MAX(x) FROM t)', [],
+    )
+    assert build(S(t.status).From(t).GroupBy(L(1)).ToExists()) == (
+        'SELECT EXISTS (SELECT status FROM t GROUP BY 1)', [],
+    )
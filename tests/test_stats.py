@@ -0,0 +1,47 @@
+import sys
+
+import pytest
+
+from pgmini import BuildStats, Insert as Ins, Select as S, Table as T, With as W, build
+
+
+t = T('t')
+
+
+def test_stats():
+    stats = BuildStats()
+    q = S(t.id, t.name.Cast('text')).From(t).Where(t.id == 1, t.name.In(['a', 'b']))
+    assert build(q, stats=stats) == build(q)
+
+    assert (stats.builds, stats.params, stats.sql_length) == (1, 3, len(build(q)[0]))
+    # select -> operation -> column -> table
+    assert (stats.nodes, stats.max_depth) == (15, 4)
+    assert stats.calls['Column._write'].count == 4
+    assert stats.calls['Param._write'].count == 3
+    assert stats.calls['Marks.affixes'].count == 1
+    assert stats.calls['_run_build'].time >= stats.calls['Select._write'].time > 0
+    assert stats.top(1)[0][0] == '_run_build'
+    assert stats.time > 0
+
+
+def test_stats_accumulated():
+    stats = BuildStats()
+    q = Ins(t, columns=('a',)).Values((1,), (2,)).OnConflict(index_elements=('a',), do_nothing=True)
+    build(q, stats=stats)
+    build(q, stats=stats, driver='psycopg')
+    assert (stats.builds, stats.params) == (2, 4)
+    assert stats.calls['OnConflict.build'].count == 2
+
+
+def test_stats_profiler_restored():
+    def profiler(frame, event, arg):
+        pass
+
+    sys.setprofile(profiler)
+    try:
+        with pytest.raises(ValueError):
+            sq = S(t.id).From(t).Subquery('sq')
+            build(W(sq).Select(1).From(t).JoinLateral(sq, True), stats=BuildStats())
+        assert sys.getprofile() is profiler
+    finally:
+        sys.setprofile(None)
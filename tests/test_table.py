@@ -1,6 +1,6 @@
 from functools import cache
 
-from pgmini import Literal as L, Select as S, Table as T, build
+from pgmini import F, Literal as L, Select as S, Table as T, build
 
 
 def test():
@@ -57,3 +57,27 @@ def test_attributes_and_filters():
         "SELECT id FROM users AS u2 WHERE status = 'active' AND id > $1",
         [0],
     )
+
+
+def test_columns_memoized():
+    class UserModel(T):
+        id: int
+        name: str
+
+    User = UserModel('users')
+    Alias = User.As('u')
+    assert User.id is User.id
+    assert User.other is User.other
+    assert Alias.id is not User.id
+    assert build(S(Alias.id, Alias.other).From(Alias).Where(Alias.name == 'x')) == (
+        'SELECT id, other FROM users AS u WHERE name = $1',
+        ['x'],
+    )
+
+    sq = S(User.id).From(User).Subquery('sq')
+    assert sq.id is sq.id
+    assert build(sq.id)[0] == 'sq.id'
+
+    func = F.unnest([1, 2])
+    assert func.x is func.x
+    assert build(S(func.x).From(func)) == ('SELECT x FROM UNNEST($1)', [[1, 2]])
@@ -9,6 +9,7 @@ from pgmini import (
     Update as U,
     With as W,
     build,
+    claim,
 )
 
 from .utils import compact
@@ -84,3 +85,26 @@ def test_with():
         RETURNING t.*
     ''')
     assert params == [3]
+
+
+def test_claim():
+    jobs = T('jobs')
+    q = claim(
+        jobs,
+        {jobs.status: 'running'},
+        where=(jobs.status == 'new',),
+        limit=10,
+        order_by=(jobs.priority.Desc(), jobs.id),
+        returning=(jobs.id, jobs.payload),
+    )
+    assert build(q) == (
+        compact('''
+            UPDATE jobs SET status = $1
+            WHERE jobs.id IN (
+                SELECT id FROM jobs WHERE status = $2 ORDER BY priority DESC, id
+                LIMIT $3 FOR UPDATE SKIP LOCKED
+            )
+            RETURNING jobs.id, jobs.payload
+        '''),
+        ['running', 'new', 10],
+    )